@@ -1,81 +1,163 @@
-from flask import Flask, render_template, request
-import joblib
-import numpy as np
+from flask import Flask, Response, render_template, request, jsonify, g
+import json
 import os
+import time
+from CustomerChurn.utils.hot_model import HotModel
+from CustomerChurn.utils.prediction_cache import PredictionCache
+from CustomerChurn.utils.serving_metrics import ServingMetrics
+from CustomerChurn.config.configuration import ConfigurationManager
 
 app = Flask(__name__)
 
-# Load the trained model
-MODEL_PATH = os.path.join("saved_models", "model.joblib")
-model = joblib.load(MODEL_PATH)
+serving_config = ConfigurationManager().get_serving_config()
 
+# Model files written by the training pipeline: the estimator, its compiled
+# NumPy bundle (faster for small batches, which are dominated by the
+# estimator wrapper overhead) and the feature manifest that fixes the
+# model's column layout. Versions published to the model registry are
+# preferred; the unversioned files in saved_models/ are served without one.
+MODEL_DIR = "saved_models"
+# The compiled bundle's .npy arrays are memory-mapped read-only, so gunicorn
+# workers (see gunicorn.conf.py) share them through the page cache. The
+# estimator itself is unpickled into private memory by every process that
+# loads it; only the copy preloaded in the master is shared copy-on-write.
+MMAP_MODE = "r"
+COMPILED_MAX_ROWS = 16
 
-def preprocess_input(form):
+# The current model, reloaded in the background and swapped in between
+# requests when a new version is published.
+hot_model = HotModel(
+    registry_dir=serving_config.registry_dir,
+    fallback_dir=MODEL_DIR,
+    poll_interval=serving_config.reload_poll_interval,
+    warmup_rows=serving_config.warmup_rows,
+    mmap_mode=MMAP_MODE,
+    compiled_max_rows=COMPILED_MAX_ROWS,
+)
+
+# Probability at or above which a customer is labelled as churning
+THRESHOLD = 0.5
+
+# Upper bound on records accepted by a single batch request
+MAX_BATCH_SIZE = 100_000
+
+# Probabilities of recently scored feature vectors, keyed by the checksum of
+# the model that scored them so that a new model invalidates them.
+prediction_cache = (
+    PredictionCache(
+        max_entries=serving_config.cache_max_entries,
+        ttl_seconds=serving_config.cache_ttl_seconds,
+        shared_path=serving_config.cache_shared_path,
+    )
+    if serving_config.cache_enabled
+    else None
+)
+
+# Request counters, latency histograms and per-phase timers served at
+# /metrics; aggregated over gunicorn workers (see gunicorn.conf.py).
+serving_metrics = ServingMetrics(enabled=serving_config.metrics_enabled)
+
+
+def preprocess_input(form, served=None):
     """
     Preprocess form input to match training features.
     """
-    # Numeric
-    tenure = float(form.get("tenure"))
-    MonthlyCharges = float(form.get("MonthlyCharges"))
-    TotalCharges = float(form.get("TotalCharges"))
-    SeniorCitizen = int(form.get("SeniorCitizen"))
-
-    # Binary mappings
-    Partner = 1 if form.get("Partner") == "Yes" else 0
-    Dependents = 1 if form.get("Dependents") == "Yes" else 0
-    PhoneService = 1 if form.get("PhoneService") == "Yes" else 0
-    PaperlessBilling = 1 if form.get("PaperlessBilling") == "Yes" else 0
-    gender = 1 if form.get("gender") == "Female" else 0
-
-    # MultipleLines
-    MultipleLines = 1 if form.get("MultipleLines") == "Yes" else 0
-
-    # Internet-related services
-    OnlineSecurity = 1 if form.get("OnlineSecurity") == "Yes" else 0
-    OnlineBackup = 1 if form.get("OnlineBackup") == "Yes" else 0
-    DeviceProtection = 1 if form.get("DeviceProtection") == "Yes" else 0
-    TechSupport = 1 if form.get("TechSupport") == "Yes" else 0
-    StreamingTV = 1 if form.get("StreamingTV") == "Yes" else 0
-    StreamingMovies = 1 if form.get("StreamingMovies") == "Yes" else 0
-
-    # One-hot encoding for InternetService
-    InternetService = form.get("InternetService")
-    InternetService_Fiber_optic = 1 if InternetService == "Fiber optic" else 0
-    InternetService_No = 1 if InternetService == "No" else 0
-    # Baseline (DSL) is dropped
-
-    # One-hot encoding for Contract
-    Contract = form.get("Contract")
-    Contract_One_year = 1 if Contract == "One year" else 0
-    Contract_Two_year = 1 if Contract == "Two year" else 0
-    # Baseline (Month-to-month) is dropped
-
-    # One-hot encoding for PaymentMethod
-    PaymentMethod = form.get("PaymentMethod")
-    PaymentMethod_Credit_card = 1 if PaymentMethod == "Credit card (automatic)" else 0
-    PaymentMethod_Electronic_check = 1 if PaymentMethod == "Electronic check" else 0
-    PaymentMethod_Mailed_check = 1 if PaymentMethod == "Mailed check" else 0
-    # Baseline (Bank transfer (automatic)) is dropped
-
-    # Feature engineering
-    avg_monthly_value = TotalCharges / (tenure + 1)
-    tenure_ratio = tenure / (TotalCharges + 1)
-    service_density = OnlineSecurity + OnlineBackup + TechSupport
-    tenure_MonthlyCharges = tenure * MonthlyCharges
-
-    # Final feature vector
-    features = [
-        tenure, MonthlyCharges, TotalCharges,
-        SeniorCitizen, Partner, Dependents, PhoneService, PaperlessBilling,
-        gender, MultipleLines, OnlineSecurity, OnlineBackup,
-        DeviceProtection, TechSupport, StreamingTV, StreamingMovies,
-        InternetService_Fiber_optic, InternetService_No,
-        Contract_One_year, Contract_Two_year,
-        PaymentMethod_Credit_card, PaymentMethod_Electronic_check, PaymentMethod_Mailed_check,
-        avg_monthly_value, tenure_ratio, service_density, tenure_MonthlyCharges
-    ]
-
-    return np.array(features).reshape(1, -1)
+    encoder = (served or hot_model.current()).encoder
+    return encoder.transform({column: [form.get(column)] for column in encoder.input_columns})
+
+
+def preprocess_batch(records, served=None, first_index=0):
+    """
+    Vectorized counterpart of `preprocess_input` for a list of customer records.
+
+    Builds the whole feature matrix with the shared encoder in one pass
+    instead of encoding each record separately.
+
+    Raises:
+        ValueError: If a record lacks an input field (or sets it to null),
+            naming the record by its index (offset by `first_index`) and the
+            missing fields. With `first_index` None, for a single record
+            scored like `preprocess_input`, the encoder's own error is
+            raised instead, without a record index.
+    """
+    encoder = (served or hot_model.current()).encoder
+    columns = {
+        column: [record.get(column) for record in records]
+        for column in encoder.input_columns
+    }
+    if first_index is not None and any(None in values for values in columns.values()):
+        for index, record in enumerate(records):
+            missing = [column for column in encoder.input_columns if record.get(column) is None]
+            if missing:
+                raise ValueError(f"Record {first_index + index} is missing required fields: {', '.join(missing)}.")
+    return encoder.transform(columns)
+
+
+def predict_probability(features, served=None, endpoint=None):
+    """
+    Returns the churn probability for every row of the feature matrix,
+    scoring only the rows missing from the prediction cache.
+
+    Requests pass the model they encoded their features with, so a reload
+    in between never scores them with another version, and their endpoint,
+    under which the batch size and the time spent in the model itself
+    (`predict_proba`, cache misses only) are recorded.
+    """
+    served = served or hot_model.current()
+    compute = served.predict_probability
+    if endpoint is not None:
+        serving_metrics.observe_batch(endpoint, len(features))
+        compute = serving_metrics.timed(compute, endpoint, "predict_proba", served.version)
+    if prediction_cache is not None and len(features) <= serving_config.cache_max_rows:
+        return prediction_cache.get_or_compute(features, compute, served.checksum)
+    return compute(features)
+
+
+def parse_records(body, mimetype):
+    """
+    Reads customer records from a JSON array or an NDJSON request body.
+    """
+    if mimetype in ("application/x-ndjson", "application/jsonl"):
+        records = [json.loads(line) for line in body.splitlines() if line.strip()]
+    else:
+        records = json.loads(body)
+
+    if isinstance(records, dict):
+        records = records.get("records")
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        raise ValueError("Request body must be a JSON array of customer records.")
+    if len(records) > MAX_BATCH_SIZE:
+        raise ValueError(f"Batch size {len(records)} exceeds the limit of {MAX_BATCH_SIZE}.")
+
+    return records
+
+
+def parse_batch_request(req):
+    """
+    Reads the customer records of a Flask batch request.
+    """
+    return parse_records(req.get_data(as_text=True), req.mimetype)
+
+
+def request_endpoint():
+    """
+    Route pattern of the current request, a bounded label for its metrics.
+    """
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request(response):
+    start = g.get("request_start")
+    if start is not None:
+        serving_metrics.observe_request(request_endpoint(), request.method, response.status_code,
+                                        time.perf_counter() - start)
+    return response
 
 
 @app.route("/")
@@ -85,14 +167,17 @@ def index():
 
 @app.route("/predict", methods=["POST"])
 def predict():
+    endpoint = request_endpoint()
     try:
-        features = preprocess_input(request.form)
-        prediction = model.predict(features)[0]
-        probability = (
-            model.predict_proba(features)[0][1]
-            if hasattr(model, "predict_proba")
-            else None
-        )
+        served = hot_model.current()
+        serving_metrics.observe_model(served.version)
+        with serving_metrics.phase(endpoint, "parse", served.version):
+            form = request.form
+        with serving_metrics.phase(endpoint, "preprocess", served.version):
+            features = preprocess_input(form, served)
+        with serving_metrics.phase(endpoint, "predict", served.version):
+            probability = predict_probability(features, served, endpoint)[0]
+        prediction = int(probability >= THRESHOLD)
 
         result_text = (
             "Customer is likely to churn."
@@ -100,14 +185,97 @@ def predict():
             else "Customer is not likely to churn."
         )
 
-        return render_template(
-            "result.html",
-            prediction=result_text,
-            probability=f"{probability:.2f}" if probability is not None else "N/A",
-        )
+        with serving_metrics.phase(endpoint, "render", served.version):
+            return render_template(
+                "result.html",
+                prediction=result_text,
+                probability=f"{probability:.2f}",
+            )
     except Exception as e:
+        serving_metrics.observe_error(endpoint, e)
         return render_template("result.html", prediction=f"Error: {str(e)}", probability="N/A")
 
 
+@app.route("/api/v1/predict/batch", methods=["POST"])
+def predict_batch():
+    """
+    Scores a batch of customers with a single `predict_proba` call.
+
+    Accepts a JSON array of records (or `{"records": [...]}`) or an NDJSON
+    body with one record per line, using the same fields as the HTML form.
+    """
+    endpoint = request_endpoint()
+    served = hot_model.current()
+    serving_metrics.observe_model(served.version)
+    try:
+        with serving_metrics.phase(endpoint, "parse", served.version):
+            records = parse_batch_request(request)
+    except ValueError as e:
+        serving_metrics.observe_error(endpoint, e)
+        return jsonify(error=str(e)), 400
+
+    if not records:
+        return jsonify(count=0, predictions=[])
+
+    try:
+        with serving_metrics.phase(endpoint, "preprocess", served.version):
+            features = preprocess_batch(records, served)
+        with serving_metrics.phase(endpoint, "predict", served.version):
+            probabilities = predict_probability(features, served, endpoint)
+        predictions = (probabilities >= THRESHOLD).astype(int)
+    except (TypeError, ValueError) as e:
+        serving_metrics.observe_error(endpoint, e)
+        return jsonify(error=f"Invalid customer record: {str(e)}"), 400
+
+    with serving_metrics.phase(endpoint, "serialize", served.version):
+        return jsonify(
+            count=len(records),
+            threshold=THRESHOLD,
+            predictions=[
+                {"prediction": int(label), "probability": round(float(proba), 6)}
+                for label, proba in zip(predictions, probabilities)
+            ],
+        )
+
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    """
+    Liveness and readiness: the active model version and its load time.
+    """
+    served = hot_model.current()
+    return jsonify(status="ok", version=served.version, checksum=served.checksum,
+                   load_seconds=round(served.load_seconds, 4))
+
+
+@app.route("/model", methods=["GET"])
+def model_info():
+    """
+    Details of the active model, the registry versions and the last reload error.
+    """
+    return jsonify(hot_model.status())
+
+
+@app.route("/api/v1/cache", methods=["GET"])
+def cache_stats():
+    """
+    Returns the prediction cache counters of the worker serving the request.
+    """
+    if prediction_cache is None:
+        return jsonify(enabled=False)
+    return jsonify(enabled=True, **prediction_cache.stats())
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Prometheus metrics of all workers, in the text exposition format.
+    """
+    if not serving_metrics.enabled:
+        return jsonify(error="Metrics are disabled."), 404
+    body, content_type = serving_metrics.render()
+    return Response(body, content_type=content_type)
+
+
 if __name__ == "__main__":
     app.run(debug=True)
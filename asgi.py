@@ -0,0 +1,221 @@
+import asyncio
+import functools
+import json
+import time
+import numpy as np
+from CustomerChurn.utils.batching import MicroBatcher
+from app import (preprocess_batch, predict_probability, parse_records, hot_model, prediction_cache,
+                 serving_config, serving_metrics, THRESHOLD)
+
+# Asynchronous scoring server. Concurrent single-record requests are encoded
+# and scored together in micro-batches, so the per-call overhead of the model
+# is paid once per batch instead of once per request. Run it with any ASGI
+# server, e.g.:
+#
+#   uvicorn asgi:app --host 0.0.0.0 --port 8000
+#   gunicorn asgi:app --config gunicorn.conf.py -k uvicorn.workers.UvicornWorker
+#
+# The HTML form stays on the Flask app (app.py).
+
+def score_records(records, endpoint="/api/v1/predict/batch", indexed=True):
+    """
+    Scores a list of customer records with one vectorized `predict_proba`.
+
+    The batch is encoded in one pass; if a record is invalid, the records are
+    encoded one by one so only the invalid ones fail. The phases are timed
+    under `endpoint`. With `indexed`, errors name records by their position
+    in `records`; micro-batched records come from separate requests of one
+    record each, so their errors carry the plain message of the Flask
+    /predict endpoint instead.
+
+    Returns:
+        list: The churn probability of every record, or the ValueError
+        raised while encoding it.
+    """
+    served = hot_model.current()
+    serving_metrics.observe_model(served.version)
+    try:
+        with serving_metrics.phase(endpoint, "preprocess", served.version):
+            features = preprocess_batch(records, served)
+    except (TypeError, ValueError):
+        pass
+    else:
+        with serving_metrics.phase(endpoint, "predict", served.version):
+            return list(predict_probability(features, served, endpoint))
+
+    results, rows, valid = [], [], []
+    for i, record in enumerate(records):
+        try:
+            rows.append(preprocess_batch([record], served, first_index=i if indexed else None))
+            valid.append(i)
+            results.append(None)
+        except (TypeError, ValueError) as e:
+            results.append(ValueError(f"Invalid customer record: {e}" if indexed else str(e)))
+    if rows:
+        with serving_metrics.phase(endpoint, "predict", served.version):
+            probabilities = predict_probability(np.vstack(rows), served, endpoint)
+        for i, probability in zip(valid, probabilities):
+            results[i] = probability
+    return results
+
+
+# Micro-batches of single-record requests; their batch sizes and phases are
+# recorded under the endpoint the records came in on
+batcher = MicroBatcher(
+    functools.partial(score_records, endpoint="/api/v1/predict", indexed=False),
+    max_batch_size=serving_config.max_batch_size,
+    max_wait_ms=serving_config.max_wait_ms,
+    latency_budget_ms=serving_config.latency_budget_ms,
+)
+
+
+def prediction(probability):
+    return {"prediction": int(probability >= THRESHOLD), "probability": round(float(probability), 6)}
+
+
+async def read_body(receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body", False):
+            return body
+
+
+async def send_json(send, status, data):
+    body = json.dumps(data).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def predict(scope, receive, send):
+    """
+    Scores one customer record, sent as a JSON object, in the next micro-batch.
+    """
+    try:
+        with serving_metrics.phase(scope["path"], "parse"):
+            record = json.loads(await read_body(receive))
+        if not isinstance(record, dict):
+            raise ValueError("Request body must be a JSON object with the customer record.")
+        # Waiting for the batch to fill up, and for the batches queued before it
+        with serving_metrics.phase(scope["path"], "batch"):
+            probability = await batcher.submit(record)
+    except ValueError as e:
+        serving_metrics.observe_error(scope["path"], e)
+        return await send_json(send, 400, {"error": str(e)})
+    await send_json(send, 200, {"threshold": THRESHOLD, **prediction(probability)})
+
+
+async def predict_batch(scope, receive, send):
+    """
+    Scores a JSON array or NDJSON body of records, like the Flask endpoint,
+    with one `predict_proba` call off the event loop.
+    """
+    headers = dict(scope.get("headers", []))
+    mimetype = headers.get(b"content-type", b"application/json").decode().split(";")[0].strip()
+    try:
+        with serving_metrics.phase(scope["path"], "parse"):
+            records = parse_records((await read_body(receive)).decode(), mimetype)
+    except ValueError as e:
+        serving_metrics.observe_error(scope["path"], e)
+        return await send_json(send, 400, {"error": str(e)})
+
+    results = await asyncio.get_running_loop().run_in_executor(None, score_records, records) if records else []
+    errors = [result for result in results if isinstance(result, Exception)]
+    if errors:
+        serving_metrics.observe_error(scope["path"], errors[0])
+        return await send_json(send, 400, {"error": str(errors[0])})
+    await send_json(send, 200, {
+        "count": len(records),
+        "threshold": THRESHOLD,
+        "predictions": [prediction(probability) for probability in results],
+    })
+
+
+async def batching_stats(scope, receive, send):
+    await send_json(send, 200, batcher.stats())
+
+
+async def healthz(scope, receive, send):
+    served = hot_model.current()
+    await send_json(send, 200, {"status": "ok", "version": served.version, "checksum": served.checksum,
+                                "load_seconds": round(served.load_seconds, 4)})
+
+
+async def model_info(scope, receive, send):
+    await send_json(send, 200, hot_model.status())
+
+
+async def metrics(scope, receive, send):
+    """
+    Prometheus metrics of all workers, in the text exposition format.
+    """
+    if not serving_metrics.enabled:
+        return await send_json(send, 404, {"error": "Metrics are disabled."})
+    body, content_type = serving_metrics.render()
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def cache_stats(scope, receive, send):
+    if prediction_cache is None:
+        return await send_json(send, 200, {"enabled": False})
+    await send_json(send, 200, {"enabled": True, **prediction_cache.stats()})
+
+
+ROUTES = {
+    ("POST", "/api/v1/predict"): predict,
+    ("POST", "/api/v1/predict/batch"): predict_batch,
+    ("GET", "/api/v1/batching"): batching_stats,
+    ("GET", "/api/v1/cache"): cache_stats,
+    ("GET", "/healthz"): healthz,
+    ("GET", "/model"): model_info,
+    ("GET", "/metrics"): metrics,
+}
+
+
+async def app(scope, receive, send):
+    """
+    ASGI entry point.
+    """
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await batcher.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    start = time.perf_counter()
+    status = 500
+    endpoint = scope["path"]
+
+    async def send_and_record(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        await send(message)
+
+    handler = ROUTES.get((scope["method"], endpoint))
+    try:
+        if handler is None:
+            endpoint = "unmatched"
+            return await send_json(send_and_record, 404, {"error": f"No route for {scope['method']} {scope['path']}"})
+        await handler(scope, receive, send_and_record)
+    except Exception as e:
+        serving_metrics.observe_error(endpoint, e)
+        raise
+    finally:
+        serving_metrics.observe_request(endpoint, scope["method"], status, time.perf_counter() - start)
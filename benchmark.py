@@ -0,0 +1,26 @@
+import argparse
+import dataclasses
+from CustomerChurn import logger
+from CustomerChurn.config.configuration import ConfigurationManager
+from CustomerChurn.components.benchmark import Benchmark
+
+# Cases run in spawned processes, which import this module again; only the
+# parent parses arguments and runs the suite.
+if __name__ == "__main__":
+   parser = argparse.ArgumentParser(description="Benchmark encoding, training, evaluation and serving on synthetic data.")
+   parser.add_argument("--sizes", type=int, nargs="+", help="Synthetic rows per case (default: benchmark.sizes).")
+   parser.add_argument("--only", nargs="+", help="Run only these benchmarks, by name or prefix (e.g. train).")
+   parser.add_argument("--repeats", type=int, help="Timed runs per case (default: benchmark.repeats).")
+   parser.add_argument("--output", help="Report file (default: benchmark.report_file).")
+   args = parser.parse_args()
+
+   try:
+      config = ConfigurationManager().get_benchmark_config()
+      overrides = {"sizes": args.sizes, "repeats": args.repeats, "report_file": args.output}
+      config = dataclasses.replace(config, **{name: value for name, value in overrides.items() if value})
+      benchmark = Benchmark(config=config)
+      benchmark.run(only=args.only)
+      logger.info(f"Benchmark report saved to: {config.report_file}")
+   except Exception as e:
+      logger.exception(e)
+      raise e
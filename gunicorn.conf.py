@@ -0,0 +1,42 @@
+import gc
+import glob
+import multiprocessing
+import os
+import tempfile
+
+# Import app.py (and load the model) once in the master process. Workers are
+# forked afterwards and share the model's memory pages copy-on-write instead
+# of each loading a private copy.
+preload_app = True
+
+# Every worker holds its own Flask and XGBoost state, so the default is
+# capped rather than one worker per visible core; WEB_CONCURRENCY overrides it
+MAX_DEFAULT_WORKERS = 4
+workers = int(os.environ.get("WEB_CONCURRENCY", min(multiprocessing.cpu_count(), MAX_DEFAULT_WORKERS)))
+
+# Workers write their Prometheus samples to files in this directory, which
+# /metrics sums up (prometheus_client multiprocess mode). It has to be set
+# before the app is preloaded, and must not keep files of a previous run.
+if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+    for path in glob.glob(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "*.db")):
+        os.remove(path)
+else:
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="churn-metrics-")
+
+
+def when_ready(server):
+    # Move everything allocated while preloading into the permanent GC
+    # generation, so garbage collection in the workers never touches (and
+    # thereby un-shares) those pages.
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    # Drop the live-only gauges (served model versions) of a dead worker;
+    # its counters and histograms keep counting towards the totals.
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,67 +1,18 @@
+import argparse
 from CustomerChurn import logger
-from CustomerChurn.pipeline.stage_01_data_ingestion import DataIngestionTrainingPipeline
-from CustomerChurn.pipeline.stage_02_data_validation import DataValidationTrainingPipeline
-from CustomerChurn.pipeline.stage_03_data_preprocessing import DataPreprocessingTrainingPipeline
-from CustomerChurn.pipeline.stage_04_data_transformation import DataTransformationTrainingPipeline
-from CustomerChurn.pipeline.stage_05_model_trainer import ModelTrainerTrainingPipeline
-from CustomerChurn.pipeline.stage_06_model_evaluation import ModelEvaluationTrainingPipeline
+from CustomerChurn.config.configuration import ConfigurationManager
+from CustomerChurn.pipeline.runner import PipelineRunner
 
-STAGE_NAME = "Data Ingestion stage"
-try:
-   logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<") 
-   data_ingestion = DataIngestionTrainingPipeline()
-   data_ingestion.main()
-   logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
-except Exception as e:
-        logger.exception(e)
-        raise e
-
-STAGE_NAME = "Data Validation stage"
-try:
-   logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<") 
-   data_validation = DataValidationTrainingPipeline()
-   data_validation.main()
-   logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
-except Exception as e:
-        logger.exception(e)
-        raise e
-
-STAGE_NAME = "Data Preprocessing stage"
-try:
-   logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
-   data_preprocessing = DataPreprocessingTrainingPipeline()
-   data_preprocessing.main()
-   logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
-except Exception as e:
-   logger.exception(e)
-   raise e
+parser = argparse.ArgumentParser(description="Run the training pipeline.")
+parser.add_argument("--force", action="store_true", help="Rerun every stage even if its inputs are unchanged.")
+args = parser.parse_args()
 
-STAGE_NAME = "Data Tranformation stage"
 try:
-   logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
-   data_transformation = DataTransformationTrainingPipeline()
-   data_transformation.main()
-   logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+   config = ConfigurationManager()
+   runner = PipelineRunner(config=config.get_pipeline_runner_config())
+   report = runner.run(force=args.force)
+   for stage, result in report.items():
+      logger.info(f"{stage}: {result}")
 except Exception as e:
    logger.exception(e)
    raise e
-
-STAGE_NAME = "Model Trainer stage"
-try:
-    logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
-    data_training = ModelTrainerTrainingPipeline()
-    data_training.main()
-    logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
-except Exception as e:
-    logger.exception(e)
-    raise e
-
-STAGE_NAME = "Model Evaluation stage"
-try:
-   logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<") 
-   data_evaluation = ModelEvaluationTrainingPipeline()
-   data_evaluation.main()
-   logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
-except Exception as e:
-        logger.exception(e)
-        raise e
\ No newline at end of file
@@ -0,0 +1,320 @@
+import os
+import sys
+import json
+import time
+import platform
+import resource
+import subprocess
+import shutil
+import dataclasses
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from CustomerChurn import logger
+from CustomerChurn.entity.config_entity import BenchmarkConfig, SyntheticDataConfig
+from CustomerChurn.components.synthetic_data import SyntheticDataGenerator
+from CustomerChurn.components.data_transformation import DataTransformation
+from CustomerChurn.components.model_trainer import ModelTrainer
+from CustomerChurn.components.model_evaluation import ModelEvaluation
+from CustomerChurn.utils.common import artifact_path, write_table
+from CustomerChurn.utils.features import FeatureEncoder
+from CustomerChurn.utils.resources import available_cpus
+
+# Untimed calls before the single-record latency benchmarks
+WARMUP_CALLS = 10
+
+# Benchmarks timed once per call on single records, not per data size
+PER_CALL_BENCHMARKS = ["preprocess_input", "predict_single"]
+
+
+def synthetic_customers(config: SyntheticDataConfig, n_rows: int, seed: int) -> pd.DataFrame:
+    """
+    Raw customer rows sampled from the synthetic data profile, so categories,
+    numeric ranges, dependencies and the churn rate follow the ingested data,
+    cleaned like the preprocessing stage does (no customerID, no rows with
+    missing TotalCharges).
+    """
+    # Oversample slightly so exactly n_rows remain once incomplete rows are dropped
+    data = SyntheticDataGenerator(config).sample(n_rows + n_rows // 100 + 16, seed)
+    data = data.dropna(subset=['TotalCharges']).drop(columns=['customerID'])
+    return data.head(n_rows).reset_index(drop=True)
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    # Linux resets the high-water RSS (VmHWM) to the current RSS on "5"
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def _served_model():
+    # The web app's model and encoder; imported lazily since app.py loads them
+    import app
+    return app, app.hot_model.current()
+
+
+def _transformation(config: BenchmarkConfig, workdir: Path) -> DataTransformation:
+    return DataTransformation(dataclasses.replace(
+        config.transformation, root_dir=workdir, class_weights=workdir / "class_weights.json"))
+
+
+def _setup(config: BenchmarkConfig, name: str, rows: int, workdir: Path) -> dict:
+    """
+    Prepares the data of one benchmark case outside the timed region.
+
+    Returns:
+        dict: `run`, the callable timed, `repeats`, and `rows` processed per call.
+    """
+    encoder = FeatureEncoder()
+
+    if name in ["encode_data", "feature_engineering", "data_balancing"]:
+        transformation = _transformation(config, workdir)
+        raw = synthetic_customers(config.synthetic, rows, config.seed)
+        if name == "encode_data":
+            return {"run": lambda: transformation.encode_data(raw), "repeats": config.repeats, "rows": rows}
+        encoded = transformation.encode_data(raw)
+        del raw
+        if name == "feature_engineering":
+            return {"run": lambda: transformation.feature_engineering(encoded), "repeats": config.repeats,
+                    "rows": rows}
+        engineered = transformation.feature_engineering(encoded)
+        return {"run": lambda: transformation.data_balancing(engineered), "repeats": config.repeats, "rows": rows}
+
+    if name == "preprocess_input":
+        app, served = _served_model()
+        forms = synthetic_customers(config.synthetic, rows, config.seed).astype(str).to_dict("records")
+        calls = iter(forms * 2)
+        return {"run": lambda: app.preprocess_input(next(calls), served), "repeats": rows, "rows": 1}
+
+    if name in ["predict_single", "predict_batch"]:
+        app, served = _served_model()
+        features = served.encoder.transform(synthetic_customers(config.synthetic, rows, config.seed))
+        if name == "predict_batch":
+            return {"run": lambda: served.predict_probability(features), "repeats": config.repeats, "rows": rows}
+        single_rows = iter(np.split(np.concatenate([features, features]), 2 * rows))
+
+        def predict_single():
+            served.predict_probability(next(single_rows))
+
+        return {"run": predict_single, "repeats": rows, "rows": 1}
+
+    serving_dir = Path(config.trainer.serving_dir)
+    tracking = dataclasses.replace(config.trainer.tracking, backend="none")
+    transformation = _transformation(config, workdir)
+    data = transformation.feature_engineering(
+        transformation.encode_data(synthetic_customers(config.synthetic, rows, config.seed)))
+    dtypes = {**encoder.compact_dtypes, 'Churn': np.uint8}
+    manifest_path = workdir / "feature_manifest.json"
+    encoder.save_manifest(manifest_path)
+
+    if name.startswith("train_"):
+        model = name[len("train_"):]
+        split = int(rows * 0.8)
+        train_path = artifact_path(workdir / "train.csv", config.artifact_format)
+        test_path = artifact_path(workdir / "test.csv", config.artifact_format)
+        write_table(data.iloc[:split], train_path, dtype=dtypes)
+        write_table(data.iloc[split:], test_path, dtype=dtypes)
+        del data
+        trainer = ModelTrainer(dataclasses.replace(
+            config.trainer, root_dir=workdir / "model", train_data_path=train_path, test_data_path=test_path,
+            feature_manifest=manifest_path, class_weights=workdir / "class_weights.json", model=model,
+            params=config.model_params[model], search_params=False, serving_dir=workdir / "serving",
+            registry_dir=workdir / "registry", registry_keep_versions=1, tracking=tracking))
+        os.makedirs(workdir / "model", exist_ok=True)
+        return {"run": trainer.train, "repeats": 1, "rows": split}
+
+    if name == "save_results":
+        test_path = artifact_path(workdir / "test.csv", config.artifact_format)
+        write_table(data, test_path, dtype=dtypes)
+        del data
+        evaluation = ModelEvaluation(dataclasses.replace(
+            config.evaluation, root_dir=workdir, test_data_path=test_path,
+            model_path=serving_dir / os.path.basename(config.evaluation.model_path),
+            feature_manifest=serving_dir / os.path.basename(config.evaluation.feature_manifest),
+            compiled_model_path=serving_dir / os.path.basename(config.evaluation.compiled_model_path),
+            metric_file_name=workdir / "metrics.json", cv_metric_file_name=workdir / "cv_metrics.json",
+            curves_file_name=workdir / "curves.json",
+            cross_validation={**config.evaluation.cross_validation, "enabled": False}, tracking=tracking))
+        return {"run": evaluation.save_results, "repeats": 1, "rows": rows}
+
+    raise ValueError(f"Unknown benchmark: {name}")
+
+
+def run_case(config: BenchmarkConfig, name: str, rows: int) -> dict:
+    """
+    Runs one benchmark case and measures it. Meant to run in a fresh process,
+    so the peak RSS belongs to this case alone.
+
+    Returns:
+        dict: Timings, throughput, latency percentiles and memory of the case.
+    """
+    workdir = Path(config.root_dir) / "work" / f"{name}-{rows}"
+    os.makedirs(workdir, exist_ok=True)
+    case = _setup(config, name, rows, workdir)
+
+    run, per_call = case["run"], name in PER_CALL_BENCHMARKS
+    for _ in range(WARMUP_CALLS if per_call else 0):
+        run()
+    baseline_rss = _rss_mb()
+    peak_reset = _reset_peak_rss()
+
+    seconds = np.empty(case["repeats"])
+    for i in range(case["repeats"]):
+        start = time.perf_counter()
+        run()
+        seconds[i] = time.perf_counter() - start
+
+    peak_rss = _peak_rss_mb()
+    latency_ms = seconds * 1000
+    return {
+        "benchmark": name,
+        "rows": rows,
+        "repeats": int(case["repeats"]),
+        "total_seconds": round(float(seconds.sum()), 6),
+        "throughput_rows_per_sec": round(case["rows"] * len(seconds) / float(seconds.sum()), 2),
+        "latency_ms": {
+            "mean": round(float(latency_ms.mean()), 4),
+            "min": round(float(latency_ms.min()), 4),
+            "p50": round(float(np.percentile(latency_ms, 50)), 4),
+            "p95": round(float(np.percentile(latency_ms, 95)), 4),
+            "p99": round(float(np.percentile(latency_ms, 99)), 4),
+            "max": round(float(latency_ms.max()), 4),
+        },
+        "baseline_rss_mb": round(baseline_rss, 1) if baseline_rss is not None else None,
+        "peak_rss_mb": round(peak_rss, 1),
+        # Without a resettable high-water mark the peak includes the setup
+        "peak_rss_includes_setup": not peak_reset,
+    }
+
+
+class Benchmark:
+    def __init__(self, config: BenchmarkConfig):
+        """
+        Benchmark suite of the feature encoding, training, evaluation and
+        serving code on synthetic data.
+
+        Every (benchmark, size) case runs in a freshly spawned process: its
+        synthetic data is generated there outside the timed region, the code
+        under test runs `repeats` times (training and evaluation once,
+        single-record serving benchmarks once per call) and the high-water
+        RSS is reset before timing, so the reported peak memory is that of the
+        benchmarked code. The case's working files are deleted afterwards and
+        the results are written to `report_file` as JSON after every case.
+
+        Args:
+            config (BenchmarkConfig): Benchmark settings.
+        """
+        self.config = config
+
+    @property
+    def benchmarks(self) -> list:
+        """Names of every benchmark, in run order."""
+        return (["encode_data", "feature_engineering", "data_balancing"] + PER_CALL_BENCHMARKS
+                + ["predict_batch"] + [f"train_{model}" for model in self.config.models] + ["save_results"])
+
+    def cases(self, only: list = None) -> list:
+        """
+        Returns the (benchmark, rows) cases to run, optionally restricted to
+        benchmarks named in or starting with an entry of `only`.
+        """
+        names = [name for name in self.benchmarks
+                 if not only or any(name == prefix or name.startswith(prefix) for prefix in only)]
+        cases = []
+        for name in names:
+            sizes = [self.config.latency_calls] if name in PER_CALL_BENCHMARKS else self.config.sizes
+            cases.extend((name, rows) for rows in sizes)
+        return cases
+
+    @staticmethod
+    def environment() -> dict:
+        """
+        Describes the machine and library versions the numbers were taken on.
+        """
+        import sklearn
+        import xgboost
+        try:
+            commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                    timeout=10).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            commit = None
+        return {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.machine(),
+            "available_cpus": available_cpus(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "scikit-learn": sklearn.__version__,
+            "xgboost": xgboost.__version__,
+            "git_commit": commit,
+        }
+
+    def run(self, only: list = None) -> dict:
+        """
+        Runs the selected cases one after another and writes the report.
+
+        A case that fails (including running out of memory) is reported with
+        its error and the suite moves on.
+
+        Returns:
+            dict: The report, with the environment, settings and one result per case.
+        """
+        report = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "environment": self.environment(),
+            "settings": {"sizes": self.config.sizes, "repeats": self.config.repeats,
+                         "latency_calls": self.config.latency_calls, "seed": self.config.seed,
+                         "artifact_format": self.config.artifact_format},
+            "results": [],
+        }
+        context = multiprocessing.get_context("spawn")
+        for name, rows in self.cases(only):
+            logger.info(f">>>>>> benchmark {name} ({rows:,} rows) started <<<<<<")
+            try:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    result = pool.submit(run_case, self.config, name, rows).result()
+                logger.info(f"{name} ({rows:,} rows): {result['throughput_rows_per_sec']:,.0f} rows/s, "
+                            f"p50 {result['latency_ms']['p50']:.3f} ms, peak RSS {result['peak_rss_mb']} MB")
+            except Exception as e:
+                logger.error(f"Benchmark {name} ({rows:,} rows) failed: {e!r}")
+                result = {"benchmark": name, "rows": rows, "error": repr(e)}
+            # Synthetic tables of the large cases take gigabytes
+            shutil.rmtree(Path(self.config.root_dir) / "work" / f"{name}-{rows}", ignore_errors=True)
+            report["results"].append(result)
+            self.save(report)
+        return report
+
+    def save(self, report: dict):
+        os.makedirs(os.path.dirname(self.config.report_file), exist_ok=True)
+        tmp_path = f"{self.config.report_file}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(report, f, indent=4)
+        os.replace(tmp_path, self.config.report_file)
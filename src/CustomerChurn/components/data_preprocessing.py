@@ -1,7 +1,8 @@
-import os
 import pandas as pd
 from CustomerChurn import logger
 from CustomerChurn.entity.config_entity import DataPreprocessingConfig
+from CustomerChurn.utils.common import TableWriter, read_table, iter_table, write_table
+from CustomerChurn.utils.partitions import list_deltas, delta_sources, pending_partitions, write_partition
 
 class DataPreprocessing:
     def __init__(self, config: DataPreprocessingConfig):
@@ -14,29 +15,91 @@ class DataPreprocessing:
         
         self.config = config
         
+    def clean_chunk(self, data: pd.DataFrame, keep_id: bool = False) -> pd.DataFrame:
+        """
+        Removes rows with missing values of TotalCharges, converts the TotalCharges
+        column to float, and removes the customerID column.
+        
+        Args:
+            data (pd.DataFrame): Raw rows, either the whole file or one chunk of it.
+            keep_id (bool): Keep customerID, which the incremental store is keyed by.
+        
+        Returns:
+            pd.DataFrame: The cleaned rows.
+        """
+        if not pd.api.types.is_numeric_dtype(data['TotalCharges']):
+            data['TotalCharges'] = data['TotalCharges'].replace(" ", None).astype('float32')
+        data.dropna(subset=['TotalCharges'], inplace=True)
+        if not keep_id:
+            data.drop(columns=['customerID'], inplace=True)
+        return data
+        
     def data_cleaning(self) -> pd.DataFrame:
         """
-        Reads the data from the specified path, removes rows with missing values of TotalCharges, 
-        converts the TotalCharges column to float, and removes the customerID column.
+        Reads the data from the specified path, cleans it with `clean_chunk` and saves
+        it as cleaned_data in the configured artifact format, typed by the schema.
+        
+        When streaming is enabled the file is processed in chunks that are appended
+        to the output one by one, so memory stays bounded regardless of file size.
         
         Args:
             None
         
         Returns:
-            pd.DataFrame: The cleaned data.
+            pd.DataFrame: The cleaned data, or None when streaming.
         """
         try:
-            data = pd.read_csv(self.config.data_path)
-            data.drop(data[data['TotalCharges'] == " "].index, axis=0, inplace=True)
-            data['TotalCharges'] = data['TotalCharges'].astype('float')
-            data.drop(columns=['customerID'], axis=1, inplace=True)
-            
-            cleaned_data_path = os.path.join(self.config.root_dir, "cleaned_data.csv")
-            data.to_csv(cleaned_data_path, index=False)
+            cleaned_data_path = self.config.cleaned_data_path
+
+            if self.config.chunk_size:
+                chunks = iter_table(self.config.data_path, self.config.chunk_size,
+                                    dtype=self.config.schema, na_values=self.config.na_values)
+                with TableWriter(cleaned_data_path, dtype=self.config.schema) as writer:
+                    for chunk in chunks:
+                        writer.write(self.clean_chunk(chunk))
+                logger.info(f"Cleaned data ({writer.rows} rows) streamed to {cleaned_data_path}")
+                return None
+
+            data = self.clean_chunk(read_table(self.config.data_path, dtype=self.config.schema,
+                                               na_values=self.config.na_values))
+            write_table(data, cleaned_data_path, dtype=self.config.schema)
             logger.info(f"Cleaned data saved at {cleaned_data_path}")
             
             return data
         
         except Exception as e:
             logger.exception(e)
-            raise e
\ No newline at end of file
+            raise e
+
+    def update_store(self) -> list:
+        """
+        Cleans the daily delta files that are not in the cleaned store yet, or
+        changed since they were stored, and writes each as one date partition.
+
+        Rows keep their customerID; a customer listed twice in one delta keeps
+        its last row, and readers of the store keep the latest day's row of
+        every customer. Partitions already in the store are not reread.
+
+        Returns:
+            list: Partition dates written to the store.
+        """
+        try:
+            incremental = self.config.incremental
+            deltas = list_deltas(incremental.delta_dir, incremental.date_format)
+            sources = delta_sources(deltas, incremental.cleaned_store)
+            pending = pending_partitions(sources, incremental.cleaned_store)
+
+            for date in pending:
+                data = read_table(deltas[date], dtype=self.config.schema, na_values=self.config.na_values)
+                data = self.clean_chunk(data, keep_id=True)
+                data = data.drop_duplicates(subset=[incremental.key], keep='last')
+                write_partition(data, incremental.cleaned_store, date, sources[date],
+                                incremental.artifact_format, dtype=self.config.schema)
+                logger.info(f"Delta {date}: {len(data)} cleaned rows added to {incremental.cleaned_store}")
+
+            logger.info(f"Cleaned store up to date, {len(pending)} of {len(deltas)} deltas processed")
+            return pending
+
+        except Exception as e:
+            logger.exception(e)
+            raise e
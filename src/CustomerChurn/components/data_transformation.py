@@ -1,41 +1,107 @@
 import os
+import numpy as np
 import pandas as pd
+from pathlib import Path
 from typing import Union
 from CustomerChurn import logger
 from sklearn.model_selection import train_test_split
-from imblearn.over_sampling import ADASYN
-from imblearn.combine import SMOTEENN
 from CustomerChurn.entity.config_entity import DataTransformationConfig
+from CustomerChurn.utils.features import FeatureEncoder, encode_target
+from CustomerChurn.utils.common import read_table, iter_table, write_table, save_json
+from CustomerChurn.utils.balancing import balance
+from CustomerChurn.utils.partitions import load_manifest, pending_partitions, write_partition, read_partitioned
 
 class DataTransformation:
     def __init__(self, config: DataTransformationConfig):
         self.config = config
+        self.encoder = FeatureEncoder()
+        # Only the columns the encoder needs are read from the cleaned data
+        self.input_columns = self.encoder.input_columns + ['Churn']
     
     def load_data(self) -> pd.DataFrame:
         try:
-            data = pd.read_csv(self.config.data_path)
+            data = read_table(self.config.data_path, columns=self.input_columns, dtype=self.config.schema)
             logger.info("Data loaded successfully.")
             return data
         except Exception as e:
             logger.error(f"Error loading data: {e}")
             raise e
 
-    def encode_data(self, data: pd.DataFrame) -> pd.DataFrame:
+    def iter_encoded_chunks(self):
+        """
+        Streams the cleaned data in chunks through `encode_data` and
+        `feature_engineering`, yielding each encoded chunk.
+        """
+        chunks = iter_table(self.config.data_path, self.config.chunk_size,
+                            columns=self.input_columns, dtype=self.config.schema)
+        for chunk in chunks:
+            yield self.feature_engineering(data=self.encode_data(data=chunk))
+
+    def load_encoded_data(self) -> pd.DataFrame:
+        """
+        Encodes and feature-engineers the cleaned data chunk by chunk, keeping
+        only the compact encoded arrays (no raw string columns) in memory.
+
+        Returns:
+            pd.DataFrame: Encoded features and Churn, ready for balancing.
+        """
         try:
-            binary_columns = ['Partner', 'Dependents', 'PaperlessBilling', 'Churn', 'PhoneService']
-            data[binary_columns] = data[binary_columns].map(lambda x: 1 if x == 'Yes' else 0)
-            
-            data['gender'] = data['gender'].apply(lambda x: 1 if x == 'Female' else 0)
+            chunks = list(self.iter_encoded_chunks())
+            data = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+            logger.info(f"Encoded {len(data)} rows in {len(chunks)} chunks "
+                        f"({data.memory_usage(deep=True).sum() / 2**20:.1f} MB).")
+            return data
+        except Exception as e:
+            logger.error(f"Error during chunked encoding: {str(e)}")
+            raise e
 
-            data['MultipleLines'] = data['MultipleLines'].map({'No phone service': 0, 'No': 0, 'Yes': 1})
+    def load_incremental_data(self) -> pd.DataFrame:
+        """
+        Encodes the cleaned-store partitions that are not in the encoded store
+        yet, then reads the whole encoded store keeping the latest row of every
+        customer.
 
-            internet_service_columns = ['OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies']
-            data[internet_service_columns] = data[internet_service_columns].replace({'No internet service': 0, 'No': 0, 'Yes': 1})
+        Only new or re-delivered daily partitions are encoded; the encoded
+        history is read back as compact arrays.
 
-            categorical_columns = ['InternetService', 'Contract', 'PaymentMethod']
-            data = pd.get_dummies(data, columns=categorical_columns, drop_first=True, dtype='int')
+        Returns:
+            pd.DataFrame: Encoded features and Churn, ready for balancing.
+        """
+        try:
+            incremental = self.config.incremental
+            key = incremental.key
+            dtypes = {key: 'object', **self.encoder.compact_dtypes, 'Churn': np.uint8}
 
-            return data
+            cleaned = load_manifest(incremental.cleaned_store)["partitions"]
+            sources = {date: partition["source"] for date, partition in cleaned.items()}
+            pending = pending_partitions(sources, incremental.encoded_store)
+
+            for date in pending:
+                data = read_partitioned(incremental.cleaned_store, key, columns=self.input_columns,
+                                        dtype=self.config.schema, dates=[date])
+                encoded = self.feature_engineering(data=self.encode_data(data=data))
+                encoded.insert(0, key, data[key].values)
+                write_partition(encoded, incremental.encoded_store, date, sources[date],
+                                incremental.artifact_format, dtype=dtypes)
+            logger.info(f"Encoded {len(pending)} new partitions into {incremental.encoded_store}")
+
+            data = read_partitioned(incremental.encoded_store, key, dtype=dtypes)
+            return data.drop(columns=[key])
+
+        except Exception as e:
+            logger.error(f"Error loading incremental data: {str(e)}")
+            raise e
+
+    def encode_data(self, data: pd.DataFrame) -> pd.DataFrame:
+        try:
+            dtypes = self.encoder.compact_dtypes
+            encoded = pd.DataFrame(self.encoder.encode(data),
+                                   columns=self.encoder.base_columns,
+                                   index=data.index)
+            encoded = encoded.astype({name: dtypes[name] for name in self.encoder.base_columns})
+            encoded['Churn'] = encode_target(data['Churn']).astype(np.uint8)
+
+            return encoded
 
         except Exception as e:
             logger.error(f"Error during data encoding: {str(e)}")
@@ -43,10 +109,10 @@ class DataTransformation:
 
     def feature_engineering(self, data: pd.DataFrame) -> pd.DataFrame:
         try:
-            data['avg_monthly_value'] = data['TotalCharges'] / (data['tenure'] + 1)
-            data['tenure_ratio'] = data['tenure'] / (data['TotalCharges'] + 1)
-            data['service_density'] = data['OnlineSecurity'] + data['OnlineBackup'] + data['TechSupport']
-            data['tenure_MonthlyCharges'] = data['tenure'] * data['MonthlyCharges']
+            dtypes = self.encoder.compact_dtypes
+            engineered = self.encoder.engineer(data)
+            for i, name in enumerate(self.encoder.engineered_columns):
+                data[name] = engineered[:, i].astype(dtypes[name])
             logger.info("Feature engineering complete.")
             return data
         
@@ -54,22 +120,60 @@ class DataTransformation:
             logger.error(f"Error in feature engineering: {str(e)}")
             raise e
 
+    def save_feature_manifest(self):
+        """
+        Writes the feature manifest (column order, dtypes, category lookup tables
+        and engineered-feature formulas) that the web app uses to encode requests
+        exactly like the training data.
+        """
+        try:
+            self.encoder.save_manifest(Path(self.config.feature_manifest))
+            logger.info(f"Feature manifest saved to: {self.config.feature_manifest}")
+        except Exception as e:
+            logger.error(f"Error saving feature manifest: {str(e)}")
+            raise e
+
+    def save_encoded_matrix(self, data: pd.DataFrame):
+        """
+        Writes the encoded data, before any resampling, as a float32 feature
+        matrix and a uint8 target vector in .npy files. Cross-validation
+        memory-maps them, so every fold worker reads the same pages instead of
+        holding its own copy.
+        """
+        try:
+            os.makedirs(self.config.encoded_dir, exist_ok=True)
+            columns = [col for col in data.columns if col != 'Churn']
+            features = np.lib.format.open_memmap(os.path.join(self.config.encoded_dir, "features.npy"),
+                                                 mode="w+", dtype=np.float32, shape=(len(data), len(columns)))
+            for i, col in enumerate(columns):
+                features[:, i] = data[col].to_numpy()
+            features.flush()
+            del features
+            np.save(os.path.join(self.config.encoded_dir, "target.npy"), data['Churn'].to_numpy(np.uint8))
+            logger.info(f"Encoded matrix of {len(data)} rows saved to: {self.config.encoded_dir}")
+        except Exception as e:
+            logger.error(f"Error saving encoded matrix: {str(e)}")
+            raise e
+
     def data_balancing(self, data: pd.DataFrame) -> Union[pd.DataFrame, pd.Series]:
+        """
+        Balances the classes with the method selected in params.yaml
+        (`DataTransformation.balancing_method`, options under
+        `DataTransformation.balancing`).
+
+        Resampling methods return the resampled rows. 'class_weight' keeps the
+        rows as they are and writes balanced class weights that ModelTrainer
+        applies as sample weights; the weights file is written in every mode
+        (weights null unless 'class_weight') so it never goes stale.
+        """
         try:
             X = data.drop('Churn', axis=1)
             y = data['Churn']
             method = self.config.balancing_method
-            
-            if method == 'SMOTEENN':
-                smoteenn = SMOTEENN()
-                X_res, y_res = smoteenn.fit_resample(X, y)
-                logger.info("Data balanced using SMOTEENN.")
-            elif method == 'ADASYN':
-                adasyn = ADASYN()
-                X_res, y_res = adasyn.fit_resample(X, y)
-                logger.info("Data balanced using ADASYN.")
-            else:
-                raise ValueError(f"Invalid method: {method}. Choose either 'SMOTEENN' or 'ADASYN'.")
+
+            X_res, y_res, weights = balance(X, y, method, self.config.balancing)
+            logger.info(f"Data balanced using {method}.")
+            save_json(path=Path(self.config.class_weights), data={"method": method, "weights": weights})
             
             logger.info(f"Before balancing: {y.value_counts()}")
             logger.info(f"After balancing: {y_res.value_counts()}")
@@ -88,14 +192,15 @@ class DataTransformation:
             train, test = train_test_split(data, test_size=0.2, random_state=42, stratify=data['Churn'])
 
             if isinstance(train, pd.DataFrame) and isinstance(test, pd.DataFrame):
-                train.to_csv(os.path.join(self.config.root_dir, "train.csv"), index=False)
-                test.to_csv(os.path.join(self.config.root_dir, "test.csv"), index=False)
+                dtypes = {**self.encoder.compact_dtypes, 'Churn': np.uint8}
+                write_table(train, self.config.train_data_path, dtype=dtypes)
+                write_table(test, self.config.test_data_path, dtype=dtypes)
 
                 logger.info("Data split into training and test sets.")
                 logger.info(f"Train set shape: {train.shape}")
                 logger.info(f"Test set shape: {test.shape}")
-                logger.info(f"Train CSV saved to: {os.path.join(self.config.root_dir, 'train.csv')}")
-                logger.info(f"Test CSV saved to: {os.path.join(self.config.root_dir, 'test.csv')}")
+                logger.info(f"Train set saved to: {self.config.train_data_path}")
+                logger.info(f"Test set saved to: {self.config.test_data_path}")
             else:
                 raise ValueError("Train-test split did not return DataFrames.")
 
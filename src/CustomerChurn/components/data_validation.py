@@ -1,30 +1,188 @@
+import numpy as np
+from pathlib import Path
 import pandas as pd
+from CustomerChurn import logger
+from CustomerChurn.utils.common import read_table, iter_table, save_json
+from CustomerChurn.utils.partitions import list_deltas, delta_sources, pending_partitions
 from CustomerChurn.entity.config_entity import DataValidationConfig
 
+# Distinct offending values kept per column in the report
+MAX_REPORTED_VALUES = 10
+
 class DataValidation:
     def __init__(self, config: DataValidationConfig):
         self.config = config
-        
+
+    def iter_data(self):
+        """
+        Yields the ingested data as a single DataFrame, or as row chunks when
+        streaming is enabled so memory stays bounded on large files.
+
+        Columns are read with the dtypes pandas infers rather than the schema
+        dtypes, so malformed values are counted by the checks instead of
+        failing the read.
+
+        In incremental mode only the delta files not yet encoded by the data
+        transformation stage are read, so each daily delta is validated
+        before it reaches training and history is not checked again.
+        """
+        incremental = self.config.incremental
+        if incremental:
+            deltas = list_deltas(incremental.delta_dir, incremental.date_format)
+            pending = pending_partitions(delta_sources(deltas, incremental.encoded_store),
+                                         incremental.encoded_store)
+            self.validated_deltas = pending
+            for date in pending:
+                yield read_table(deltas[date], na_values=self.config.na_values)
+            return
+
+        if self.config.chunk_size:
+            yield from iter_table(self.config.unzip_data_dir, self.config.chunk_size,
+                                  na_values=self.config.na_values)
+        else:
+            yield read_table(self.config.unzip_data_dir, na_values=self.config.na_values)
+
+    def _expected_kind(self, column: str) -> str:
+        """
+        Returns the numpy kind ('u', 'i', 'f') of a numeric schema dtype, or 'O'
+        for categorical and text columns.
+        """
+        dtype = str(self.config.all_schema[column])
+        if dtype in ("category", "object", "str", "string"):
+            return "O"
+        return np.dtype(dtype).kind
+
+    def _check_column(self, column: str, series: pd.Series, stats: dict):
+        """
+        Updates the running statistics of one column with one chunk of values.
+        """
+        constraints = self.config.constraints.get(column) or {}
+        present = series.notna()
+        stats["nulls"] += int(len(series) - present.sum())
+
+        if self._expected_kind(column) == "O":
+            categories = constraints.get("categories")
+            if categories is not None:
+                invalid = present & ~series.astype(str).isin(categories)
+                stats["invalid_categories"] += int(invalid.sum())
+                self._record_values(stats, series[invalid])
+            return
+
+        values = pd.to_numeric(series, errors="coerce")
+        invalid = present & values.isna()
+        dtype = np.dtype(self.config.all_schema[column])
+        if dtype.kind in "ui":
+            bounds = np.iinfo(dtype)
+            invalid |= values.notna() & ((values % 1 != 0) | (values < bounds.min) | (values > bounds.max))
+        stats["type_errors"] += int(invalid.sum())
+        self._record_values(stats, series[invalid])
+
+        valid = values[present & ~invalid]
+        out_of_range = pd.Series(False, index=valid.index)
+        if "min" in constraints:
+            out_of_range |= valid < constraints["min"]
+        if "max" in constraints:
+            out_of_range |= valid > constraints["max"]
+        stats["out_of_range"] += int(out_of_range.sum())
+        self._record_values(stats, series[out_of_range[out_of_range].index])
+
+        if len(valid):
+            low, high = float(valid.min()), float(valid.max())
+            stats["min"] = low if stats["min"] is None else min(stats["min"], low)
+            stats["max"] = high if stats["max"] is None else max(stats["max"], high)
+
+    @staticmethod
+    def _record_values(stats: dict, values: pd.Series):
+        if len(values) and len(stats["invalid_values"]) < MAX_REPORTED_VALUES:
+            for value in values.astype(str).unique():
+                if value not in stats["invalid_values"]:
+                    stats["invalid_values"].append(value)
+                if len(stats["invalid_values"]) >= MAX_REPORTED_VALUES:
+                    break
+
+    def _column_errors(self, column: str, stats: dict) -> list:
+        errors = []
+        constraints = self.config.constraints.get(column) or {}
+        if stats["nulls"] and not constraints.get("nullable", False):
+            errors.append(f"{column}: {stats['nulls']} missing values")
+        if stats["type_errors"]:
+            errors.append(f"{column}: {stats['type_errors']} values not castable to {stats['dtype']}")
+        if stats["out_of_range"]:
+            errors.append(f"{column}: {stats['out_of_range']} values outside "
+                          f"[{constraints.get('min')}, {constraints.get('max')}]")
+        if stats["invalid_categories"]:
+            errors.append(f"{column}: {stats['invalid_categories']} values outside the allowed categories")
+        return errors
+
+    def build_report(self) -> dict:
+        """
+        Validates the ingested data against schema.yaml in a single pass.
+
+        Every chunk is checked column by column with vectorized operations for
+        the expected column names, dtype compatibility, allowed category sets,
+        numeric ranges and missing values; per-column counts are accumulated
+        across chunks.
+
+        Returns:
+            dict: The validation report, with an overall `validation_status`,
+            the row count, missing/unexpected columns, per-column statistics
+            and a flat list of error messages.
+        """
+        schema_columns = list(self.config.all_schema.keys())
+        report = {
+            "validation_status": None,
+            "rows": 0,
+            "chunks": 0,
+            "missing_columns": [],
+            "unexpected_columns": [],
+            "columns": {},
+            "errors": [],
+        }
+
+        for data in self.iter_data():
+            if report["chunks"] == 0:
+                report["missing_columns"] = [col for col in schema_columns if col not in data.columns]
+                report["unexpected_columns"] = [col for col in data.columns if col not in schema_columns]
+                report["columns"] = {
+                    col: {"dtype": str(self.config.all_schema[col]), "nulls": 0, "type_errors": 0,
+                          "out_of_range": 0, "invalid_categories": 0, "min": None, "max": None,
+                          "invalid_values": []}
+                    for col in schema_columns if col in data.columns
+                }
+            report["chunks"] += 1
+            report["rows"] += len(data)
+
+            for column, stats in report["columns"].items():
+                self._check_column(column, data[column], stats)
+
+        errors = [f"missing column: {col}" for col in report["missing_columns"]]
+        errors += [f"unexpected column: {col}" for col in report["unexpected_columns"]]
+        for column, stats in report["columns"].items():
+            errors += self._column_errors(column, stats)
+
+        report["errors"] = errors
+        if self.config.incremental:
+            # No new deltas is a valid (empty) daily drop
+            report["deltas"] = self.validated_deltas
+            report["validation_status"] = not errors
+        else:
+            report["validation_status"] = report["chunks"] > 0 and not errors
+        return report
+
     def validate_all_columns(self)-> bool:
         try:
-            validation_status = None
-            
-            data = pd.read_csv(self.config.unzip_data_dir)
-            all_cols = list(data.columns)
-            
-            all_schemas = self.config.all_schema.keys()
-            
-            for col in all_cols:
-                if col not in all_schemas:
-                    validation_status = False
-                    with open(self.config.STATUS_FILE, 'w') as f:
-                        f.write(f"validation status: {validation_status}")
-                else:
-                    validation_status = True
-                    with open(self.config.STATUS_FILE, 'w') as f:
-                        f.write(f"validation status: {validation_status}")
-                        
+            report = self.build_report()
+            validation_status = report["validation_status"]
+
+            save_json(path=Path(self.config.report_file), data=report)
+            with open(self.config.STATUS_FILE, 'w') as f:
+                f.write(f"validation status: {validation_status}")
+
+            for error in report["errors"]:
+                logger.error(f"Data validation: {error}")
+            logger.info(f"Validated {report['rows']} rows, status: {validation_status}")
+
             return validation_status
-        
+
         except Exception as e:
-            raise e
\ No newline at end of file
+            raise e
@@ -0,0 +1,216 @@
+import os
+import math
+import time
+import warnings
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+from CustomerChurn import logger
+from CustomerChurn.entity.config_entity import HyperparameterSearchConfig
+from CustomerChurn.components.model_trainer import MODELS, PARALLEL_MODELS
+from CustomerChurn.utils.balancing import balance
+from CustomerChurn.utils.common import save_json
+from CustomerChurn.utils.features import FeatureEncoder
+from CustomerChurn.utils.resources import available_cpus, resolve_n_jobs
+from pathlib import Path
+
+# Training and validation data of a pool worker, set once per process
+_data = {}
+
+
+def _init_worker(X_fit, y_fit, w_fit, X_val, y_val):
+    _data.update(X_fit=X_fit, y_fit=y_fit, w_fit=w_fit, X_val=X_val, y_val=y_val)
+
+
+def _run_trial(model_name: str, params: dict, early_stopping_rounds: int) -> dict:
+    """
+    Fits one configuration on the worker's training split and scores it
+    (ROC AUC) on the validation split. XGBoost stops adding rounds once the
+    validation AUC has not improved for `early_stopping_rounds` rounds.
+    """
+    start = time.perf_counter()
+    fit_params = {"sample_weight": _data["w_fit"]}
+    if model_name == "XGBClassifier":
+        params = {**params, "early_stopping_rounds": early_stopping_rounds, "eval_metric": "auc"}
+        fit_params.update(eval_set=[(_data["X_val"], _data["y_val"])], verbose=False)
+
+    model = MODELS[model_name](**params)
+    with warnings.catch_warnings():
+        # Low budgets of max_iter are expected not to converge
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        model.fit(_data["X_fit"], _data["y_fit"], **fit_params)
+
+    result = {
+        "score": float(roc_auc_score(_data["y_val"], model.predict_proba(_data["X_val"])[:, 1])),
+        "seconds": time.perf_counter() - start,
+    }
+    if model_name == "XGBClassifier":
+        result["best_iteration"] = int(model.best_iteration)
+    return result
+
+
+def sample_params(space: dict, rng: np.random.Generator) -> dict:
+    """
+    Draws one configuration from a search space of the form
+    `{param: {type: int|float|choice, low, high, log, values}}`.
+    """
+    params = {}
+    for name, spec in space.items():
+        kind = spec["type"]
+        if kind == "choice":
+            value = spec["values"][rng.integers(len(spec["values"]))]
+        elif kind == "int":
+            value = int(rng.integers(spec["low"], spec["high"] + 1))
+        elif kind == "float":
+            if spec.get("log"):
+                value = float(np.exp(rng.uniform(np.log(spec["low"]), np.log(spec["high"]))))
+            else:
+                value = float(rng.uniform(spec["low"], spec["high"]))
+        else:
+            raise ValueError(f"Invalid search space type for {name}: {kind}")
+        params[name] = value.item() if isinstance(value, np.generic) else value
+    return params
+
+
+def halving_rungs(n_trials: int, min_resource: int, max_resource: int, eta: int) -> list:
+    """
+    Returns the (configurations kept, resource per configuration) of every
+    rung of successive halving: each rung keeps the best 1/eta of the
+    previous one and gives it eta times the resource, up to max_resource.
+    """
+    rungs = []
+    n, resource = n_trials, min_resource
+    while True:
+        rungs.append((n, min(resource, max_resource)))
+        if resource >= max_resource or n == 1:
+            return rungs
+        n, resource = max(1, math.ceil(n / eta)), resource * eta
+
+
+class HyperparameterSearch:
+    def __init__(self, config: HyperparameterSearchConfig):
+        """
+        Initializes the HyperparameterSearch class with configuration settings.
+
+        Args:
+            config (HyperparameterSearchConfig): Configuration object containing
+            the training data, search spaces, resources and halving settings.
+        """
+        self.config = config
+
+    def load_data(self):
+        """
+        Splits the un-resampled encoded data (as written for cross-validation)
+        into a fit and a stratified validation part. Only the fit part is
+        resampled with the DataTransformation balancing method, so no
+        synthetic rows reach the rows configurations are scored on; with
+        'class_weight' its rows get the balanced class weights instead.
+        """
+        encoder = FeatureEncoder.load(self.config.feature_manifest)
+        dtypes = {name: encoder.compact_dtypes[name] for name in encoder.feature_columns}
+        features = np.load(os.path.join(self.config.encoded_dir, "features.npy"), mmap_mode="r")
+        target = np.load(os.path.join(self.config.encoded_dir, "target.npy"))
+        fit_idx, val_idx = train_test_split(
+            np.arange(len(target)), test_size=self.config.validation_size, stratify=target,
+            random_state=self.config.random_state)
+
+        def frame(rows):
+            return pd.DataFrame(features[rows], columns=list(dtypes)).astype(dtypes)
+
+        X_fit, y_fit = frame(fit_idx), pd.Series(target[fit_idx], name=self.config.target_column)
+        X_val, y_val = frame(val_idx), pd.Series(target[val_idx], name=self.config.target_column)
+        X_fit, y_fit, weights = balance(X_fit, y_fit, self.config.balancing_method, self.config.balancing)
+        w_fit = y_fit.map(weights).to_numpy() if weights else None
+        logger.info(f"Search data balanced using {self.config.balancing_method}: "
+                    f"{len(fit_idx)} -> {len(X_fit)} fit rows")
+        return X_fit, y_fit, w_fit, X_val, y_val
+
+    def search_model(self, executor: ProcessPoolExecutor, model_name: str, rng: np.random.Generator,
+                     threads: int) -> dict:
+        """
+        Runs successive halving for one model family.
+
+        `n_trials` configurations are drawn from the family's search space
+        and trained with the smallest resource (trees, boosting rounds or
+        iterations). Only the best 1/eta survive to the next rung, trained
+        with eta times the resource, so poor configurations are dropped after
+        a few trees. The trials of a rung run in parallel in the process pool.
+
+        Returns:
+            dict: Best params, their validation score and every trial run.
+        """
+        resource = self.config.resources[model_name]
+        base = dict(self.config.model_params.get(model_name, {}))
+        base.pop("nthread", None)
+        if model_name in PARALLEL_MODELS:
+            base["n_jobs"] = threads
+        if "random_state" in MODELS[model_name]().get_params():
+            base.setdefault("random_state", self.config.random_state)
+
+        candidates = [sample_params(self.config.search_space.get(model_name, {}), rng)
+                      for _ in range(self.config.n_trials)]
+        rungs = halving_rungs(self.config.n_trials, resource["min"], resource["max"], self.config.eta)
+        trials = []
+        for rung, (keep, budget) in enumerate(rungs):
+            candidates = candidates[:keep]
+            configs = [{**base, **candidate, resource["param"]: budget} for candidate in candidates]
+            futures = [executor.submit(_run_trial, model_name, params, self.config.early_stopping_rounds)
+                       for params in configs]
+            results = [future.result() for future in futures]
+
+            for params, result in zip(configs, results):
+                trials.append({"rung": rung, "params": params, **result})
+            order = np.argsort([-result["score"] for result in results], kind="stable")
+            candidates = [candidates[i] for i in order]
+            configs, results = [configs[i] for i in order], [results[i] for i in order]
+            logger.info(f"{model_name} rung {rung}: {len(configs)} configurations with "
+                        f"{resource['param']}={budget}, best AUC {results[0]['score']:.4f}")
+
+        best, result = configs[0], results[0]
+        if "best_iteration" in result:
+            # Train the final model only as long as it kept improving
+            best = {**best, resource["param"]: result["best_iteration"] + 1}
+        best = {name: value for name, value in best.items() if name not in ("n_jobs", "random_state")}
+        return {"params": best, "score": result["score"], "trials": trials}
+
+    def search(self):
+        """
+        Searches the hyperparameters of every configured model family and
+        writes the best params of each family, and the overall best family,
+        to `best_params_file` for ModelTrainer; every trial is written to
+        `trials_file`.
+        """
+        try:
+            start = time.perf_counter()
+            X_fit, y_fit, w_fit, X_val, y_val = self.load_data()
+            workers = resolve_n_jobs(self.config.n_jobs)
+            # Split the cores between trials, so the pool does not oversubscribe them
+            threads = max(1, available_cpus() // workers)
+            rng = np.random.default_rng(self.config.random_state)
+            logger.info(f"Searching {self.config.models} with {workers} workers, {threads} threads each, "
+                        f"on {len(X_fit)} rows ({len(X_val)} validation rows)")
+
+            results = {}
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(X_fit, y_fit, w_fit, X_val, y_val)) as executor:
+                for model_name in self.config.models:
+                    if model_name not in MODELS:
+                        raise ValueError(f"Invalid model name: {model_name}")
+                    results[model_name] = self.search_model(executor, model_name, rng, threads)
+
+            best_model = max(results, key=lambda name: results[name]["score"])
+            save_json(path=Path(self.config.best_params_file), data={
+                "best_model": best_model,
+                "models": {name: {"params": result["params"], "score": result["score"]}
+                           for name, result in results.items()},
+            })
+            save_json(path=Path(self.config.trials_file),
+                      data={name: result["trials"] for name, result in results.items()})
+            logger.info(f"Hyperparameter search finished in {time.perf_counter() - start:.1f}s, best model "
+                        f"{best_model} (AUC {results[best_model]['score']:.4f}): {results[best_model]['params']}")
+        except Exception as e:
+            logger.error(f"Error during hyperparameter search: {e}")
+            raise e
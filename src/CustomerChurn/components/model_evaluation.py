@@ -1,14 +1,86 @@
 from pathlib import Path 
 import os
+import numpy as np
 import pandas as pd 
-from sklearn.metrics import accuracy_score, f1_score, recall_score, roc_auc_score, confusion_matrix, ConfusionMatrixDisplay, RocCurveDisplay
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold
 import joblib
-import mlflow
-import matplotlib.pyplot as plt
 from CustomerChurn.entity.config_entity import ModelEvaluationConfig
-from CustomerChurn.utils.common import save_json
+from CustomerChurn.components.model_trainer import PARALLEL_MODELS
+from CustomerChurn.utils.balancing import balance
+from CustomerChurn.utils.common import save_json, read_table
+from CustomerChurn.utils.compiled_model import CompiledModel
+from CustomerChurn.utils.features import FeatureEncoder
+from CustomerChurn.utils.metrics import (score_curve, threshold_metrics, roc_pr_curves, best_f1_threshold,
+                                         calibration, downsample)
+from CustomerChurn.utils.plots import start_plot_process
+from CustomerChurn.utils.resources import available_cpus, resolve_n_jobs
 from CustomerChurn import logger
-from CustomerChurn.utils.mlflow import setup_mlflow
+from CustomerChurn.utils.tracking import Tracker
+
+# Plots written to the evaluation root directory
+PLOT_NAMES = ["confusion_matrix", "roc_curve", "pr_curve", "calibration_curve"]
+
+
+def positive_scores(model, X) -> np.ndarray:
+    """
+    Returns the positive-class probabilities of a model, or its predicted
+    labels when it has no predict_proba.
+    """
+    try:
+        return model.predict_proba(X)[:, 1]
+    except AttributeError:
+        return np.asarray(model.predict(X), dtype=np.float64)
+
+
+def _cv_fold(fold, encoded_dir, dtypes, model, cv, balancing_method, balancing, threshold):
+    """
+    Fits and scores one cross-validation fold in a worker process.
+
+    The encoded matrix is memory-mapped, so the workers share one read-only
+    copy through the page cache; only the rows of the fold are materialised.
+    The fold's training rows are resampled, the held-out rows never are.
+
+    Parameters
+    ----------
+    fold : int
+        Index of the fold to score.
+    encoded_dir : str
+        Directory holding features.npy and target.npy.
+    dtypes : dict
+        Column -> dtype of the features, in matrix column order.
+    model : estimator
+        Unfitted copy of the trained model.
+    cv : StratifiedKFold
+        Fold splitter, identical in every worker.
+    balancing_method : str
+        Balancing applied to the training rows of the fold.
+    balancing : dict
+        Options of the balancing method.
+    threshold : float
+        Probability at or above which a row is predicted to churn.
+
+    Returns
+    -------
+    dict
+        Metric name -> score of the fold.
+    """
+    features = np.load(os.path.join(encoded_dir, "features.npy"), mmap_mode="r")
+    target = np.load(os.path.join(encoded_dir, "target.npy"), mmap_mode="r")
+    train_idx, test_idx = list(cv.split(np.zeros(len(target)), target))[fold]
+
+    def frame(rows):
+        return pd.DataFrame(features[rows], columns=list(dtypes)).astype(dtypes)
+
+    X_train, y_train = frame(train_idx), pd.Series(target[train_idx], name="Churn")
+    X_train, y_train, weights = balance(X_train, y_train, balancing_method, balancing)
+    sample_weight = y_train.map(weights).to_numpy() if weights else None
+    model.fit(X_train, y_train, sample_weight=sample_weight)
+
+    X_test, y_test = frame(test_idx), target[test_idx]
+    return ModelEvaluation.eval_metrics(y_test, positive_scores(model, X_test), threshold)
+
 
 class ModelEvaluation:
     def __init__(self, config: ModelEvaluationConfig):
@@ -22,48 +94,173 @@ class ModelEvaluation:
         """
         
         self.config = config
-        setup_mlflow()
+        self.tracker = Tracker(config.tracking)
 
-    def eval_metrics(self, actual, pred, proba):
+    @staticmethod
+    def eval_metrics(actual, proba, threshold=0.5, curve=None):
         """
         Evaluate performance metrics for model predictions.
 
+        Labels are derived from the probabilities (churn at or above `threshold`),
+        and every metric is read off a single sort of the probabilities.
+
+        Parameters
+        ----------
+        actual : array-like
+            True labels of the test data.
+        proba : array-like
+            Predicted probabilities for the positive class.
+        threshold : float
+            Probability at or above which a row is predicted to churn.
+        curve : dict, optional
+            `score_curve` of `actual` and `proba`, when already computed.
+
+        Returns
+        -------
+        dict
+            accuracy, f1_score, recall_score and precision_score at the
+            threshold, ROC AUC (auc_score) and PR AUC (pr_auc, the average
+            precision).
+        """
+        curve = curve if curve is not None else score_curve(actual, proba)
+        at_threshold = threshold_metrics(curve, [threshold])
+        curves = roc_pr_curves(curve)
+        return {
+            "accuracy": float(at_threshold["accuracy"][0]),
+            "f1_score": float(at_threshold["f1"][0]),
+            "recall_score": float(at_threshold["recall"][0]),
+            "precision_score": float(at_threshold["precision"][0]),
+            "auc_score": curves["roc_auc"],
+            "pr_auc": curves["pr_auc"],
+        }
+
+    def curves_report(self, actual, proba, curve):
+        """
+        Build the curves report: confusion matrix at the threshold, ROC and
+        precision-recall curves, a threshold sweep, the F1-optimal threshold
+        and calibration, all from the one sorted `curve`.
+
         Parameters
         ----------
         actual : array-like
             True labels of the test data.
-        pred : array-like
-            Predicted labels by the model.
         proba : array-like
             Predicted probabilities for the positive class.
+        curve : dict
+            `score_curve` of `actual` and `proba`.
 
         Returns
         -------
-        accuracy : float
-            Ratio of correctly predicted labels to total labels.
-        f1 : float
-            F1 score, the harmonic mean of precision and recall.
-        recall : float
-            Recall score, the ratio of true positives to actual positives.
-        auc : float
-            Area Under the Receiver Operating Characteristic Curve (ROC AUC).
+        dict
+            JSON-serialisable report; curves are downsampled to at most
+            `max_curve_points` points.
         """
+        at_threshold = threshold_metrics(curve, [self.config.threshold])
+        curves = roc_pr_curves(curve)
+        fpr, tpr = downsample(self.config.max_curve_points, curves["fpr"], curves["tpr"])
+        precision, recall = downsample(self.config.max_curve_points, curves["precision"], curves["recall"])
+
+        sweep_thresholds = np.round(np.arange(self.config.sweep_step, 1.0, self.config.sweep_step), 6)
+        sweep = threshold_metrics(curve, sweep_thresholds)
+        bins = calibration(actual, proba, self.config.calibration_bins)
 
-        accuracy = accuracy_score(actual, pred)
-        f1 = f1_score(actual, pred)
-        recall = recall_score(actual, pred)
-        auc = roc_auc_score(actual, proba)
-        return accuracy, f1, recall, auc
+        return {
+            "threshold": self.config.threshold,
+            "confusion_matrix": [[int(at_threshold["tn"][0]), int(at_threshold["fp"][0])],
+                                 [int(at_threshold["fn"][0]), int(at_threshold["tp"][0])]],
+            "roc": {"fpr": fpr.tolist(), "tpr": tpr.tolist(), "auc": curves["roc_auc"]},
+            "pr": {"precision": precision.tolist(), "recall": recall.tolist(), "auc": curves["pr_auc"]},
+            "threshold_sweep": [{name: float(values[i]) for name, values in sweep.items()}
+                                for i in range(len(sweep_thresholds))],
+            "best_f1": best_f1_threshold(curve),
+            "calibration": {name: value.tolist() if isinstance(value, np.ndarray) else value
+                            for name, value in bins.items()},
+        }
     
+    def check_compiled_model(self, X_test, y_proba, max_rows=10000, tolerance=1e-4):
+        """
+        Verify that the compiled model bundle reproduces the trained model.
+
+        Parameters
+        ----------
+        X_test : pd.DataFrame
+            Test features.
+        y_proba : array-like
+            Positive-class probabilities from the trained model.
+        max_rows : int
+            Number of leading test rows scored with the compiled model.
+        tolerance : float
+            Largest allowed absolute probability difference.
+
+        Raises
+        ------
+        ValueError
+            If the compiled model disagrees with the trained model.
+        """
+
+        compiled_model = CompiledModel.load(self.config.compiled_model_path)
+        compiled_proba = compiled_model.predict_proba(X_test.iloc[:max_rows])[:, 1]
+        max_diff = float(abs(compiled_proba - y_proba[:max_rows]).max()) if len(compiled_proba) else 0.0
+
+        logger.info(f"Compiled model max probability difference: {max_diff:.2e}")
+        if max_diff > tolerance:
+            raise ValueError(f"Compiled model deviates from the trained model by {max_diff:.2e}")
+
+    def cross_validate(self):
+        """
+        Score the trained model's configuration with stratified k-fold
+        cross-validation on the un-resampled encoded data.
+
+        Every fold refits an unfitted copy of the trained model in a worker
+        process. Resampling (`DataTransformation.balancing_method`) is applied
+        to the training rows of the fold only, so no synthetic rows reach the
+        scored rows. The cores are split between the fold workers.
+
+        Returns
+        -------
+        dict
+            Mean and standard deviation of every metric from `eval_metrics`,
+            and the scores of each fold.
+        """
+        cv_config = self.config.cross_validation
+        encoder = FeatureEncoder.load(self.config.feature_manifest)
+        dtypes = {name: encoder.compact_dtypes[name] for name in encoder.feature_columns}
+
+        model = clone(joblib.load(self.config.model_path))
+        workers = min(resolve_n_jobs(cv_config["n_jobs"]), cv_config["folds"])
+        if type(model).__name__ in PARALLEL_MODELS:
+            model.set_params(n_jobs=max(1, available_cpus() // workers))
+        cv = StratifiedKFold(n_splits=cv_config["folds"], shuffle=True, random_state=cv_config["random_state"])
+
+        logger.info(f"Cross-validating {type(model).__name__} over {cv_config['folds']} folds "
+                    f"with {workers} workers")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_cv_fold, fold, self.config.encoded_dir, dtypes, model, cv,
+                                       self.config.balancing_method, self.config.balancing,
+                                       self.config.threshold)
+                       for fold in range(cv_config["folds"])]
+            folds = [future.result() for future in futures]
+
+        scores = {name: np.array([fold[name] for fold in folds]) for name in folds[0]}
+        return {
+            "folds": cv_config["folds"],
+            "balancing_method": self.config.balancing_method,
+            "mean": {name: float(values.mean()) for name, values in scores.items()},
+            "std": {name: float(values.std()) for name, values in scores.items()},
+            "per_fold": folds,
+        }
+
     def save_results(self):
         """
-        Evaluate model on test data, save metrics and visualizations.
+        Evaluate model on test data, save metrics, curves and visualizations.
 
-        This method reads test data and model from the specified paths in the 
-        configuration, evaluates the model's performance on the test data by 
-        calculating various metrics such as accuracy, F1 score, recall, and AUC. 
-        It saves these metrics to a JSON file. Additionally, it generates and 
-        saves a confusion matrix and ROC curve plot as visualizations.
+        The model scores the test data once (predict_proba); labels, the
+        confusion matrix, ROC and precision-recall curves, the threshold
+        sweep and calibration are all derived from a single sort of those
+        probabilities. Metrics go to `metric_file_name` and the curves to
+        `curves_file_name`. When plots are enabled they are rendered in a
+        background process (Agg backend) while cross-validation runs;
+        otherwise plots left over from an earlier run are removed.
 
         Exceptions:
             AttributeError: If the model does not support probability predictions, 
@@ -73,54 +270,66 @@ class ModelEvaluation:
             Information about successful saving of evaluation metrics and visualizations.
         """
 
-        test_data = pd.read_csv(self.config.test_data_path)
+        dtypes = {**FeatureEncoder.load(self.config.feature_manifest).compact_dtypes,
+                  self.config.target_column: 'uint8'}
+        test_data = read_table(self.config.test_data_path, dtype=dtypes)
         model = joblib.load(self.config.model_path)
 
         X_test = test_data.drop([self.config.target_column], axis=1)
-        y_test = test_data[self.config.target_column]  
+        y_test = test_data[self.config.target_column].to_numpy()
 
-        y_pred = model.predict(X_test)
+        y_proba = positive_scores(model, X_test)
 
-        # Handle probability output
-        try:
-            y_proba = model.predict_proba(X_test)[:, 1]
-        except AttributeError:
-            y_proba = y_pred  # Fallback if model has no predict_proba
+        if self.config.use_compiled_model and os.path.isdir(self.config.compiled_model_path):
+            self.check_compiled_model(X_test, y_proba)
 
-        # Calculate metrics
-        accuracy, f1, recall, auc = self.eval_metrics(y_test, y_pred, y_proba)
+        # Calculate metrics and curves from one sort of the probabilities
+        curve = score_curve(y_test, y_proba)
+        scores = self.eval_metrics(y_test, y_proba, self.config.threshold, curve)
+        report = self.curves_report(y_test, y_proba, curve)
+        scores.update({
+            "brier_score": report["calibration"]["brier_score"],
+            "calibration_error": report["calibration"]["ece"],
+            "best_f1_threshold": report["best_f1"]["threshold"],
+        })
 
-        # Save metrics to JSON
-        scores = {
-            "accuracy": accuracy,
-            "f1_score": f1,
-            "recall_score": recall,
-            "auc_score": auc
-        }
         save_json(path=Path(self.config.metric_file_name), data=scores)
-        
-        # Confusion Matrix
-        cm = confusion_matrix(y_test, y_pred)
-        disp = ConfusionMatrixDisplay(confusion_matrix=cm)
-        disp.plot(cmap=plt.cm.Blues)
-        cm_path = os.path.join(self.config.root_dir, "confusion_matrix.png")
-        plt.title("Confusion Matrix")
-        plt.savefig(cm_path)
-        plt.close()
-
-        # ROC Curve
-        RocCurveDisplay.from_predictions(y_test, y_proba)
-        roc_path = os.path.join(self.config.root_dir, "roc_curve.png")
-        plt.title("ROC Curve")
-        plt.savefig(roc_path)
-        plt.close()
-
-        logger.info("Evaluation metrics and visualizations saved successfully.")
-
-        with mlflow.start_run(run_name="model_evaluation"):
-            mlflow.log_metrics(scores)
-            mlflow.log_artifact(self.config.metric_file_name)
-            mlflow.log_artifact(cm_path)
-            mlflow.log_artifact(roc_path)
-            mlflow.log_param("target_column", self.config.target_column)
-            mlflow.log_param("test_data_rows", len(X_test))
\ No newline at end of file
+        save_json(path=Path(self.config.curves_file_name), data=report)
+        logger.info(f"Evaluation metrics saved: {scores}")
+
+        plot_paths = {name: os.path.join(self.config.root_dir, f"{name}.png") for name in PLOT_NAMES}
+        plot_process = start_plot_process(report, plot_paths) if self.config.plots else None
+        if plot_process is None:
+            # Plots of an earlier run would no longer match the metrics
+            for path in plot_paths.values():
+                if os.path.exists(path):
+                    os.remove(path)
+
+        cv_scores = {"enabled": False}
+        if self.config.cross_validation["enabled"]:
+            cv_scores = self.cross_validate()
+            logger.info(f"Cross-validation mean: {cv_scores['mean']}, std: {cv_scores['std']}")
+        save_json(path=Path(self.config.cv_metric_file_name), data=cv_scores)
+
+        if plot_process is not None:
+            plot_process.join()
+            if plot_process.exitcode != 0:
+                raise RuntimeError(f"Plot rendering failed with exit code {plot_process.exitcode}")
+            logger.info("Evaluation visualizations saved successfully.")
+
+        with self.tracker.start_run(run_name="model_evaluation"):
+            self.tracker.log_metrics(scores)
+            self.tracker.log_artifact(self.config.metric_file_name)
+            self.tracker.log_artifact(self.config.curves_file_name)
+            if plot_process is not None:
+                for path in plot_paths.values():
+                    self.tracker.log_artifact(path)
+            self.tracker.log_param("target_column", self.config.target_column)
+            self.tracker.log_param("test_data_rows", len(X_test))
+            self.tracker.log_param("threshold", self.config.threshold)
+            if self.config.cross_validation["enabled"]:
+                self.tracker.log_metrics({f"cv_{name}_mean": value for name, value in cv_scores["mean"].items()})
+                self.tracker.log_metrics({f"cv_{name}_std": value for name, value in cv_scores["std"].items()})
+                self.tracker.log_artifact(self.config.cv_metric_file_name)
+
+        self.tracker.close()
\ No newline at end of file
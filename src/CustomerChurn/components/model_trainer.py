@@ -1,24 +1,141 @@
 import pandas as pd 
 import os
+import json
+import time
+import shutil
 import joblib
-import mlflow
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
 from xgboost import XGBClassifier
 from CustomerChurn import logger
 from CustomerChurn.entity.config_entity import ModelTrainerConfig
-from CustomerChurn.utils.common import read_yaml
-from CustomerChurn.utils.mlflow import setup_mlflow
+from CustomerChurn.utils.common import read_yaml, read_table
+from CustomerChurn.utils.artifact_cache import file_md5
+from CustomerChurn.utils.compiled_model import export_model
+from CustomerChurn.utils.features import FeatureEncoder
+from CustomerChurn.utils.hot_model import READY_FILE
+from CustomerChurn.utils.model_registry import ModelRegistry
+from CustomerChurn.utils.tracking import Tracker
+from CustomerChurn.utils.resources import available_cpus, resolve_n_jobs
+
+MODELS = {
+    'LogisticRegression': LogisticRegression,
+    'RandomForestClassifier': RandomForestClassifier,
+    'XGBClassifier': XGBClassifier,
+}
+
+# Models whose fit is spread over `n_jobs` threads
+PARALLEL_MODELS = {'RandomForestClassifier', 'XGBClassifier'}
 
 class ModelTrainer:
     def __init__(self, config: ModelTrainerConfig):
         self.config = config
+
+    def build_model(self):
+        """
+        Builds the configured model with every parameter of its params.yaml
+        section passed through to the estimator, so settings such as
+        `tree_method` or `max_bin` need no code change.
+
+        Parallel models get `n_jobs` from their own section, or else from
+        `ModelTrainer.n_jobs`, resolved against the cores actually available
+        to the process (affinity mask and cgroup CPU quota). An explicit
+        XGBoost `nthread` is left as it is.
+
+        With `ModelTrainer.search_params`, the params found for the model by
+        the hyperparameter_search stage override its params.yaml section.
+
+        Returns:
+            tuple: The unfitted model and the parameters it was built with.
+
+        Raises:
+            ValueError: If the model name is not supported.
+        """
+        model_name = self.config.model
+        if model_name not in MODELS:
+            raise ValueError(f"Invalid model name: {model_name}")
+
+        params = dict(self.config.params)
+        if self.config.search_params and os.path.exists(self.config.best_params_file):
+            with open(self.config.best_params_file) as f:
+                searched = json.load(f)["models"].get(model_name)
+            if searched:
+                params.update(searched["params"])
+                logger.info(f"ModelTrainer.search_params is set: the searched params for {model_name} "
+                            f"(validation AUC {searched['score']:.4f}) override its params.yaml section: "
+                            f"{searched['params']}")
+        if model_name in PARALLEL_MODELS and 'nthread' not in params:
+            params['n_jobs'] = resolve_n_jobs(params.get('n_jobs', self.config.n_jobs))
+        return MODELS[model_name](**params), params
         
+    def save_serving_files(self, model):
+        """
+        Writes the unversioned copy of the model served from `serving_dir`.
+
+        Every file is written under a temporary name and renamed into place,
+        and the READY marker (the md5 of model.joblib) is written last: the
+        web app reloads these files only when the marker changes and checks
+        it against model.joblib, so it never loads a half-written model or a
+        model paired with the compiled bundle of another one.
+        """
+        serving_dir = self.config.serving_dir
+        os.makedirs(serving_dir, exist_ok=True)
+
+        manifest_path = os.path.join(serving_dir, os.path.basename(self.config.feature_manifest))
+        shutil.copyfile(self.config.feature_manifest, manifest_path + ".tmp")
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+        compiled_path = os.path.join(serving_dir, self.config.compiled_model_name)
+        for path in (compiled_path + ".tmp", compiled_path + ".old"):
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+        if self.config.compiled_export:
+            export_model(model, compiled_path + ".tmp")
+        # A directory cannot be replaced in one rename; move the old one aside
+        if os.path.isdir(compiled_path):
+            os.rename(compiled_path, compiled_path + ".old")
+        if self.config.compiled_export:
+            os.rename(compiled_path + ".tmp", compiled_path)
+        shutil.rmtree(compiled_path + ".old", ignore_errors=True)
+
+        model_path = os.path.join(serving_dir, self.config.model_name)
+        joblib.dump(model, model_path + ".tmp")
+        os.replace(model_path + ".tmp", model_path)
+
+        ready_path = os.path.join(serving_dir, READY_FILE)
+        with open(ready_path + ".tmp", "w") as f:
+            f.write(file_md5(model_path) + "\n")
+        os.replace(ready_path + ".tmp", ready_path)
+
+    def publish_model(self, metadata: dict = None) -> str:
+        """
+        Makes the model files in `root_dir` the current registry version;
+        running web apps pick it up without a restart. A version holding the
+        same files (e.g. after the pipeline restored this stage's outputs from
+        its cache) is activated again instead of being published twice.
+
+        Returns:
+            str: The current version.
+        """
+        sources = {name: os.path.join(self.config.root_dir, name)
+                   for name in [self.config.model_name,
+                                os.path.basename(self.config.feature_manifest),
+                                self.config.compiled_model_name]
+                   if os.path.exists(os.path.join(self.config.root_dir, name))}
+        registry = ModelRegistry(self.config.registry_dir, self.config.registry_keep_versions)
+        version = registry.find(sources)
+        if version is None:
+            return registry.publish(sources, metadata=metadata)
+        registry.activate(version)
+        return version
+
     def train(self):
-        setup_mlflow()
+        tracker = Tracker(self.config.tracking)
 
-        train_data = pd.read_csv(self.config.train_data_path)
-        test_data = pd.read_csv(self.config.test_data_path)
+        dtypes = {**FeatureEncoder.load(self.config.feature_manifest).compact_dtypes,
+                  self.config.target_column: 'uint8'}
+        train_data = read_table(self.config.train_data_path, dtype=dtypes)
+        test_data = read_table(self.config.test_data_path, dtype=dtypes)
 
         X_train = train_data.drop([self.config.target_column], axis=1)
         X_test = test_data.drop([self.config.target_column], axis=1)
@@ -26,43 +143,57 @@ class ModelTrainer:
         y_test = test_data[self.config.target_column]
 
         model_name = self.config.model
-        params = self.config.params
-
-        if model_name == 'LogisticRegression':
-            model = LogisticRegression(max_iter=params['max_iter'])
-        elif model_name == 'RandomForestClassifier':
-            model = RandomForestClassifier(
-                n_estimators=params['n_estimators'],
-                max_depth=params['max_depth'],
-                min_samples_split=params['min_samples_split'],
-                min_samples_leaf=params['min_samples_leaf'],
-                max_features=params['max_features'],
-                criterion=params['criterion']
-            )
-        elif model_name == 'XGBClassifier':
-            model = XGBClassifier(
-                max_depth=params['max_depth'],
-                learning_rate=params['learning_rate'],
-                n_estimators=params['n_estimators'],
-                subsample=params['subsample'],
-                colsample_bytree=params['colsample_bytree']
-            )
-        else:
-            raise ValueError(f"Invalid model name: {model_name}")
+        model, params = self.build_model()
 
-        logger.info(f"Training {model_name} model with parameters: {params}")  
+        logger.info(f"Training {model_name} model with parameters: {params} "
+                    f"({available_cpus()} cores available)")
+
+        # Class weights from the 'class_weight' balancing mode, applied per row
+        sample_weight = None
+        if os.path.exists(self.config.class_weights):
+            with open(self.config.class_weights) as f:
+                weights = json.load(f)["weights"]
+            if weights:
+                sample_weight = y_train.map({int(cls): w for cls, w in weights.items()}).to_numpy()
+                logger.info(f"Training with class weights: {weights}")
+
+        with tracker.start_run():
+            start = time.perf_counter()
+            model.fit(X_train, y_train, sample_weight=sample_weight)
+            fit_seconds = time.perf_counter() - start
+            rows_per_sec = len(X_train) / fit_seconds if fit_seconds > 0 else float('inf')
+            logger.info(f"{model_name} fitted in {fit_seconds:.2f}s ({rows_per_sec:,.0f} rows/s)")
 
-        with mlflow.start_run():
-            model.fit(X_train, y_train)
             dvc_model_path = os.path.join(self.config.root_dir, self.config.model_name)
             joblib.dump(model, dvc_model_path)
 
-            os.makedirs("saved_models", exist_ok=True)
-            git_model_path = os.path.join("saved_models", self.config.model_name)
-            joblib.dump(model, git_model_path)
+            # Ship the feature manifest next to the model so serving encodes
+            # requests with the exact column layout the model was trained on
+            shutil.copyfile(self.config.feature_manifest,
+                            os.path.join(self.config.root_dir, os.path.basename(self.config.feature_manifest)))
+
+            # Flat NumPy bundle for fast inference; drop a stale one when disabled
+            compiled_path = os.path.join(self.config.root_dir, self.config.compiled_model_name)
+            if os.path.isdir(compiled_path):
+                shutil.rmtree(compiled_path)
+            if self.config.compiled_export:
+                export_model(model, compiled_path)
+
+            self.save_serving_files(model)
+
+            version = self.publish_model(metadata={"model": model_name, "params": params,
+                                                   "train_rows": len(X_train)})
+
+            logger.info(f"{model_name} model trained and saved successfully as version {version}.")
 
-            logger.info(f"{model_name} model trained and saved successfully.")
+            tracker.log_param("chosen_model", model_name)
+            tracker.log_param("model_version", version)
+            tracker.log_param("train_rows", len(X_train))
+            tracker.log_param("test_rows", len(X_test))
+            tracker.log_param("available_cpus", available_cpus())
+            tracker.log_param("n_jobs", params.get('n_jobs', params.get('nthread')))
+            tracker.log_metric("fit_seconds", fit_seconds)
+            tracker.log_metric("train_rows_per_sec", rows_per_sec)
+            tracker.log_params({f"model_{name}": value for name, value in params.items()})
 
-            mlflow.log_param("chosen_model", model_name)
-            mlflow.log_param("train_rows", len(X_train))
-            mlflow.log_param("test_rows", len(X_test))
\ No newline at end of file
+        tracker.close()
@@ -0,0 +1,166 @@
+import os
+import json
+import math
+import time
+import shutil
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from CustomerChurn import logger
+from CustomerChurn.entity.config_entity import SyntheticDataConfig
+from CustomerChurn.utils.common import read_table, write_table
+from CustomerChurn.utils.resources import resolve_n_jobs
+from CustomerChurn.utils.synthetic import PROFILE_VERSION, fit_profile, schema_profile, sample_table
+
+# Bytes copied per read while merging CSV shards
+COPY_BUFFER_SIZE = 1 << 20
+
+
+def shard_rng(seed: int, shard: int) -> np.random.Generator:
+    """
+    Random generator of one shard, derived from the seed and the shard
+    number alone, so the data does not depend on how shards are scheduled.
+    """
+    return np.random.default_rng([seed, shard])
+
+
+def _write_shard(profile: dict, shard: int, first_row: int, n_rows: int, seed: int, path: str) -> int:
+    """
+    Samples one shard and writes it to its own file.
+    """
+    data = sample_table(profile, n_rows, shard_rng(seed, shard), first_row=first_row)
+    write_table(data, Path(path))
+    return n_rows
+
+
+class SyntheticDataGenerator:
+    def __init__(self, config: SyntheticDataConfig):
+        """
+        Generates synthetic customer data shaped like the ingested Telco data.
+
+        Args:
+            config (SyntheticDataConfig): Generator settings and the schema.
+        """
+        self.config = config
+
+    def load_profile(self) -> dict:
+        """
+        Returns the distribution profile: the saved one, else one fitted on
+        `fit_data` (and saved), else a uniform profile from the schema.
+        """
+        try:
+            if os.path.exists(self.config.profile_file):
+                with open(self.config.profile_file) as f:
+                    profile = json.load(f)
+                if profile.get("version") == PROFILE_VERSION:
+                    return profile
+                logger.warning(f"Ignoring synthetic profile of unsupported version {profile.get('version')}")
+
+            if os.path.exists(self.config.fit_data):
+                data = read_table(self.config.fit_data, dtype=self.config.columns, na_values=self.config.na_values)
+                profile = fit_profile(data, self.config.columns, self.config.constraints,
+                                      target=self.config.target_column,
+                                      numeric_bins=self.config.numeric_bins, smoothing=self.config.smoothing)
+                os.makedirs(os.path.dirname(self.config.profile_file) or ".", exist_ok=True)
+                with open(self.config.profile_file, "w") as f:
+                    json.dump(profile, f, indent=4)
+                logger.info(f"Synthetic profile fitted on {len(data)} rows of {self.config.fit_data} "
+                            f"and saved to {self.config.profile_file}")
+                return profile
+
+            logger.warning(f"No synthetic profile or data to fit at {self.config.fit_data}; "
+                           f"sampling uniform values within the schema constraints")
+            return schema_profile(self.config.columns, self.config.constraints)
+
+        except Exception as e:
+            logger.error(f"Error loading synthetic profile: {str(e)}")
+            raise e
+
+    def sample(self, n_rows: int, seed: int = None) -> pd.DataFrame:
+        """
+        Samples rows in memory, e.g. for benchmarks or load tests; equal to
+        the first shard of a generated file with the same seed.
+        """
+        seed = self.config.seed if seed is None else seed
+        return sample_table(self.load_profile(), n_rows, shard_rng(seed, 0))
+
+    def _merge_shards(self, paths: list):
+        """
+        Concatenates the shards into the output file: CSV shards byte by byte
+        without their repeated headers, Parquet shards row group by row group.
+        """
+        output = Path(self.config.output_file)
+        tmp_path = output.with_name(f".{output.name}.tmp")
+        if output.suffix == ".csv":
+            with open(tmp_path, "wb") as out:
+                for i, path in enumerate(paths):
+                    with open(path, "rb") as f:
+                        header = f.readline()
+                        if i == 0:
+                            out.write(header)
+                        shutil.copyfileobj(f, out, COPY_BUFFER_SIZE)
+        else:
+            import pyarrow.parquet as pq
+
+            writer = None
+            for path in paths:
+                shard = pq.ParquetFile(path)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, shard.schema_arrow)
+                for group in range(shard.num_row_groups):
+                    writer.write_table(shard.read_row_group(group))
+            writer.close()
+        os.replace(tmp_path, output)
+
+    def generate(self) -> Path:
+        """
+        Writes `rows` synthetic customers to the output file.
+
+        The rows are split into shards of `shard_rows` that worker processes
+        sample and write in parallel, then merged into one file. Every shard
+        has its own generator seeded from (seed, shard number), so a seed
+        always produces the same file whatever the number of workers.
+
+        Returns:
+            Path: The generated file.
+        """
+        try:
+            start = time.perf_counter()
+            profile = self.load_profile()
+            n_shards = max(1, math.ceil(self.config.rows / self.config.shard_rows))
+            suffix = Path(self.config.output_file).suffix
+            shutil.rmtree(self.config.shard_dir, ignore_errors=True)
+            os.makedirs(self.config.shard_dir, exist_ok=True)
+            os.makedirs(os.path.dirname(self.config.output_file), exist_ok=True)
+
+            shards = []
+            for shard in range(n_shards):
+                first_row = shard * self.config.shard_rows
+                n_rows = min(self.config.shard_rows, self.config.rows - first_row)
+                shards.append((shard, first_row, n_rows, os.path.join(self.config.shard_dir, f"part-{shard:05d}{suffix}")))
+
+            n_jobs = min(resolve_n_jobs(self.config.n_jobs), n_shards)
+            logger.info(f"Generating {self.config.rows:,} synthetic rows in {n_shards} shards "
+                        f"with {n_jobs} workers")
+            if n_jobs > 1:
+                with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                    futures = [pool.submit(_write_shard, profile, shard, first_row, n_rows, self.config.seed, path)
+                               for shard, first_row, n_rows, path in shards]
+                    for future in futures:
+                        future.result()
+            else:
+                for shard, first_row, n_rows, path in shards:
+                    _write_shard(profile, shard, first_row, n_rows, self.config.seed, path)
+
+            self._merge_shards([path for *_, path in shards])
+            shutil.rmtree(self.config.shard_dir, ignore_errors=True)
+
+            seconds = time.perf_counter() - start
+            logger.info(f"Synthetic data ({self.config.rows:,} rows) written to {self.config.output_file} "
+                        f"in {seconds:.1f}s ({self.config.rows / seconds:,.0f} rows/s)")
+            return Path(self.config.output_file)
+
+        except Exception as e:
+            logger.error(f"Error generating synthetic data: {str(e)}")
+            raise e
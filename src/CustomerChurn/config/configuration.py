@@ -1,11 +1,20 @@
+import os
+import pandas as pd
 from CustomerChurn.constants import *
-from CustomerChurn.utils.common import read_yaml, create_directories
+from CustomerChurn.utils.common import read_yaml, create_directories, artifact_path
+from CustomerChurn.entity.config_entity import IncrementalConfig
+from CustomerChurn.entity.config_entity import SyntheticDataConfig
 from CustomerChurn.entity.config_entity import DataIngestionConfig
 from CustomerChurn.entity.config_entity import DataValidationConfig
 from CustomerChurn.entity.config_entity import DataPreprocessingConfig
 from CustomerChurn.entity.config_entity import DataTransformationConfig
+from CustomerChurn.entity.config_entity import TrackingConfig
+from CustomerChurn.entity.config_entity import HyperparameterSearchConfig
 from CustomerChurn.entity.config_entity import ModelTrainerConfig
 from CustomerChurn.entity.config_entity import ModelEvaluationConfig
+from CustomerChurn.entity.config_entity import PipelineRunnerConfig
+from CustomerChurn.entity.config_entity import ServingConfig
+from CustomerChurn.entity.config_entity import BenchmarkConfig
 
 class ConfigurationManager:
     def __init__(
@@ -28,12 +37,137 @@ class ConfigurationManager:
             params (dict): Parameters dictionary.
             schema (dict): Schema dictionary.
         """
+        self.config_filepath = config_filepath
+        self.params_filepath = params_filepath
         self.config = read_yaml(config_filepath)
         self.params = read_yaml(params_filepath)
         self.schema = read_yaml(schema_filepath)
         
         create_directories([self.config.artifacts_root])
+
+    def get_artifact_path(self, path) -> Path:
+        """
+        Returns the path of a data artifact with the suffix of the configured
+        artifact format (csv, parquet or feather).
+        """
+        return artifact_path(path, self.config.get("artifact_format", "csv"))
+
+    def get_schema_dtypes(self) -> dict:
+        """
+        Returns the column dtypes of schema.yaml, with every `category` column
+        that lists its allowed values in CONSTRAINTS typed as one fixed
+        pd.CategoricalDtype. Every chunk, partition and artifact then shares
+        the same categories and codes, which Arrow IPC files require of the
+        dictionaries of all their batches.
+        """
+        constraints = self.schema.get("CONSTRAINTS", {})
+        dtypes = {}
+        for column, dtype in self.schema.COLUMNS.items():
+            categories = (constraints.get(column) or {}).get("categories")
+            if dtype == "category" and categories:
+                dtype = pd.CategoricalDtype(categories=[str(c) for c in categories])
+            dtypes[column] = dtype
+        return dtypes
+
+    def get_chunk_size(self):
+        """
+        Returns the configured streaming chunk size, or None when stages
+        should load whole files into memory.
+        """
+        streaming = self.config.get("streaming")
+        if streaming and streaming.enabled:
+            return int(streaming.chunk_size)
+        return None
         
+    def get_pipeline_runner_config(self) -> PipelineRunnerConfig:
+        """
+        Retrieves and constructs the pipeline runner configuration.
+
+        Returns:
+            PipelineRunnerConfig: An object containing the dvc.yaml stage file,
+            the params and config files, the runner state and report paths, the
+            artifact format, the number of stages run concurrently and the
+            artifact cache settings.
+        """
+        config = self.config.pipeline_runner
+        cache = config.get("cache") or {}
+
+        create_directories([config.root_dir])
+
+        pipeline_runner_config = PipelineRunnerConfig(
+            root_dir=config.root_dir,
+            dvc_file=config.dvc_file,
+            params_file=self.params_filepath,
+            config_file=self.config_filepath,
+            state_file=config.state_file,
+            report_file=config.report_file,
+            artifact_format=self.config.get("artifact_format", "csv"),
+            max_workers=int(config.max_workers),
+            cache_enabled=bool(cache.get("enabled", False)),
+            cache_dir=cache.get("root_dir"),
+            cache_max_size_mb=int(cache.get("max_size_mb", 0)),
+            code_dir=cache.get("code_dir"),
+            cache_config_keys=list(cache.get("config_keys", []))
+        )
+
+        return pipeline_runner_config
+
+    def get_incremental_config(self) -> IncrementalConfig:
+        """
+        Returns the incremental (daily delta) settings, or None when the
+        stages process the monolithic ingested CSV.
+        """
+        config = self.config.get("incremental")
+        if not (config and config.enabled):
+            return None
+
+        return IncrementalConfig(
+            source_dir=config.source_dir,
+            delta_dir=config.delta_dir,
+            date_format=config.date_format,
+            cleaned_store=config.cleaned_store,
+            encoded_store=config.encoded_store,
+            key=config.key,
+            artifact_format=self.config.get("artifact_format", "csv")
+        )
+
+    def get_synthetic_data_config(self) -> SyntheticDataConfig:
+        """
+        Returns the settings of the synthetic data generator. The output file
+        takes the suffix of `synthetic.format` (csv or parquet).
+        """
+        config = self.config.data_ingestion.synthetic
+
+        return SyntheticDataConfig(
+            output_file=artifact_path(config.output_file, config.format),
+            shard_dir=config.shard_dir,
+            profile_file=config.profile_file,
+            fit_data=config.fit_data,
+            rows=int(config.rows),
+            shard_rows=int(config.shard_rows),
+            seed=int(config.seed),
+            n_jobs=int(config.n_jobs),
+            numeric_bins=int(config.numeric_bins),
+            smoothing=float(config.smoothing),
+            columns=dict(self.schema.COLUMNS),
+            constraints=self.schema.get("CONSTRAINTS", {}),
+            na_values=self.schema.get("NA_VALUES", {}),
+            target_column=self.schema.TARGET_COLUMN.name
+        )
+
+    def get_raw_data_path(self, path) -> str:
+        """
+        Returns the path stages read the ingested data from: the generated
+        file with the synthetic source, else the extracted CSV, or its member
+        inside the downloaded archive when extraction is disabled.
+        """
+        ingestion = self.config.data_ingestion
+        if ingestion.get("source", "download") == "synthetic":
+            return str(self.get_synthetic_data_config().output_file)
+        if ingestion.get("extract", True):
+            return path
+        return f"{ingestion.local_data_file}::{Path(path).name}"
+
     def get_data_ingestion_config(self) -> DataIngestionConfig:
         """
         Retrieves and constructs the data ingestion configuration.
@@ -44,8 +178,9 @@ class ConfigurationManager:
 
         Returns:
             DataIngestionConfig: An object containing configuration settings 
-            such as root directory, source URL, local data file path, and 
-            unzip directory for data ingestion.
+            such as root directory, source URL, local data file path, unzip
+            directory, checksum, download parallelism and the archive members
+            to extract for data ingestion.
         """
 
         config = self.config.data_ingestion
@@ -56,7 +191,16 @@ class ConfigurationManager:
             root_dir = config.root_dir,
             source_URL = config.source_URL,
             local_data_file = config.local_data_file,
-            unzip_dir = config.unzip_dir
+            unzip_dir = config.unzip_dir,
+            sha256 = config.get("sha256"),
+            connections = int(config.get("connections", 4)),
+            part_size = int(float(config.get("part_size_mb", 8)) * 2**20),
+            timeout = float(config.get("timeout", 60)),
+            members = list(config.get("members") or []),
+            extract = bool(config.get("extract", True)),
+            incremental = self.get_incremental_config(),
+            synthetic = (self.get_synthetic_data_config()
+                         if config.get("source", "download") == "synthetic" else None)
         )
         
         return data_ingestion_config
@@ -71,8 +215,8 @@ class ConfigurationManager:
 
         Returns:
             DataValidationConfig: An object containing configuration settings 
-            such as root directory, unzip data directory, status file path, and 
-            schema for data validation.
+            such as root directory, unzip data directory, status and report file
+            paths, and the schema and value constraints for data validation.
         """
         config = self.config.data_validation
         schema = self.schema.COLUMNS
@@ -81,9 +225,14 @@ class ConfigurationManager:
         
         data_validation_config = DataValidationConfig(
             root_dir = config.root_dir,
-            unzip_data_dir = config.unzip_data_dir,
+            unzip_data_dir = self.get_raw_data_path(config.unzip_data_dir),
             STATUS_FILE = config.STATUS_FILE,
-            all_schema=schema
+            report_file = config.report_file,
+            all_schema=schema,
+            constraints=self.schema.get("CONSTRAINTS", {}),
+            na_values=self.schema.get("NA_VALUES", {}),
+            chunk_size = self.get_chunk_size(),
+            incremental = self.get_incremental_config()
         )
         
         return data_validation_config
@@ -102,12 +251,18 @@ class ConfigurationManager:
         """
 
         config = self.config.data_preprocessing
+        schema = self.get_schema_dtypes()
         
         create_directories([config.root_dir])
         
         data_preprocessing_config = DataPreprocessingConfig(
             root_dir = config.root_dir,
-            data_path = config.data_path
+            data_path = self.get_raw_data_path(config.data_path),
+            cleaned_data_path = self.get_artifact_path(os.path.join(config.root_dir, "cleaned_data.csv")),
+            schema = schema,
+            na_values = self.schema.get("NA_VALUES", {}),
+            chunk_size = self.get_chunk_size(),
+            incremental = self.get_incremental_config()
         )
         
         return data_preprocessing_config
@@ -120,12 +275,85 @@ class ConfigurationManager:
 
         data_transformation_config = DataTransformationConfig(
             root_dir=config.root_dir,
-            data_path=config.data_path,
-            balancing_method=params.balancing_method
+            data_path=self.get_artifact_path(config.data_path),
+            train_data_path=self.get_artifact_path(os.path.join(config.root_dir, "train.csv")),
+            test_data_path=self.get_artifact_path(os.path.join(config.root_dir, "test.csv")),
+            feature_manifest=config.feature_manifest,
+            schema=self.get_schema_dtypes(),
+            balancing_method=params.balancing_method,
+            balancing=dict(params.get("balancing") or {}),
+            class_weights=config.class_weights,
+            encoded_dir=config.encoded_dir,
+            chunk_size=self.get_chunk_size(),
+            incremental=self.get_incremental_config()
         )
 
         return data_transformation_config
     
+    def get_tracking_config(self) -> TrackingConfig:
+        """
+        Retrieves the experiment tracking settings. Without a `tracking`
+        section nothing is tracked.
+
+        Returns:
+            TrackingConfig: An object containing the tracking backend, its
+            location and autolog settings.
+        """
+        config = self.config.get("tracking") or {}
+
+        tracking_config = TrackingConfig(
+            backend=config.get("backend", "none"),
+            local_dir=config.get("local_dir", "mlruns"),
+            tracking_uri=config.get("tracking_uri"),
+            repo_owner=config.get("repo_owner"),
+            repo_name=config.get("repo_name"),
+            experiment_name=config.get("experiment_name"),
+            autolog=config.get("autolog", False),
+            flush_timeout=config.get("flush_timeout", 300)
+        )
+
+        return tracking_config
+
+    def get_hyperparameter_search_config(self) -> HyperparameterSearchConfig:
+        """
+        Retrieves and constructs the hyperparameter search configuration.
+
+        The params.yaml section of every searched model is passed along as
+        the base params its sampled configurations are layered over, and the
+        DataTransformation balancing settings are applied to the fit split.
+
+        Returns:
+            HyperparameterSearchConfig: An object containing the training data,
+            search spaces, resources and successive halving settings.
+        """
+        config = self.config.hyperparameter_search
+        params = self.params.HyperparameterSearch
+
+        create_directories([config.root_dir])
+
+        hyperparameter_search_config = HyperparameterSearchConfig(
+            root_dir=config.root_dir,
+            encoded_dir=config.encoded_dir,
+            feature_manifest=config.feature_manifest,
+            best_params_file=config.best_params_file,
+            trials_file=config.trials_file,
+            target_column=self.schema.TARGET_COLUMN.name,
+            models=list(params.models),
+            model_params={name: self.params[name].to_dict() for name in params.models if name in self.params},
+            search_space=params.search_space.to_dict(),
+            resources=params.resources.to_dict(),
+            n_trials=params.n_trials,
+            eta=params.eta,
+            validation_size=params.validation_size,
+            early_stopping_rounds=params.early_stopping_rounds,
+            balancing_method=self.params.DataTransformation.balancing_method,
+            balancing=dict(self.params.DataTransformation.get("balancing") or {}),
+            n_jobs=params.n_jobs,
+            random_state=params.random_state
+        )
+
+        return hyperparameter_search_config
+
     def get_model_trainer_config(self) -> ModelTrainerConfig:
         """
         Retrieves and constructs the model trainer configuration.
@@ -148,12 +376,23 @@ class ConfigurationManager:
 
         model_trainer_config = ModelTrainerConfig(
             root_dir=config.root_dir,
-            train_data_path=config.train_data_path,
-            test_data_path=config.test_data_path,
+            train_data_path=self.get_artifact_path(config.train_data_path),
+            test_data_path=self.get_artifact_path(config.test_data_path),
             model_name=config.model_name,
+            compiled_model_name=config.compiled_model_name,
+            feature_manifest=config.feature_manifest,
+            class_weights=config.class_weights,
             target_column=schema.name,
             model=model_type,
-            params=model_params
+            params=model_params,
+            compiled_export=self.params.ModelTrainer.compiled_export,
+            n_jobs=self.params.ModelTrainer.get("n_jobs", -1),
+            best_params_file=self.config.hyperparameter_search.best_params_file,
+            search_params=self.params.ModelTrainer.get("search_params", False),
+            serving_dir=config.serving_dir,
+            registry_dir=self.config.model_registry.root_dir,
+            registry_keep_versions=int(self.config.model_registry.keep_versions),
+            tracking=self.get_tracking_config()
         )
 
         return model_trainer_config
@@ -172,17 +411,92 @@ class ConfigurationManager:
             and target column for model evaluation.
         """
         config = self.config.model_evaluation
+        params = self.params.ModelEvaluation
         schema =  self.schema.TARGET_COLUMN
 
         create_directories([config.root_dir])
 
         model_evaluation_config = ModelEvaluationConfig(
             root_dir=config.root_dir,
-            test_data_path=config.test_data_path,
+            test_data_path=self.get_artifact_path(config.test_data_path),
             model_path = config.model_path,
+            feature_manifest = config.feature_manifest,
+            compiled_model_path = config.compiled_model_path,
             metric_file_name = config.metric_file_name,
-            target_column = schema.name
-           
+            target_column = schema.name,
+            use_compiled_model = self.params.ModelTrainer.compiled_export,
+            encoded_dir = config.encoded_dir,
+            cv_metric_file_name = config.cv_metric_file_name,
+            curves_file_name = config.curves_file_name,
+            threshold = params.threshold,
+            plots = params.plots,
+            sweep_step = params.sweep_step,
+            calibration_bins = params.calibration_bins,
+            max_curve_points = params.max_curve_points,
+            cross_validation = params.cross_validation.to_dict(),
+            balancing_method = self.params.DataTransformation.balancing_method,
+            balancing = dict(self.params.DataTransformation.get("balancing") or {}),
+            tracking = self.get_tracking_config()
+        )
+
+        return model_evaluation_config
+
+    def get_serving_config(self) -> ServingConfig:
+        """
+        Retrieves the settings of the asynchronous scoring server.
+
+        Returns:
+            ServingConfig: An object containing the micro-batching limits, the
+            p99 latency budget, the prediction cache settings, the model
+            registry polled for hot reloads and whether metrics are recorded.
+        """
+        config = self.config.serving
+        cache = config.prediction_cache
+
+        serving_config = ServingConfig(
+            max_batch_size=int(config.micro_batching.max_batch_size),
+            max_wait_ms=float(config.micro_batching.max_wait_ms),
+            latency_budget_ms=float(config.micro_batching.latency_budget_ms),
+            cache_enabled=bool(cache.enabled),
+            cache_max_entries=int(cache.max_entries),
+            cache_ttl_seconds=float(cache.ttl_seconds),
+            cache_max_rows=int(cache.max_rows),
+            registry_dir=Path(self.config.model_registry.root_dir),
+            reload_poll_interval=float(config.model_reload.poll_interval_seconds),
+            warmup_rows=int(config.model_reload.warmup_rows),
+            cache_shared_path=Path(cache.shared_path) if cache.shared_path else None,
+            metrics_enabled=bool(config.get("metrics", {}).get("enabled", True))
+        )
+
+        return serving_config
+
+    def get_benchmark_config(self) -> BenchmarkConfig:
+        """
+        Retrieves the settings of the benchmark suite.
+
+        Returns:
+            BenchmarkConfig: An object containing the synthetic data sizes, the
+            number of timed runs, the model families to train and the stage
+            configurations the benchmarks start from.
+        """
+        config = self.config.benchmark
+
+        create_directories([config.root_dir])
+
+        benchmark_config = BenchmarkConfig(
+            root_dir=config.root_dir,
+            report_file=config.report_file,
+            sizes=[int(size) for size in config.sizes],
+            repeats=int(config.repeats),
+            latency_calls=int(config.latency_calls),
+            models=list(config.models),
+            model_params={name: dict(self.params[name]) for name in config.models},
+            seed=int(config.seed),
+            artifact_format=self.config.get("artifact_format", "csv"),
+            transformation=self.get_data_transformation_config(),
+            trainer=self.get_model_trainer_config(),
+            evaluation=self.get_model_evaluation_config(),
+            synthetic=self.get_synthetic_data_config()
         )
 
-        return model_evaluation_config
\ No newline at end of file
+        return benchmark_config
@@ -1,30 +1,116 @@
 from dataclasses import dataclass
 from pathlib import Path
 
+@dataclass(frozen=True)
+class IncrementalConfig:
+    source_dir: Path
+    delta_dir: Path
+    date_format: str
+    cleaned_store: Path
+    encoded_store: Path
+    key: str
+    artifact_format: str
+
+@dataclass(frozen=True)
+class SyntheticDataConfig:
+    output_file: Path
+    shard_dir: Path
+    profile_file: Path
+    fit_data: Path
+    rows: int
+    shard_rows: int
+    seed: int
+    n_jobs: int
+    numeric_bins: int
+    smoothing: float
+    columns: dict
+    constraints: dict
+    na_values: dict
+    target_column: str
+
 @dataclass(frozen=True)
 class DataIngestionConfig:
     root_dir: Path
     source_URL: str
     local_data_file: Path
     unzip_dir: Path
+    sha256: str = None
+    connections: int = 4
+    part_size: int = 8 * 2**20
+    timeout: float = 60
+    members: list = None
+    extract: bool = True
+    incremental: IncrementalConfig = None
+    synthetic: SyntheticDataConfig = None
 
 @dataclass(frozen=True)
 class DataValidationConfig:
     root_dir: Path
     unzip_data_dir: Path
     STATUS_FILE: str
+    report_file: Path
     all_schema: dict
+    constraints: dict
+    na_values: dict
+    chunk_size: int = None
+    incremental: IncrementalConfig = None
 
 @dataclass(frozen=True)
 class DataPreprocessingConfig:
     root_dir: Path
     data_path: Path
+    cleaned_data_path: Path
+    schema: dict
+    na_values: dict
+    chunk_size: int = None
+    incremental: IncrementalConfig = None
 
 @dataclass(frozen=True)
 class DataTransformationConfig:
     root_dir: Path
     data_path: Path
+    train_data_path: Path
+    test_data_path: Path
+    feature_manifest: Path
+    schema: dict
+    balancing_method: str
+    balancing: dict
+    class_weights: Path
+    encoded_dir: Path
+    chunk_size: int = None
+    incremental: IncrementalConfig = None
+
+@dataclass(frozen=True)
+class TrackingConfig:
+    backend: str
+    local_dir: Path
+    tracking_uri: str
+    repo_owner: str
+    repo_name: str
+    experiment_name: str
+    autolog: bool
+    flush_timeout: float
+
+@dataclass(frozen=True)
+class HyperparameterSearchConfig:
+    root_dir: Path
+    encoded_dir: Path
+    feature_manifest: Path
+    best_params_file: Path
+    trials_file: Path
+    target_column: str
+    models: list
+    model_params: dict
+    search_space: dict
+    resources: dict
+    n_trials: int
+    eta: int
+    validation_size: float
+    early_stopping_rounds: int
     balancing_method: str
+    balancing: dict
+    n_jobs: int
+    random_state: int
 
 @dataclass(frozen=True)
 class ModelTrainerConfig:
@@ -32,14 +118,87 @@ class ModelTrainerConfig:
     train_data_path: Path
     test_data_path: Path
     model_name: str
+    compiled_model_name: str
+    feature_manifest: Path
+    class_weights: Path
     target_column: str
     model: str
     params: dict
+    compiled_export: bool
+    n_jobs: int
+    best_params_file: Path
+    search_params: bool
+    serving_dir: Path
+    registry_dir: Path
+    registry_keep_versions: int
+    tracking: TrackingConfig
 
 @dataclass(frozen=True)
 class ModelEvaluationConfig:
     root_dir: Path
     test_data_path: Path
     model_path: Path
+    feature_manifest: Path
+    compiled_model_path: Path
     metric_file_name: Path
-    target_column: str
\ No newline at end of file
+    target_column: str
+    use_compiled_model: bool
+    encoded_dir: Path
+    cv_metric_file_name: Path
+    curves_file_name: Path
+    threshold: float
+    plots: bool
+    sweep_step: float
+    calibration_bins: int
+    max_curve_points: int
+    cross_validation: dict
+    balancing_method: str
+    balancing: dict
+    tracking: TrackingConfig
+
+@dataclass(frozen=True)
+class PipelineRunnerConfig:
+    root_dir: Path
+    dvc_file: Path
+    params_file: Path
+    config_file: Path
+    state_file: Path
+    report_file: Path
+    artifact_format: str
+    max_workers: int
+    cache_enabled: bool
+    cache_dir: Path
+    cache_max_size_mb: int
+    code_dir: Path
+    cache_config_keys: list
+
+@dataclass(frozen=True)
+class ServingConfig:
+    max_batch_size: int
+    max_wait_ms: float
+    latency_budget_ms: float
+    cache_enabled: bool
+    cache_max_entries: int
+    cache_ttl_seconds: float
+    cache_max_rows: int
+    registry_dir: Path
+    reload_poll_interval: float
+    warmup_rows: int
+    cache_shared_path: Path = None
+    metrics_enabled: bool = True
+
+@dataclass(frozen=True)
+class BenchmarkConfig:
+    root_dir: Path
+    report_file: Path
+    sizes: list
+    repeats: int
+    latency_calls: int
+    models: list
+    model_params: dict
+    seed: int
+    artifact_format: str
+    transformation: DataTransformationConfig
+    trainer: ModelTrainerConfig
+    evaluation: ModelEvaluationConfig
+    synthetic: SyntheticDataConfig
@@ -0,0 +1,472 @@
+import os
+import ast
+import sys
+import json
+import time
+import shlex
+import hashlib
+import argparse
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from CustomerChurn import logger
+from CustomerChurn.config.configuration import ConfigurationManager
+from CustomerChurn.entity.config_entity import PipelineRunnerConfig
+from CustomerChurn.utils.common import read_yaml, save_json, artifact_path
+from CustomerChurn.utils.artifact_cache import ArtifactCache, file_md5
+
+# Seconds between peak-RSS samples of a running stage on Linux
+RSS_POLL_INTERVAL = 0.05
+
+
+def publish_restored_model():
+    """
+    Publishes (or re-activates) the restored model_trainer outputs in the
+    model registry, which is not a cached output: restoring a snapshot of it
+    would delete the versions published since.
+    """
+    from CustomerChurn.components.model_trainer import ModelTrainer
+
+    trainer = ModelTrainer(config=ConfigurationManager().get_model_trainer_config())
+    version = trainer.publish_model(metadata={"model": trainer.config.model, "restored_from_cache": True})
+    logger.info(f"Restored model served as version {version}")
+
+
+# Stages whose outputs need more than copying back after a cache restore
+RESTORE_HOOKS = {"model_trainer": publish_restored_model}
+
+# Opt-in stages, run only while the given params.yaml key is true; otherwise
+# they are left out of the graph and their outs dropped from downstream deps
+OPTIONAL_STAGES = {"hyperparameter_search": "ModelTrainer.search_params"}
+
+
+class PipelineRunner:
+    def __init__(self, config: PipelineRunnerConfig):
+        """
+        Runs the training pipeline stages declared in dvc.yaml as a DAG.
+
+        A stage depends on every stage that produces one of its deps. Stages
+        run as subprocesses as soon as their upstream stages have finished, up
+        to `max_workers` at a time, so independent stages (validation and
+        preprocessing both only read the ingested CSV) run concurrently. A stage
+        is skipped when its fingerprint (command, dep hashes, params values,
+        source of the package modules it imports and selected config.yaml
+        keys) and out hashes all match the state recorded after its last
+        successful run. The imported modules are part of it because dvc.yaml
+        lists only each stage's script as a dep, not the components and utils
+        it imports.
+
+        With the artifact cache enabled, the outputs of every run are also
+        stored under a key built from the stage fingerprint. A stage whose key is cached is restored
+        from the cache instead of being run, so switching params back to an
+        earlier configuration does not recompute anything.
+
+        Stages in OPTIONAL_STAGES whose switch param is false are not run.
+
+        Args:
+            config (PipelineRunnerConfig): The pipeline runner configuration.
+        """
+        self.config = config
+        self.params = read_yaml(Path(config.params_file))
+        self.stages = self.load_stages()
+        self.upstream = self.build_graph()
+        self.state = self.load_state()
+        self.cache = None
+        if config.cache_enabled:
+            self.cache = ArtifactCache(config.cache_dir, config.cache_max_size_mb * 2**20)
+        self._code_files = {}
+
+    def load_stages(self) -> dict:
+        """
+        Reads the stage definitions (cmd, deps, outs, params) from dvc.yaml.
+        """
+        stages = {}
+        for name, stage in read_yaml(Path(self.config.dvc_file)).stages.items():
+            stages[name] = {
+                "cmd": stage.cmd,
+                "deps": [str(dep) for dep in stage.get("deps", [])],
+                # outs may carry options such as `persist`, keep only the paths
+                "outs": [out if isinstance(out, str) else next(iter(out)) for out in stage.get("outs", [])],
+                "params": [param if isinstance(param, str) else dict(param) for param in stage.get("params", [])],
+            }
+
+        for name, key in OPTIONAL_STAGES.items():
+            if name in stages and not self.param(key):
+                disabled = stages.pop(name)
+                for stage in stages.values():
+                    stage["deps"] = [dep for dep in stage["deps"]
+                                     if not any(self._contains(out, dep) for out in disabled["outs"])]
+                logger.info(f"Stage {name} disabled, {key} is false")
+        return stages
+
+    def param(self, key: str):
+        """
+        Returns the value of a dotted params.yaml key, or None if it is not set.
+        """
+        value = self.params
+        for part in key.split("."):
+            value = value.get(part) if value is not None else None
+        return value
+
+    def build_graph(self) -> dict:
+        """
+        Maps every stage to the stages producing its deps.
+
+        Raises:
+            ValueError: If the stage graph has a cycle.
+        """
+        upstream = {name: set() for name in self.stages}
+        for name, stage in self.stages.items():
+            for dep in stage["deps"]:
+                for producer, other in self.stages.items():
+                    if producer != name and any(self._contains(out, dep) for out in other["outs"]):
+                        upstream[name].add(producer)
+
+        visited, visiting = set(), set()
+        def visit(name):
+            if name in visiting:
+                raise ValueError(f"Pipeline stages form a cycle through: {name}")
+            if name not in visited:
+                visiting.add(name)
+                for producer in upstream[name]:
+                    visit(producer)
+                visiting.discard(name)
+                visited.add(name)
+        for name in self.stages:
+            visit(name)
+
+        return upstream
+
+    @staticmethod
+    def _contains(out: str, path: str) -> bool:
+        out, path = Path(out), Path(path)
+        return path == out or out in path.parents
+
+    def resolve(self, path: str) -> Path:
+        """
+        Returns the on-disk path of a dep or out. dvc.yaml lists data
+        artifacts as .csv; with another artifact format they carry its suffix.
+        """
+        path = Path(path)
+        if not path.exists() and path.suffix == ".csv":
+            converted = artifact_path(path, self.config.artifact_format)
+            if converted.exists():
+                return converted
+        return path
+
+    def load_state(self) -> dict:
+        if os.path.exists(self.config.state_file):
+            with open(self.config.state_file) as f:
+                return json.load(f)
+        return {"stages": {}, "files": {}}
+
+    def file_hash(self, path: Path) -> str:
+        """
+        Returns the md5 of a file. Hashes are cached in the runner state by
+        size and modification time, so unchanged files are not reread.
+        """
+        stat = path.stat()
+        key = str(path)
+        cached = self.state["files"].get(key)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["md5"]
+
+        md5 = file_md5(path)
+        self.state["files"][key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "md5": md5}
+        return md5
+
+    def path_hash(self, path: str) -> str:
+        """
+        Returns the hash of a file or directory, or None if it does not exist.
+        A directory hashes the relative paths and hashes of all its files.
+        """
+        path = self.resolve(path)
+        if path.is_file():
+            return self.file_hash(path)
+        if not path.is_dir():
+            return None
+
+        digest = hashlib.md5()
+        for file in sorted(p for p in path.rglob("*") if p.is_file()):
+            digest.update(f"{file.relative_to(path).as_posix()}:{self.file_hash(file)}\n".encode())
+        return digest.hexdigest()
+
+    def params_hash(self, stage: dict) -> str:
+        """
+        Hashes the values of the params keys a stage declares, so a change to
+        one model's params only reruns the stages that read them. Keys are
+        read from params.yaml, or from another YAML file when listed as
+        `{file: [keys]}` as in dvc.yaml.
+        """
+        return self._hash_keys(stage["params"])
+
+    def _hash_keys(self, entries: list) -> str:
+        values = {}
+        for entry in entries:
+            if isinstance(entry, str):
+                entry = {str(self.config.params_file): [entry]}
+            for file, keys in entry.items():
+                params = self.params if file == str(self.config.params_file) else read_yaml(Path(file))
+                for key in keys:
+                    value = params
+                    for part in str(key).split("."):
+                        value = value.get(part) if value is not None else None
+                    values[f"{file}:{key}"] = value.to_dict() if hasattr(value, "to_dict") else value
+        return hashlib.md5(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()
+
+    def fingerprint(self, name: str) -> dict:
+        stage = self.stages[name]
+        return {
+            "cmd": stage["cmd"],
+            "deps": {dep: self.path_hash(dep) for dep in stage["deps"]},
+            "params": self.params_hash(stage),
+            "code": self.code_hash(name),
+            "config": self._hash_keys([{str(self.config.config_file): self.config.cache_config_keys}]),
+        }
+
+    def code_hash(self, name: str) -> str:
+        """
+        Returns the hash of the package modules a stage imports, the code
+        version part of its fingerprint, so editing a module only reruns the
+        stages that use it.
+        """
+        code_dir = Path(self.config.code_dir)
+        digest = hashlib.md5()
+        for file in self.code_files(name):
+            digest.update(f"{file.relative_to(code_dir).as_posix()}:{self.file_hash(file)}\n".encode())
+        return digest.hexdigest()
+
+    def code_files(self, name: str) -> list:
+        """
+        Returns the package source files a stage's `python -m` module imports,
+        directly or through other package modules (including imports inside
+        functions), found by parsing the source. A stage whose command does
+        not run a package module depends on the whole package.
+        """
+        if name in self._code_files:
+            return self._code_files[name]
+
+        code_dir = Path(self.config.code_dir)
+        package = code_dir.name
+        args = shlex.split(self.stages[name]["cmd"])
+        module = args[args.index("-m") + 1] if "-m" in args[:-1] else None
+        if module is None or self._module_file(module) is None:
+            files = sorted(code_dir.rglob("*.py"))
+        else:
+            files, pending = set(), [module]
+            while pending:
+                module = pending.pop()
+                parts = module.split(".")
+                # Importing a module runs the __init__ of every package above it
+                for prefix in [".".join(parts[:i]) for i in range(1, len(parts))] + [module]:
+                    file = self._module_file(prefix)
+                    if file is None or file in files:
+                        continue
+                    files.add(file)
+                    for imported in self._imports(file, prefix):
+                        if imported == package or imported.startswith(package + "."):
+                            pending.append(imported)
+            files = sorted(files)
+
+        self._code_files[name] = files
+        return files
+
+    def _module_file(self, module: str) -> Path:
+        code_dir = Path(self.config.code_dir)
+        parts = module.split(".")
+        if parts[0] != code_dir.name:
+            return None
+        path = code_dir.joinpath(*parts[1:])
+        for file in (path.with_suffix(".py"), path / "__init__.py"):
+            if file.is_file():
+                return file
+        return None
+
+    @staticmethod
+    def _imports(file: Path, module: str) -> list:
+        """
+        Returns the absolute names of the modules a source file imports; for
+        `from x import y`, both x and x.y, since y may be a submodule.
+        """
+        package = module if file.name == "__init__.py" else module.rpartition(".")[0]
+        imported = []
+        for node in ast.walk(ast.parse(file.read_text(), filename=str(file))):
+            if isinstance(node, ast.Import):
+                imported += [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ""
+                if node.level:
+                    parent = package.split(".")[:len(package.split(".")) - node.level + 1]
+                    base = ".".join(parent + ([base] if base else []))
+                imported.append(base)
+                imported += [f"{base}.{alias.name}" for alias in node.names]
+        return imported
+
+    def cache_key(self, name: str, fingerprint: dict) -> str:
+        """
+        Returns the artifact cache key of a stage run: a hash of the stage
+        name and its fingerprint (command, dep hashes, params, code version
+        and the config.yaml keys that change stage outputs).
+        """
+        key = {
+            "stage": name,
+            "fingerprint": fingerprint,
+        }
+        return hashlib.md5(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+    def record(self, name: str, fingerprint: dict):
+        outs = {out: self.path_hash(out) for out in self.stages[name]["outs"]}
+        missing = [out for out, value in outs.items() if value is None]
+        if missing:
+            logger.info(f"Stage {name} did not write the optional outputs {missing}")
+        self.state["stages"][name] = {"fingerprint": fingerprint, "outs": outs}
+
+    def is_up_to_date(self, name: str, fingerprint: dict) -> bool:
+        """
+        A stage is up to date when its fingerprint matches its last run and
+        its outputs are unchanged since then. Outputs the last run did not
+        write (e.g. the evaluation plots with `ModelEvaluation.plots` off)
+        count as unchanged while they stay absent; their params are part of
+        the fingerprint, so turning them back on reruns the stage.
+        """
+        recorded = self.state["stages"].get(name)
+        if recorded is None or recorded["fingerprint"] != fingerprint:
+            return False
+        if any(value is None for value in fingerprint["deps"].values()):
+            return False
+        outs = {out: self.path_hash(out) for out in self.stages[name]["outs"]}
+        return outs == recorded["outs"]
+
+    def run_stage(self, name: str) -> dict:
+        """
+        Runs one stage command in a subprocess.
+
+        Returns:
+            dict: The stage's exit code, wall time in seconds and peak resident
+            set size in MB (None where the platform does not report it).
+        """
+        args = shlex.split(self.stages[name]["cmd"])
+        if args[0] == "python":
+            args[0] = sys.executable
+
+        start = time.perf_counter()
+        process = subprocess.Popen(args)
+        peak_rss_mb = None
+        if hasattr(os, "wait4"):
+            peak_kb = self._poll_peak_rss(process.pid)
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            if not peak_kb:
+                # ru_maxrss also counts the runner memory the child was forked
+                # from; it is in kilobytes on Linux and in bytes on macOS
+                peak_kb = usage.ru_maxrss / 1024 if sys.platform == "darwin" else usage.ru_maxrss
+            peak_rss_mb = round(peak_kb / 1024, 1)
+        else:
+            process.wait()
+
+        return {
+            "returncode": process.returncode,
+            "wall_time_s": round(time.perf_counter() - start, 3),
+            "peak_rss_mb": peak_rss_mb,
+        }
+
+    @staticmethod
+    def _poll_peak_rss(pid: int) -> float:
+        """
+        Samples the high-water RSS (VmHWM, in kB) of a running process from
+        /proc until it exits, without reaping it. Returns None where /proc is
+        not available.
+        """
+        status_file = f"/proc/{pid}/status"
+        peak_kb = None
+        while os.waitid(os.P_PID, pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is None:
+            try:
+                with open(status_file) as f:
+                    for line in f:
+                        if line.startswith("VmHWM:"):
+                            peak_kb = max(peak_kb or 0, int(line.split()[1]))
+                            break
+            except OSError:
+                return peak_kb
+            time.sleep(RSS_POLL_INTERVAL)
+        return peak_kb
+
+    def run(self, force: bool = False) -> dict:
+        """
+        Runs the pipeline, skipping up-to-date stages unless `force` is set.
+
+        Returns:
+            dict: Per-stage status ('ran', 'skipped', 'restored' or 'failed') with wall
+            time and peak RSS, also saved to the runner report file.
+
+        Raises:
+            RuntimeError: If a stage fails. Stages already running are allowed
+            to finish and no further stages are started.
+        """
+        report = {}
+        pending = set(self.stages)
+        running = {}
+        failed = None
+
+        with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
+            while pending or running:
+                ready = [] if failed else sorted(name for name in pending if self.upstream[name].issubset(report))
+                for name in ready:
+                    pending.discard(name)
+                    fingerprint = self.fingerprint(name)
+                    if not force and self.is_up_to_date(name, fingerprint):
+                        logger.info(f">>>>>> stage {name} skipped, inputs unchanged <<<<<<")
+                        report[name] = {"status": "skipped"}
+                        continue
+                    if not force and self.cache and self.cache.restore(self.cache_key(name, fingerprint)):
+                        logger.info(f">>>>>> stage {name} restored from cache <<<<<<")
+                        if name in RESTORE_HOOKS:
+                            RESTORE_HOOKS[name]()
+                        report[name] = {"status": "restored"}
+                        self.record(name, fingerprint)
+                        continue
+                    logger.info(f">>>>>> stage {name} started <<<<<<")
+                    running[executor.submit(self.run_stage, name)] = (name, fingerprint)
+
+                if any(name in report for name in ready):
+                    continue
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, fingerprint = running.pop(future)
+                    result = future.result()
+                    if result.pop("returncode") != 0:
+                        logger.error(f">>>>>> stage {name} failed <<<<<<")
+                        report[name] = {"status": "failed", **result}
+                        self.state["stages"].pop(name, None)
+                        failed = failed or name
+                        continue
+                    logger.info(f">>>>>> stage {name} completed in {result['wall_time_s']}s, "
+                                f"peak RSS {result['peak_rss_mb']} MB <<<<<<")
+                    report[name] = {"status": "ran", **result}
+                    self.record(name, fingerprint)
+                    if self.cache:
+                        outs = [self.resolve(out) for out in self.stages[name]["outs"]]
+                        self.cache.store(self.cache_key(name, fingerprint), outs, stage=name)
+
+        save_json(path=Path(self.config.state_file), data=self.state)
+        save_json(path=Path(self.config.report_file), data=report)
+        if failed:
+            raise RuntimeError(f"Pipeline stage failed: {failed}")
+        return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the training pipeline stages from dvc.yaml.")
+    parser.add_argument("--force", action="store_true", help="Rerun every stage even if its inputs are unchanged.")
+    args = parser.parse_args()
+
+    try:
+        config = ConfigurationManager()
+        runner = PipelineRunner(config=config.get_pipeline_runner_config())
+        runner.run(force=args.force)
+    except Exception as e:
+        logger.exception(e)
+        raise e
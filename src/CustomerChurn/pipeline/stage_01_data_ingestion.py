@@ -1,5 +1,6 @@
 from CustomerChurn.config.configuration import ConfigurationManager
 from CustomerChurn.components.data_ingestion import DataIngestion
+from CustomerChurn.components.synthetic_data import SyntheticDataGenerator
 from CustomerChurn import logger
 
 STAGE_NAME = "Data Ingestion stage"
@@ -21,13 +22,19 @@ class DataIngestionTrainingPipeline:
         It is responsible for orchestrating the data ingestion process by creating 
         a ConfigurationManager object, retrieving the data ingestion configuration, 
         creating a DataIngestion object, and calling its download_file and 
-        extract_zip_file methods.
+        extract_zip_file methods, ingest_deltas in incremental mode, or generates
+        synthetic data when data_ingestion.source is synthetic.
         """
         config = ConfigurationManager()
         data_ingestion_config = config.get_data_ingestion_config()
         data_ingestion = DataIngestion(config=data_ingestion_config)
-        data_ingestion.download_file()
-        data_ingestion.extract_zip_file()
+        if data_ingestion_config.incremental:
+            data_ingestion.ingest_deltas()
+        elif data_ingestion_config.synthetic:
+            SyntheticDataGenerator(config=data_ingestion_config.synthetic).generate()
+        else:
+            data_ingestion.download_file()
+            data_ingestion.extract_zip_file()
         
 
 if __name__ == "__main__":
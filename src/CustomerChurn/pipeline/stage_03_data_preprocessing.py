@@ -1,7 +1,6 @@
 from CustomerChurn.config.configuration import ConfigurationManager
 from CustomerChurn.components.data_preprocessing import DataPreprocessing
 from CustomerChurn import logger
-from pathlib import Path
 
 STAGE_NAME = "Data Preprocessing stage"
 
@@ -21,21 +20,23 @@ class DataPreprocessingTrainingPipeline:
         It is responsible for orchestrating the data preprocessing process by creating 
         a ConfigurationManager object, retrieving the data preprocessing configuration, 
         creating a DataPreprocessing object, and calling its data_cleaning method.
+
+        Preprocessing only reads the ingested data, so it can run alongside data
+        validation; the validation status is checked by the data transformation
+        stage before anything is trained on the cleaned data.
         """
         try:
-            with open(Path("artifacts/data_validation/status.txt"), "r") as f:
-                status = f.read().split(" ")[-1]
-                
-            if status == "True":
-                config = ConfigurationManager()
-                data_preprocessing_config = config.get_data_preprocessing_config()
-                data_preprocessing = DataPreprocessing(config=data_preprocessing_config)
-                data_preprocessing.data_cleaning()
+            config = ConfigurationManager()
+            data_preprocessing_config = config.get_data_preprocessing_config()
+            data_preprocessing = DataPreprocessing(config=data_preprocessing_config)
+            if data_preprocessing_config.incremental:
+                data_preprocessing.update_store()
             else:
-                raise Exception("You data schema is not valid")
+                data_preprocessing.data_cleaning()
             
         except Exception as e:
-            print(e)
+            logger.error(e)
+            raise e
         
 if __name__ == '__main__':
     try:
@@ -21,23 +21,37 @@ class DataTransformationTrainingPipeline:
         """
         This is the main method of the DataTransformationTrainingPipeline class.
 
-        It is responsible for orchestrating the data transformation process by creating a ConfigurationManager object, retrieving the data transformation configuration, creating a DataTransformation object, loading data, encoding data, performing feature engineering, data balancing, and doing train-test splitting.
+        It is responsible for checking the data validation status and orchestrating the data transformation process by creating a ConfigurationManager object, retrieving the data transformation configuration, creating a DataTransformation object, loading data, encoding data, performing feature engineering, data balancing, and doing train-test splitting.
 
         :return: None
         """
 
         try:
+            with open(Path("artifacts/data_validation/status.txt"), "r") as f:
+                status = f.read().split(" ")[-1]
+
+            if status != "True":
+                raise Exception("You data schema is not valid")
+
             config = ConfigurationManager()
             data_transformation_config = config.get_data_transformation_config()
             data_transformation = DataTransformation(config=data_transformation_config)
-            data = data_transformation.load_data()
-            data = data_transformation.encode_data(data=data)
-            data = data_transformation.feature_engineering(data=data)
+            if data_transformation_config.incremental:
+                data = data_transformation.load_incremental_data()
+            elif data_transformation_config.chunk_size:
+                data = data_transformation.load_encoded_data()
+            else:
+                data = data_transformation.load_data()
+                data = data_transformation.encode_data(data=data)
+                data = data_transformation.feature_engineering(data=data)
+            data_transformation.save_feature_manifest()
+            data_transformation.save_encoded_matrix(data=data)
             balanced_data = data_transformation.data_balancing(data=data)
             data_transformation.train_test_splitting(data=balanced_data)
 
         except Exception as e:
-            print(e)
+            logger.error(e)
+            raise e
             
 if __name__ == '__main__':
     try:
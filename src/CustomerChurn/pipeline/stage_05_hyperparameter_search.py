@@ -0,0 +1,38 @@
+from CustomerChurn.config.configuration import ConfigurationManager
+from CustomerChurn.components.hyperparameter_search import HyperparameterSearch
+from CustomerChurn import logger
+
+STAGE_NAME = "Hyperparameter Search stage"
+
+class HyperparameterSearchTrainingPipeline:
+    def __init__(self):
+        """
+        Initializes an instance of the class.
+        This is a special method that Python calls when an object is instantiated from the class.
+        """
+        pass
+
+    def main(self):
+        """
+        This function is the main entry point of the HyperparameterSearchTrainingPipeline class.
+        It is responsible for initializing the ConfigurationManager, retrieving the hyperparameter search
+        configuration, creating an instance of the HyperparameterSearch class, and running the search.
+        
+        Parameters:
+            self (HyperparameterSearchTrainingPipeline): The instance of the class.
+        """
+        config = ConfigurationManager()
+        hyperparameter_search_config = config.get_hyperparameter_search_config()
+        hyperparameter_search = HyperparameterSearch(config=hyperparameter_search_config)
+        hyperparameter_search.search()
+
+
+if __name__ == '__main__':
+    try:
+        logger.info(f">>>>>> stage {STAGE_NAME} started <<<<<<")
+        obj = HyperparameterSearchTrainingPipeline()
+        obj.main()
+        logger.info(f">>>>>> stage {STAGE_NAME} completed <<<<<<\n\nx==========x")
+    except Exception as e:
+        logger.exception(e)
+        raise e
@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+from pathlib import Path
+from CustomerChurn import logger
+
+# Bytes read per step when hashing files
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_md5(path: Path) -> str:
+    """
+    Returns the md5 hex digest of a file, read in blocks.
+    """
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    def __init__(self, root_dir: Path, max_size_bytes: int):
+        """
+        Local content-addressed cache of stage outputs.
+
+        Files are stored once under `objects/` by the md5 of their content, so
+        outputs shared by several configurations take space only once. Every
+        cached stage run is an entry under `entries/`, named by its cache key
+        and mapping each output path to the objects of its files. When the
+        objects exceed `max_size_bytes`, least recently used entries are
+        dropped and objects no longer referenced are deleted.
+
+        Args:
+            root_dir (Path): Directory holding the cache.
+            max_size_bytes (int): Disk budget for the cached objects.
+        """
+        self.root_dir = Path(root_dir)
+        self.objects_dir = self.root_dir / "objects"
+        self.entries_dir = self.root_dir / "entries"
+        self.max_size_bytes = max_size_bytes
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.entries_dir, exist_ok=True)
+
+    def _object_path(self, md5: str) -> Path:
+        return self.objects_dir / md5[:2] / md5
+
+    def _entry_path(self, key: str) -> Path:
+        return self.entries_dir / f"{key}.json"
+
+    def _read_entry(self, key: str) -> dict:
+        with open(self._entry_path(key)) as f:
+            return json.load(f)
+
+    def _write_entry(self, key: str, entry: dict):
+        # Write then rename, so a crash never leaves a truncated entry behind
+        tmp_path = self._entry_path(key).with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f, indent=4)
+        os.replace(tmp_path, self._entry_path(key))
+
+    def _add_object(self, path: Path) -> str:
+        md5 = file_md5(path)
+        object_path = self._object_path(md5)
+        if not object_path.exists():
+            os.makedirs(object_path.parent, exist_ok=True)
+            tmp_path = object_path.with_suffix(".tmp")
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, object_path)
+        return md5
+
+    def contains(self, key: str) -> bool:
+        return self._entry_path(key).exists()
+
+    def store(self, key: str, outs: list, stage: str = None):
+        """
+        Caches the current contents of a stage's outputs under `key`.
+
+        Args:
+            key (str): Cache key of the stage run.
+            outs (list): Output files and directories of the stage. Outputs
+                that do not exist are recorded as absent.
+            stage (str, optional): Stage name, kept for information.
+        """
+        entry = {"stage": stage, "last_used": time.time(), "outs": {}}
+        for out in outs:
+            out = Path(out)
+            if out.is_file():
+                entry["outs"][str(out)] = {"type": "file", "md5": self._add_object(out)}
+            elif out.is_dir():
+                files = {file.relative_to(out).as_posix(): self._add_object(file)
+                         for file in sorted(out.rglob("*")) if file.is_file()}
+                entry["outs"][str(out)] = {"type": "dir", "files": files}
+            else:
+                entry["outs"][str(out)] = {"type": "absent"}
+
+        self._write_entry(key, entry)
+        logger.info(f"Cached outputs of {stage or key} under key {key}")
+        self.evict(keep=key)
+
+    def restore(self, key: str) -> bool:
+        """
+        Restores the outputs cached under `key` to their original paths.
+
+        Outputs are copied rather than linked, since stages overwrite their
+        outputs in place on the next run.
+
+        Returns:
+            bool: False if the key is not cached or one of its objects is
+            missing, True once the outputs are restored.
+        """
+        if not self.contains(key):
+            return False
+        entry = self._read_entry(key)
+
+        objects = [out["md5"] for out in entry["outs"].values() if out["type"] == "file"]
+        objects += [md5 for out in entry["outs"].values() if out["type"] == "dir" for md5 in out["files"].values()]
+        if not all(self._object_path(md5).exists() for md5 in objects):
+            logger.warning(f"Cache entry {key} is incomplete, dropping it")
+            os.remove(self._entry_path(key))
+            return False
+
+        for out, cached in entry["outs"].items():
+            out = Path(out)
+            if out.is_dir():
+                shutil.rmtree(out)
+            elif out.exists():
+                os.remove(out)
+
+            if cached["type"] == "file":
+                os.makedirs(out.parent, exist_ok=True)
+                shutil.copyfile(self._object_path(cached["md5"]), out)
+            elif cached["type"] == "dir":
+                for relative, md5 in cached["files"].items():
+                    target = out / relative
+                    os.makedirs(target.parent, exist_ok=True)
+                    shutil.copyfile(self._object_path(md5), target)
+
+        entry["last_used"] = time.time()
+        self._write_entry(key, entry)
+        logger.info(f"Restored outputs of {entry['stage'] or key} from cache key {key}")
+        return True
+
+    def size(self) -> int:
+        """
+        Returns the total size in bytes of the cached objects.
+        """
+        return sum(path.stat().st_size for path in self.objects_dir.rglob("*") if path.is_file())
+
+    def evict(self, keep: str = None):
+        """
+        Drops least recently used entries until the cached objects fit in
+        the disk budget, then deletes objects no entry references.
+
+        Args:
+            keep (str, optional): Key that is never evicted, e.g. the entry
+                that was just stored.
+        """
+        entries = {path.stem: json.loads(path.read_text()) for path in self.entries_dir.glob("*.json")}
+        total = self.size()
+        if total <= self.max_size_bytes:
+            return
+
+        def referenced(entries):
+            md5s = set()
+            for entry in entries.values():
+                for out in entry["outs"].values():
+                    if out["type"] == "file":
+                        md5s.add(out["md5"])
+                    elif out["type"] == "dir":
+                        md5s.update(out["files"].values())
+            return md5s
+
+        for key in sorted(entries, key=lambda key: entries[key]["last_used"]):
+            if total <= self.max_size_bytes:
+                break
+            if key == keep:
+                continue
+            os.remove(self._entry_path(key))
+            del entries[key]
+            logger.info(f"Evicted cache entry {key}")
+
+            live = referenced(entries)
+            for path in self.objects_dir.rglob("*"):
+                if path.is_file() and path.name not in live:
+                    total -= path.stat().st_size
+                    os.remove(path)
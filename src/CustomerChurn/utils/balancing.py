@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import NearestNeighbors
+from CustomerChurn import logger
+
+BALANCING_METHODS = ["SMOTEENN", "ADASYN", "SMOTE", "random_over", "random_under", "class_weight"]
+
+# Defaults for the `DataTransformation.balancing` section of params.yaml
+DEFAULT_OPTIONS = {
+    "random_state": 42,
+    "sampling_ratio": 1.0,
+    "k_neighbors": 5,
+    "algorithm": "kd_tree",
+    "n_jobs": -1,
+    "chunk_size": 100_000,
+}
+
+
+def _target_counts(counts: dict, sampling_ratio: float, over: bool) -> dict:
+    """
+    Returns the per-class row counts after resampling: every class grows to
+    `sampling_ratio` x the majority count (over-sampling), or shrinks to the
+    minority count / `sampling_ratio` (under-sampling). Classes are never
+    shrunk by over-sampling or grown by under-sampling.
+    """
+    if over:
+        target = int(round(max(counts.values()) * sampling_ratio))
+        return {cls: max(count, target) for cls, count in counts.items()}
+    target = int(round(min(counts.values()) / sampling_ratio))
+    return {cls: min(count, target) for cls, count in counts.items()}
+
+
+def _rebuild(X: pd.DataFrame, values: np.ndarray, y: np.ndarray, name: str):
+    X_res = pd.DataFrame(values, columns=X.columns).astype(X.dtypes.to_dict())
+    return X_res, pd.Series(y, name=name)
+
+
+def random_over_sample(X: pd.DataFrame, y: pd.Series, sampling_ratio: float = 1.0, random_state: int = None):
+    """
+    Duplicates randomly drawn rows of the smaller classes.
+    """
+    rng = np.random.default_rng(random_state)
+    counts = y.value_counts().to_dict()
+    targets = _target_counts(counts, sampling_ratio, over=True)
+    labels = y.to_numpy()
+    index = [np.arange(len(y))]
+    for cls, target in targets.items():
+        rows = np.flatnonzero(labels == cls)
+        index.append(rng.choice(rows, size=target - counts[cls], replace=True))
+    index = np.concatenate(index)
+    return X.iloc[index].reset_index(drop=True), y.iloc[index].reset_index(drop=True)
+
+
+def random_under_sample(X: pd.DataFrame, y: pd.Series, sampling_ratio: float = 1.0, random_state: int = None):
+    """
+    Keeps a random subset, without replacement, of the larger classes.
+    """
+    rng = np.random.default_rng(random_state)
+    counts = y.value_counts().to_dict()
+    targets = _target_counts(counts, sampling_ratio, over=False)
+    labels = y.to_numpy()
+    index = np.sort(np.concatenate([
+        rng.choice(np.flatnonzero(labels == cls), size=target, replace=False)
+        for cls, target in targets.items()
+    ]))
+    return X.iloc[index].reset_index(drop=True), y.iloc[index].reset_index(drop=True)
+
+
+def _neighbor_table(X: np.ndarray, k: int, algorithm: str, n_jobs: int, chunk_size: int) -> np.ndarray:
+    """
+    Returns the k nearest neighbours (excluding the row itself) of every row
+    of X, queried in chunks against a tree index with `n_jobs` workers.
+    """
+    index = NearestNeighbors(n_neighbors=k + 1, algorithm=algorithm, n_jobs=n_jobs).fit(X)
+    table = np.empty((len(X), k), dtype=np.int64)
+    for start in range(0, len(X), chunk_size):
+        neighbors = index.kneighbors(X[start:start + chunk_size], return_distance=False)
+        rows = np.arange(start, start + len(neighbors))[:, None]
+        # Drop the query row itself; duplicates may put it in any position
+        not_self = neighbors != rows
+        keep = np.cumsum(not_self, axis=1) <= k
+        table[start:start + len(neighbors)] = neighbors[not_self & keep].reshape(-1, k)
+    return table
+
+
+def smote(X: pd.DataFrame, y: pd.Series, k_neighbors: int = 5, sampling_ratio: float = 1.0,
+          random_state: int = None, algorithm: str = "kd_tree", n_jobs: int = None,
+          chunk_size: int = 100_000):
+    """
+    Over-samples the smaller classes with SMOTE, built to scale to tens of
+    millions of rows.
+
+    Neighbours are searched only among the rows of the class being
+    over-sampled, with a tree index queried in chunks by `n_jobs` workers,
+    and the neighbour table is computed once per class instead of per
+    synthetic row. Synthetic rows are generated in chunks of `chunk_size`.
+    Continuous columns are interpolated between a row and a random
+    neighbour; integer columns (one-hot and count features) take the value
+    of the closer of the two, so one-hot groups stay valid.
+
+    Args:
+        X (pd.DataFrame): Features.
+        y (pd.Series): Class labels.
+        k_neighbors (int): Neighbours to interpolate towards.
+        sampling_ratio (float): Smaller classes grow to this fraction of the majority.
+        random_state (int, optional): Seed for reproducible resampling.
+        algorithm (str): Neighbour index, 'kd_tree' or 'ball_tree'.
+        n_jobs (int, optional): Workers for neighbour queries, -1 for all cores.
+        chunk_size (int): Rows per neighbour query and generation chunk.
+
+    Returns:
+        tuple: Resampled features (same columns and dtypes) and labels.
+    """
+    rng = np.random.default_rng(random_state)
+    counts = y.value_counts().to_dict()
+    targets = _target_counts(counts, sampling_ratio, over=True)
+    values = X.to_numpy(dtype=np.float64)
+    labels = y.to_numpy()
+    integral = np.array([np.issubdtype(dtype, np.integer) or dtype == bool for dtype in X.dtypes])
+
+    new_values, new_labels = [values], [labels]
+    for cls, target in targets.items():
+        n_new = target - counts[cls]
+        if n_new <= 0:
+            continue
+        X_cls = values[labels == cls]
+        k = min(k_neighbors, len(X_cls) - 1)
+        if k < 1:
+            raise ValueError(f"SMOTE needs at least 2 rows of class {cls}, got {len(X_cls)}")
+        neighbors = _neighbor_table(X_cls, k, algorithm, n_jobs, chunk_size)
+
+        for start in range(0, n_new, chunk_size):
+            n = min(chunk_size, n_new - start)
+            base = rng.integers(0, len(X_cls), n)
+            chosen = neighbors[base, rng.integers(0, k, n)]
+            steps = rng.random(n)[:, None]
+            samples = X_cls[base] + steps * (X_cls[chosen] - X_cls[base])
+            samples[:, integral] = np.where(steps < 0.5, X_cls[base][:, integral], X_cls[chosen][:, integral])
+            new_values.append(samples)
+            new_labels.append(np.full(n, cls, dtype=labels.dtype))
+
+        logger.info(f"SMOTE generated {n_new} rows of class {cls} from {len(X_cls)} rows")
+
+    return _rebuild(X, np.concatenate(new_values), np.concatenate(new_labels), y.name)
+
+
+def class_weights(y: pd.Series) -> dict:
+    """
+    Returns 'balanced' class weights, n_samples / (n_classes * class_count),
+    so every class carries the same total weight in training.
+    """
+    counts = y.value_counts().sort_index()
+    return {int(cls): float(len(y) / (len(counts) * count)) for cls, count in counts.items()}
+
+
+def balance(X: pd.DataFrame, y: pd.Series, method: str, options: dict = None):
+    """
+    Balances the classes of a training set with the given method.
+
+    Args:
+        X (pd.DataFrame): Features.
+        y (pd.Series): Class labels.
+        method (str): One of BALANCING_METHODS. 'class_weight' leaves the rows
+            untouched and returns class weights for the model instead.
+        options (dict, optional): Overrides of DEFAULT_OPTIONS.
+
+    Returns:
+        tuple: Features, labels and class weights (None unless 'class_weight').
+
+    Raises:
+        ValueError: If the method is not supported.
+    """
+    options = {**DEFAULT_OPTIONS, **(options or {})}
+    seed = options["random_state"]
+
+    if method == "SMOTEENN":
+        from imblearn.combine import SMOTEENN
+        X_res, y_res = SMOTEENN(random_state=seed, n_jobs=options["n_jobs"]).fit_resample(X, y)
+    elif method == "ADASYN":
+        from imblearn.over_sampling import ADASYN
+        X_res, y_res = ADASYN(random_state=seed, n_neighbors=options["k_neighbors"]).fit_resample(X, y)
+    elif method == "SMOTE":
+        X_res, y_res = smote(X, y, k_neighbors=options["k_neighbors"], sampling_ratio=options["sampling_ratio"],
+                             random_state=seed, algorithm=options["algorithm"], n_jobs=options["n_jobs"],
+                             chunk_size=options["chunk_size"])
+    elif method == "random_over":
+        X_res, y_res = random_over_sample(X, y, sampling_ratio=options["sampling_ratio"], random_state=seed)
+    elif method == "random_under":
+        X_res, y_res = random_under_sample(X, y, sampling_ratio=options["sampling_ratio"], random_state=seed)
+    elif method == "class_weight":
+        return X, y, class_weights(y)
+    else:
+        raise ValueError(f"Invalid method: {method}. Choose one of {BALANCING_METHODS}.")
+
+    return X_res, y_res, None
@@ -0,0 +1,141 @@
+import time
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from CustomerChurn import logger
+
+# Request latencies kept to estimate the p99
+LATENCY_WINDOW = 2000
+
+# Requests between two adjustments of the batching wait
+ADAPT_EVERY = 200
+
+
+class MicroBatcher:
+    def __init__(self, process_batch, max_batch_size: int, max_wait_ms: float, latency_budget_ms: float):
+        """
+        Collects items submitted by concurrent requests into micro-batches and
+        processes each batch with one call, off the event loop.
+
+        A batch is closed as soon as it holds `max_batch_size` items or
+        `max_wait_ms` after its first item arrived; requests arriving while a
+        batch is being processed queue up for the next one. The wait adapts to
+        the observed latency: it is halved while the p99 request latency is
+        over `latency_budget_ms`, and grows back towards `max_wait_ms` once
+        the p99 is comfortably under it.
+
+        Args:
+            process_batch (callable): Takes a list of items and returns one
+                result per item, in order. A result that is an Exception is
+                raised to its submitter only.
+            max_batch_size (int): Largest number of items per batch.
+            max_wait_ms (float): Longest time a batch waits to fill up.
+            latency_budget_ms (float): Target p99 latency of a request.
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.latency_budget = latency_budget_ms / 1000
+        self.wait = self.max_wait
+        self._queue = None
+        self._task = None
+        # One thread, so batches run one at a time and the model's own
+        # threads are not oversubscribed
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="micro-batch")
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._since_adapt = 0
+        self.requests = 0
+        self.batches = 0
+
+    async def submit(self, item):
+        """
+        Queues an item for the next batch and returns its result.
+        """
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future, time.perf_counter()))
+        result = await future
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            items = [item for item, _, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, self.process_batch, items)
+            except Exception as e:
+                results = [e] * len(batch)
+
+            now = time.perf_counter()
+            for (_, future, submitted), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+                self._latencies.append(now - submitted)
+            self.requests += len(batch)
+            self.batches += 1
+            self._since_adapt += len(batch)
+            if self._since_adapt >= ADAPT_EVERY:
+                self._adapt()
+
+    def _adapt(self):
+        self._since_adapt = 0
+        p99 = float(np.percentile(self._latencies, 99))
+        if p99 > self.latency_budget and self.wait > 0:
+            self.wait /= 2
+            logger.info(f"p99 latency {p99 * 1000:.1f} ms over budget, batching wait lowered "
+                        f"to {self.wait * 1000:.2f} ms")
+        elif p99 < self.latency_budget / 2 and self.wait < self.max_wait:
+            self.wait = min(self.max_wait, max(self.wait * 2, self.max_wait / 64))
+
+    def stats(self) -> dict:
+        """
+        Returns request and batch counts, the mean batch size, the current
+        batching wait and the recent latency percentiles.
+        """
+        latencies = np.array(self._latencies) * 1000
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "wait_ms": self.wait * 1000,
+            "latency_budget_ms": self.latency_budget * 1000,
+            "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+            "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else None,
+        }
+
+    async def close(self):
+        """
+        Stops the batching task and its worker thread.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=False)
@@ -8,6 +8,9 @@ from ensure import ensure_annotations
 from box import ConfigBox
 from pathlib import Path
 from typing import Any
+import zipfile
+import pandas as pd
+from contextlib import contextmanager
 
 
 @ensure_annotations
@@ -128,4 +131,207 @@ def get_size(path: Path) -> str:
     """
     size_in_kb = round(os.path.getsize(path)/1024)
     logger.info(f"total size for the {path} is {size_in_kb} KB")
-    return f"~ {size_in_kb} KB"  
\ No newline at end of file
+    return f"~ {size_in_kb} KB"  
+
+# File suffix for every supported pipeline artifact format
+ARTIFACT_FORMATS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+
+
+def artifact_path(path: Path, artifact_format: str) -> Path:
+    """
+    Returns the artifact path with the file suffix of the given format.
+
+    Args:
+        path (Path): Configured artifact path, e.g. artifacts/data_transformation/train.csv.
+        artifact_format (str): One of 'csv', 'parquet' or 'feather'.
+
+    Returns:
+        Path: The path with the format's suffix.
+
+    Raises:
+        ValueError: If the format is not supported.
+    """
+    if artifact_format not in ARTIFACT_FORMATS:
+        raise ValueError(f"Invalid artifact format: {artifact_format}. Choose one of {list(ARTIFACT_FORMATS)}.")
+    return Path(path).with_suffix(ARTIFACT_FORMATS[artifact_format])
+
+
+def _table_format(path: Path) -> str:
+    suffix = Path(path).suffix
+    for artifact_format, format_suffix in ARTIFACT_FORMATS.items():
+        if suffix == format_suffix:
+            return artifact_format
+    return "csv"
+
+
+@contextmanager
+def open_csv_source(path: Path):
+    """
+    Opens a CSV source for `pd.read_csv`: a plain path, or a CSV member read
+    straight out of a zip archive without extracting it.
+
+    Archive members are addressed as `archive.zip::member.csv`; a bare
+    `archive.zip` selects its only CSV member.
+
+    Args:
+        path (Path): CSV path, zip archive or archive member.
+
+    Yields:
+        The path itself, or a file object streaming the decompressed member.
+
+    Raises:
+        ValueError: If a bare archive does not hold exactly one CSV member.
+    """
+    archive, _, member = str(path).partition("::")
+    if not archive.endswith(".zip"):
+        yield path
+        return
+
+    with zipfile.ZipFile(archive) as zip_ref:
+        if not member:
+            members = [name for name in zip_ref.namelist()
+                       if name.endswith(".csv") and not name.startswith("__MACOSX/")]
+            if len(members) != 1:
+                raise ValueError(f"Expected one CSV member in {archive}, found {members}")
+            member = members[0]
+        with zip_ref.open(member) as f:
+            yield f
+
+
+def _apply_dtypes(data: pd.DataFrame, dtype: dict = None) -> pd.DataFrame:
+    if not dtype:
+        return data
+    dtype = {col: typ for col, typ in dtype.items() if col in data.columns and data[col].dtype != typ}
+    return data.astype(dtype) if dtype else data
+
+
+def read_table(path: Path, columns: list = None, dtype: dict = None, na_values: dict = None) -> pd.DataFrame:
+    """
+    Reads a CSV, Parquet or Arrow IPC (feather) artifact, picked by file suffix.
+    CSV sources may also be zip archives or archive members (see `open_csv_source`).
+
+    Args:
+        path (Path): The artifact to read.
+        columns (list, optional): Only read these columns (column projection).
+        dtype (dict, optional): Column -> dtype schema to enforce.
+        na_values (dict, optional): Column -> raw CSV values to read as missing.
+
+    Returns:
+        pd.DataFrame: The table, with columns in the requested order.
+    """
+    artifact_format = _table_format(path)
+    if artifact_format == "parquet":
+        data = pd.read_parquet(path, columns=columns)
+    elif artifact_format == "feather":
+        data = pd.read_feather(path, columns=columns)
+    else:
+        csv_dtype = {col: typ for col, typ in (dtype or {}).items() if columns is None or col in columns}
+        with open_csv_source(path) as source:
+            data = pd.read_csv(source, usecols=columns, dtype=csv_dtype or None, na_values=na_values)
+
+    if columns is not None:
+        data = data[columns]
+    return _apply_dtypes(data, dtype)
+
+
+def iter_table(path: Path, chunk_size: int, columns: list = None, dtype: dict = None,
+               na_values: dict = None):
+    """
+    Reads an artifact in chunks of at most `chunk_size` rows.
+
+    Args:
+        path (Path): The artifact to read.
+        chunk_size (int): Rows per chunk.
+        columns (list, optional): Only read these columns (column projection).
+        dtype (dict, optional): Column -> dtype schema to enforce.
+        na_values (dict, optional): Column -> raw CSV values to read as missing.
+
+    Yields:
+        pd.DataFrame: One chunk of the table.
+    """
+    artifact_format = _table_format(path)
+    if artifact_format == "csv":
+        csv_dtype = {col: typ for col, typ in (dtype or {}).items() if columns is None or col in columns}
+        with open_csv_source(path) as source:
+            chunks = pd.read_csv(source, usecols=columns, dtype=csv_dtype or None,
+                                 na_values=na_values, chunksize=chunk_size)
+            for chunk in chunks:
+                yield _apply_dtypes(chunk if columns is None else chunk[columns], dtype)
+        return
+
+    import pyarrow.parquet as pq
+    import pyarrow.ipc as ipc
+
+    if artifact_format == "parquet":
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns)
+        for batch in batches:
+            yield _apply_dtypes(batch.to_pandas(), dtype)
+    else:
+        with ipc.open_file(path) as reader:
+            for i in range(reader.num_record_batches):
+                table = reader.get_batch(i)
+                if columns is not None:
+                    table = table.select(columns)
+                for start in range(0, table.num_rows, chunk_size):
+                    yield _apply_dtypes(table.slice(start, chunk_size).to_pandas(), dtype)
+
+
+def write_table(data: pd.DataFrame, path: Path, dtype: dict = None):
+    """
+    Writes a DataFrame as CSV, Parquet or Arrow IPC (feather), picked by file suffix.
+
+    Args:
+        data (pd.DataFrame): The table to write.
+        path (Path): Destination artifact path.
+        dtype (dict, optional): Column -> dtype schema the written columns are cast to.
+    """
+    with TableWriter(path, dtype=dtype) as writer:
+        writer.write(data)
+
+
+class TableWriter:
+    def __init__(self, path: Path, dtype: dict = None):
+        """
+        Writes a table chunk by chunk to a CSV, Parquet or Arrow IPC artifact,
+        picked by file suffix. Use as a context manager.
+
+        Args:
+            path (Path): Destination artifact path.
+            dtype (dict, optional): Column -> dtype schema the written columns are cast to.
+        """
+        self.path = path
+        self.dtype = dtype
+        self.format = _table_format(path)
+        self.rows = 0
+        self._started = False
+        self._writer = None
+
+    def write(self, data: pd.DataFrame):
+        """
+        Appends a chunk of rows to the artifact.
+        """
+        data = _apply_dtypes(data, self.dtype).reset_index(drop=True)
+
+        if self.format == "csv":
+            data.to_csv(self.path, mode="a" if self._started else "w", header=not self._started, index=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(data, preserve_index=False)
+            if self._writer is None:
+                if self.format == "parquet":
+                    self._writer = pq.ParquetWriter(self.path, table.schema)
+                else:
+                    self._writer = pa.ipc.new_file(self.path, table.schema)
+            self._writer.write_table(table)
+
+        self._started = True
+        self.rows += len(data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._writer is not None:
+            self._writer.close()
@@ -0,0 +1,304 @@
+import os
+import json
+import numpy as np
+from pathlib import Path
+from CustomerChurn import logger
+
+BUNDLE_VERSION = 2
+META_FILE = "meta.json"
+TREE_ARRAYS = ["roots", "feature", "threshold", "children", "missing", "value"]
+
+# Rows scored per traversal step; bounds the (rows x trees) node-index matrix
+ROW_CHUNK_SIZE = 4096
+
+
+def _flatten_trees(trees):
+    """
+    Concatenates per-tree node arrays into one flat node table.
+
+    Each tree is a dict of equally long arrays (feature, threshold, left, right,
+    missing, value) with tree-local child indices and -1 marking leaves. Leaves
+    are rewritten to point at themselves so every row can take the same number
+    of traversal steps. Left and right children are stored side by side in one
+    (n_nodes, 2) `children` array so the evaluator needs a single lookup.
+    """
+    arrays = {name: [] for name in ["feature", "threshold", "left", "right", "missing", "value"]}
+    roots = []
+    offset = 0
+    for tree in trees:
+        n_nodes = len(tree["feature"])
+        node_ids = np.arange(n_nodes) + offset
+        is_leaf = tree["left"] < 0
+        for child in ["left", "right", "missing"]:
+            arrays[child].append(np.where(is_leaf, node_ids, tree[child] + offset))
+        arrays["feature"].append(np.where(is_leaf, 0, tree["feature"]))
+        arrays["threshold"].append(tree["threshold"])
+        arrays["value"].append(tree["value"])
+        roots.append(offset)
+        offset += n_nodes
+
+    flat = {
+        "roots": np.asarray(roots, dtype=np.int32),
+        "feature": np.concatenate(arrays["feature"]).astype(np.int32),
+        "children": np.stack([np.concatenate(arrays["left"]),
+                              np.concatenate(arrays["right"])], axis=1).astype(np.int32),
+        "missing": np.concatenate(arrays["missing"]).astype(np.int32),
+        "threshold": np.concatenate(arrays["threshold"]),
+        "value": np.concatenate(arrays["value"]).astype(np.float64),
+    }
+    return flat
+
+
+def _tree_depth(children: np.ndarray, roots: np.ndarray) -> int:
+    """
+    Returns the maximum root-to-leaf depth of the flattened ensemble.
+    """
+    depth = 0
+    nodes = roots
+    while True:
+        next_nodes = children[nodes]
+        next_nodes = next_nodes[next_nodes != nodes[:, None]]
+        if len(next_nodes) == 0:
+            return depth
+        nodes = np.unique(next_nodes)
+        depth += 1
+
+
+def _export_xgboost(model):
+    booster = model.get_booster()
+    feature_names = booster.feature_names or [f"f{i}" for i in range(booster.num_features())]
+    feature_index = {name: i for i, name in enumerate(feature_names)}
+
+    try:
+        n_trees = (model.best_iteration + 1) * max(model.get_params().get("num_parallel_tree") or 1, 1)
+    except AttributeError:
+        n_trees = None
+
+    trees = []
+    for dump in booster.get_dump(dump_format="json")[:n_trees]:
+        nodes = {}
+        stack = [json.loads(dump)]
+        while stack:
+            node = stack.pop()
+            nodes[node["nodeid"]] = node
+            stack.extend(node.get("children", []))
+
+        n_nodes = max(nodes) + 1
+        tree = {
+            "feature": np.zeros(n_nodes, dtype=np.int32),
+            "threshold": np.zeros(n_nodes, dtype=np.float32),
+            "left": np.full(n_nodes, -1, dtype=np.int32),
+            "right": np.full(n_nodes, -1, dtype=np.int32),
+            "missing": np.full(n_nodes, -1, dtype=np.int32),
+            "value": np.zeros(n_nodes, dtype=np.float64),
+        }
+        for node_id, node in nodes.items():
+            if "leaf" in node:
+                tree["value"][node_id] = node["leaf"]
+                continue
+            tree["feature"][node_id] = feature_index[node["split"]]
+            tree["threshold"][node_id] = node["split_condition"]
+            tree["left"][node_id] = node["yes"]
+            tree["right"][node_id] = node["no"]
+            tree["missing"][node_id] = node["missing"]
+        trees.append(tree)
+
+    config = json.loads(booster.save_config())
+    base_score = float(str(config["learner"]["learner_model_param"]["base_score"]).strip("[]"))
+    objective = config["learner"]["objective"]["name"]
+    if objective != "binary:logistic":
+        raise ValueError(f"Unsupported XGBoost objective for export: {objective}")
+
+    meta = {
+        "kind": "trees",
+        "aggregation": "sum_sigmoid",
+        "decision": "lt",
+        "base_margin": float(np.log(base_score / (1 - base_score))),
+        "feature_names": list(feature_names),
+    }
+    return meta, trees
+
+
+def _export_random_forest(model):
+    trees = []
+    for estimator in model.estimators_:
+        tree_ = estimator.tree_
+        counts = tree_.value[:, 0, :]
+        go_left = getattr(tree_, "missing_go_to_left", np.zeros(tree_.node_count, dtype=bool))
+        trees.append({
+            "feature": tree_.feature,
+            "threshold": tree_.threshold,
+            "left": tree_.children_left,
+            "right": tree_.children_right,
+            "missing": np.where(go_left.astype(bool), tree_.children_left, tree_.children_right),
+            "value": counts[:, 1] / counts.sum(axis=1),
+        })
+
+    meta = {
+        "kind": "trees",
+        "aggregation": "mean",
+        "decision": "le",
+        "base_margin": 0.0,
+    }
+    return meta, trees
+
+
+def export_model(model, path: Path):
+    """
+    Writes a trained classifier as a flat NumPy bundle for fast inference.
+
+    XGBoost and RandomForest ensembles are flattened into per-node arrays
+    (split feature, threshold, children, leaf value) and LogisticRegression into
+    its coefficients. The bundle is a directory holding `meta.json` and one
+    uncompressed `.npy` file per array, so it can be memory-mapped and shared
+    between server processes instead of being copied into each of them.
+
+    Args:
+        model: Fitted XGBClassifier, RandomForestClassifier or LogisticRegression.
+        path (Path): Output directory for the bundle.
+
+    Raises:
+        ValueError: If the model type is not supported.
+    """
+    model_type = type(model).__name__
+    feature_names = getattr(model, "feature_names_in_", None)
+
+    if model_type == "XGBClassifier":
+        meta, trees = _export_xgboost(model)
+    elif model_type == "RandomForestClassifier":
+        meta, trees = _export_random_forest(model)
+    elif model_type == "LogisticRegression":
+        meta, trees = {"kind": "linear"}, None
+    else:
+        raise ValueError(f"Unsupported model type for export: {model_type}")
+
+    if trees is not None:
+        arrays = _flatten_trees(trees)
+        meta["max_depth"] = _tree_depth(arrays["children"], arrays["roots"])
+        meta["n_trees"] = len(trees)
+    else:
+        arrays = {
+            "coef": np.asarray(model.coef_[0], dtype=np.float64),
+            "intercept": np.asarray(model.intercept_, dtype=np.float64),
+        }
+
+    meta.update({
+        "version": BUNDLE_VERSION,
+        "model_type": model_type,
+        "n_features": int(model.n_features_in_),
+        "arrays": list(arrays),
+    })
+    if feature_names is not None:
+        meta["feature_names"] = [str(name) for name in feature_names]
+
+    os.makedirs(path, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(path, f"{name}.npy"), array)
+    with open(os.path.join(path, META_FILE), "w") as f:
+        json.dump(meta, f, indent=4)
+
+    logger.info(f"Compiled {model_type} model exported to: {path}")
+
+
+class CompiledModel:
+    def __init__(self, meta: dict, arrays: dict):
+        """
+        Vectorized evaluator for a bundle written by `export_model`.
+
+        Exposes `predict_proba` and `predict` like the sklearn estimator it was
+        exported from, without the estimator wrapper overhead.
+
+        Args:
+            meta (dict): Contents of the bundle's meta.json.
+            arrays (dict): Bundle arrays keyed by name.
+        """
+        self.meta = meta
+        self.arrays = arrays
+        self.classes_ = np.array([0, 1])
+        self.n_features_in_ = meta["n_features"]
+        if "feature_names" in meta:
+            self.feature_names_in_ = np.array(meta["feature_names"], dtype=object)
+
+        if meta["kind"] == "trees":
+            self._compare = np.less if meta["decision"] == "lt" else np.less_equal
+            # XGBoost compares float32 features against float32 split values,
+            # sklearn trees compare float32 features against float64 thresholds
+            self._threshold_dtype = arrays["threshold"].dtype
+
+    @classmethod
+    def load(cls, path: Path, mmap_mode: str = None) -> "CompiledModel":
+        """
+        Loads a compiled model bundle from a directory.
+
+        Args:
+            path (Path): Bundle directory written by `export_model`.
+            mmap_mode (str, optional): Passed to `np.load`; with 'r' the arrays
+                are read-only views of the page cache, shared by every process
+                that maps the same bundle.
+
+        Raises:
+            ValueError: If the bundle version is not supported.
+        """
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        if meta.get("version") != BUNDLE_VERSION:
+            raise ValueError(f"Unsupported compiled model version: {meta.get('version')}")
+
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+                  for name in meta["arrays"]}
+        return cls(meta, arrays)
+
+    def _tree_leaf_values(self, X: np.ndarray) -> np.ndarray:
+        a = self.arrays
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_offsets = (np.arange(n_rows) * n_features)[:, None]
+        nodes = np.broadcast_to(a["roots"], (n_rows, len(a["roots"])))
+        has_missing = np.isnan(flat_X).any()
+
+        for _ in range(self.meta["max_depth"]):
+            values = flat_X[row_offsets + a["feature"][nodes]]
+            go_left = self._compare(values, a["threshold"][nodes])
+            children = a["children"][nodes, (~go_left).view(np.int8)]
+            if has_missing:
+                children = np.where(np.isnan(values), a["missing"][nodes], children)
+            nodes = children
+
+        return a["value"][nodes]
+
+    def decision_scores(self, X) -> np.ndarray:
+        """
+        Returns the positive-class probability for every row of X.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected input with {self.n_features_in_} features, got shape {X.shape}")
+
+        if self.meta["kind"] == "linear":
+            margin = X @ self.arrays["coef"] + self.arrays["intercept"][0]
+            return 1.0 / (1.0 + np.exp(-margin))
+
+        X = np.ascontiguousarray(X.astype(np.float32).astype(self._threshold_dtype))
+        scores = np.empty(len(X))
+        for start in range(0, len(X), ROW_CHUNK_SIZE):
+            leaves = self._tree_leaf_values(X[start:start + ROW_CHUNK_SIZE])
+            if self.meta["aggregation"] == "mean":
+                scores[start:start + ROW_CHUNK_SIZE] = leaves.mean(axis=1)
+            else:
+                margin = leaves.sum(axis=1) + self.meta["base_margin"]
+                scores[start:start + ROW_CHUNK_SIZE] = 1.0 / (1.0 + np.exp(-margin))
+
+        return scores
+
+    def predict_proba(self, X) -> np.ndarray:
+        """
+        Returns class probabilities with shape (n_rows, 2).
+        """
+        positive = self.decision_scores(X)
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Returns 0/1 labels using a 0.5 probability threshold.
+        """
+        return (self.decision_scores(X) >= 0.5).astype(np.int64)
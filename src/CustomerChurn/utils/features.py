@@ -0,0 +1,380 @@
+import ast
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Raw numeric columns copied into the feature matrix as-is
+NUMERIC_COLUMNS = ['SeniorCitizen', 'tenure', 'MonthlyCharges', 'TotalCharges']
+
+# Category -> {feature column: value} for every categorical input column.
+# Categories missing from a mapping (and unknown values) encode to all zeros.
+CATEGORICAL_ENCODINGS = {
+    'gender': {'Female': {'gender': 1}, 'Male': {}},
+    'Partner': {'Yes': {'Partner': 1}, 'No': {}},
+    'Dependents': {'Yes': {'Dependents': 1}, 'No': {}},
+    'PhoneService': {'Yes': {'PhoneService': 1}, 'No': {}},
+    'MultipleLines': {'Yes': {'MultipleLines': 1}, 'No': {}, 'No phone service': {}},
+    'OnlineSecurity': {'Yes': {'OnlineSecurity': 1}, 'No': {}, 'No internet service': {}},
+    'OnlineBackup': {'Yes': {'OnlineBackup': 1}, 'No': {}, 'No internet service': {}},
+    'DeviceProtection': {'Yes': {'DeviceProtection': 1}, 'No': {}, 'No internet service': {}},
+    'TechSupport': {'Yes': {'TechSupport': 1}, 'No': {}, 'No internet service': {}},
+    'StreamingTV': {'Yes': {'StreamingTV': 1}, 'No': {}, 'No internet service': {}},
+    'StreamingMovies': {'Yes': {'StreamingMovies': 1}, 'No': {}, 'No internet service': {}},
+    'PaperlessBilling': {'Yes': {'PaperlessBilling': 1}, 'No': {}},
+    'InternetService': {
+        'DSL': {},
+        'Fiber optic': {'InternetService_Fiber optic': 1},
+        'No': {'InternetService_No': 1},
+    },
+    'Contract': {
+        'Month-to-month': {},
+        'One year': {'Contract_One year': 1},
+        'Two year': {'Contract_Two year': 1},
+    },
+    'PaymentMethod': {
+        'Bank transfer (automatic)': {},
+        'Credit card (automatic)': {'PaymentMethod_Credit card (automatic)': 1},
+        'Electronic check': {'PaymentMethod_Electronic check': 1},
+        'Mailed check': {'PaymentMethod_Mailed check': 1},
+    },
+}
+
+# Engineered features, written as arithmetic over the encoded columns
+ENGINEERED_FEATURES = {
+    'avg_monthly_value': 'TotalCharges / (tenure + 1)',
+    'tenure_ratio': 'tenure / (TotalCharges + 1)',
+    'service_density': 'OnlineSecurity + OnlineBackup + TechSupport',
+    'tenure_MonthlyCharges': 'tenure * MonthlyCharges',
+}
+
+# Column order the models are trained on (the order pd.get_dummies produced)
+FEATURE_COLUMNS = [
+    'gender', 'SeniorCitizen', 'Partner', 'Dependents', 'tenure', 'PhoneService',
+    'MultipleLines', 'OnlineSecurity', 'OnlineBackup', 'DeviceProtection',
+    'TechSupport', 'StreamingTV', 'StreamingMovies', 'PaperlessBilling',
+    'MonthlyCharges', 'TotalCharges', 'InternetService_Fiber optic',
+    'InternetService_No', 'Contract_One year', 'Contract_Two year',
+    'PaymentMethod_Credit card (automatic)', 'PaymentMethod_Electronic check',
+    'PaymentMethod_Mailed check', 'avg_monthly_value', 'tenure_ratio',
+    'service_density', 'tenure_MonthlyCharges',
+]
+
+# Storage dtype of every feature column in the train/test artifacts. 0/1 and
+# count columns stay integral, which also keeps resampled rows integral.
+FEATURE_DTYPES = {
+    **{name: 'uint8' for name in FEATURE_COLUMNS},
+    'tenure': 'uint16',
+    'MonthlyCharges': 'float32',
+    'TotalCharges': 'float32',
+    'avg_monthly_value': 'float32',
+    'tenure_ratio': 'float32',
+    'tenure_MonthlyCharges': 'float32',
+}
+
+TARGET_ENCODING = {'Yes': 1, 'No': 0}
+
+MANIFEST_VERSION = 1
+
+# Below this many rows (e.g. a single web request), categories are looked up in
+# a plain dict and summed from one stacked table, which avoids the fixed cost
+# of building a pandas Categorical and fancy-indexing per column.
+SMALL_BATCH_ROWS = 64
+
+_OPERATORS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.true_divide,
+}
+
+
+def compile_formula(expression: str):
+    """
+    Compiles an arithmetic feature formula into a vectorized function.
+
+    Args:
+        expression (str): Formula using column names, numbers and + - * /.
+
+    Returns:
+        Callable: Function taking a column lookup `name -> np.ndarray` and
+        returning the computed column.
+
+    Raises:
+        ValueError: If the formula uses anything other than plain arithmetic.
+    """
+
+    def build(node):
+        if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+            op = _OPERATORS[type(node.op)]
+            left, right = build(node.left), build(node.right)
+            return lambda column: op(left(column), right(column))
+        if isinstance(node, ast.Name):
+            name = node.id
+            return lambda column: column(name)
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            value = float(node.value)
+            return lambda column: value
+        raise ValueError(f"Unsupported expression in feature formula: {expression}")
+
+    return build(ast.parse(expression, mode='eval').body)
+
+
+class FeatureEncoder:
+    def __init__(self,
+                 feature_columns=FEATURE_COLUMNS,
+                 numeric_columns=NUMERIC_COLUMNS,
+                 categorical_encodings=CATEGORICAL_ENCODINGS,
+                 engineered_features=ENGINEERED_FEATURES,
+                 feature_dtypes=FEATURE_DTYPES):
+        """
+        Builds the lookup tables that map raw customer columns to the model's
+        feature matrix, shared by the training pipeline and the web app.
+
+        Every categorical column gets a table with one row per category (plus a
+        trailing all-zero row for unknown values), so encoding a batch is a
+        single fancy-indexing operation over the category codes.
+
+        Args:
+            feature_columns (list): Output column order; engineered features last.
+            numeric_columns (list): Raw columns copied as floats.
+            categorical_encodings (dict): Category -> {feature column: value}.
+            engineered_features (dict): Feature column -> arithmetic formula.
+            feature_dtypes (dict): Feature column -> storage dtype for training data.
+        """
+        self.feature_columns = list(feature_columns)
+        self.column_index = {name: i for i, name in enumerate(self.feature_columns)}
+        self.numeric_columns = list(numeric_columns)
+        self.categorical_encodings = categorical_encodings
+        self.engineered_features = engineered_features
+        self.feature_dtypes = {name: feature_dtypes.get(name, 'float64') for name in self.feature_columns}
+        self.n_base = len(self.feature_columns) - len(engineered_features)
+
+        if self.feature_columns[self.n_base:] != list(engineered_features):
+            raise ValueError("Engineered features must come last in the feature column order.")
+
+        self._tables = {}
+        # Row 0 of the stacked table is all zeros and serves unknown categories
+        self._stacked_rows = {}
+        stacked = [np.zeros(self.n_base)]
+        for column, mapping in categorical_encodings.items():
+            categories = pd.Index(list(mapping))
+            outputs = sorted({name for values in mapping.values() for name in values},
+                             key=self.column_index.__getitem__)
+            table = np.zeros((len(categories) + 1, len(outputs)))
+            for row, category in enumerate(categories):
+                for name, value in mapping[category].items():
+                    table[row, outputs.index(name)] = value
+            positions = np.array([self.column_index[name] for name in outputs], dtype=np.intp)
+            self._tables[column] = (categories, positions, table)
+            self._stacked_rows[column] = {}
+            for category, row in zip(categories, table):
+                self._stacked_rows[column][category] = len(stacked)
+                stacked.append(np.zeros(self.n_base))
+                stacked[-1][positions] = row
+        self._stacked_table = np.vstack(stacked)
+
+        self._numeric_positions = [(name, self.column_index[name]) for name in self.numeric_columns]
+        self._formulas = [(self.column_index[name], compile_formula(expression))
+                          for name, expression in engineered_features.items()]
+
+    @property
+    def input_columns(self) -> list:
+        """Raw columns the encoder reads."""
+        return self.numeric_columns + list(self.categorical_encodings)
+
+    @property
+    def base_columns(self) -> list:
+        """Encoded feature columns, excluding the engineered ones."""
+        return self.feature_columns[:self.n_base]
+
+    @property
+    def engineered_columns(self) -> list:
+        """Engineered feature columns."""
+        return self.feature_columns[self.n_base:]
+
+    @property
+    def compact_dtypes(self) -> dict:
+        """
+        Storage dtype per feature column, e.g. uint8 for 0/1 columns and
+        float32 for charges.
+        """
+        return {name: np.dtype(dtype) for name, dtype in self.feature_dtypes.items()}
+
+    def category_codes(self, column: str, values) -> np.ndarray:
+        """
+        Maps raw category values to row indices of the column's lookup table;
+        unknown values get -1, which selects the trailing all-zero row.
+        """
+        categories = self._tables[column][0]
+        return pd.Categorical(values, categories=categories).codes
+
+    @staticmethod
+    def _input(data, column: str):
+        try:
+            return data[column]
+        except KeyError:
+            raise ValueError(f"Missing required input column '{column}'.") from None
+
+    def encode(self, data, out: np.ndarray = None) -> np.ndarray:
+        """
+        Encodes raw columns into the base (non-engineered) feature columns.
+
+        Unknown categories encode to all zeros, but missing values (None or
+        NaN) are rejected: a row without, say, tenure would otherwise be
+        scored with NaN features.
+
+        Args:
+            data: DataFrame or mapping of column name -> array-like of raw values.
+            out (np.ndarray, optional): Preallocated (n, n_base) array to fill.
+
+        Returns:
+            np.ndarray: The filled (n, n_base) float array.
+
+        Raises:
+            ValueError: If an input column is missing, has missing values, or
+                has numeric values that are not finite numbers.
+        """
+        n_rows = len(self._input(data, self.numeric_columns[0]))
+        if out is None:
+            out = np.empty((n_rows, self.n_base))
+
+        if n_rows < SMALL_BATCH_ROWS and not isinstance(data, pd.DataFrame):
+            rows = []
+            for column in self.categorical_encodings:
+                values = self._input(data, column)
+                if any(value is None or value != value for value in values):
+                    raise ValueError(f"Missing value for required input column '{column}'.")
+                rows.append([self._stacked_rows[column].get(value, 0) for value in values])
+            out[:] = self._stacked_table[rows].sum(axis=0)
+        else:
+            for column, (_, positions, table) in self._tables.items():
+                values = self._input(data, column)
+                codes = self.category_codes(column, values)
+                unknown = codes < 0
+                # Unknown and missing values both get code -1; only look closer then
+                if unknown.any() and pd.isna(np.asarray(values, dtype=object)[unknown]).any():
+                    raise ValueError(f"Missing value for required input column '{column}'.")
+                out[:, positions] = table[codes]
+
+        for name, position in self._numeric_positions:
+            try:
+                out[:, position] = np.asarray(self._input(data, name), dtype=np.float64)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Invalid value for numeric input column '{name}': {e}") from None
+            if not np.isfinite(out[:, position]).all():
+                raise ValueError(f"Missing or non-finite value for numeric input column '{name}'.")
+
+        return out
+
+    def engineer(self, data) -> np.ndarray:
+        """
+        Computes the engineered features from encoded columns.
+
+        Args:
+            data: DataFrame or mapping of encoded column name -> array-like.
+
+        Returns:
+            np.ndarray: (n, n_engineered) float array in feature column order.
+        """
+        column = lambda name: np.asarray(data[name], dtype=np.float64)
+        return np.column_stack([formula(column) for _, formula in self._formulas])
+
+    def transform(self, data) -> np.ndarray:
+        """
+        Builds the full feature matrix (encoded and engineered columns) for a
+        batch of one or more raw customer records.
+
+        Args:
+            data: DataFrame or mapping of column name -> array-like of raw values.
+
+        Returns:
+            np.ndarray: (n, n_features) float array in `feature_columns` order.
+
+        Raises:
+            ValueError: If a required input is missing or not a finite number.
+        """
+        n_rows = len(self._input(data, self.numeric_columns[0]))
+        out = np.empty((n_rows, len(self.feature_columns)))
+        self.encode(data, out=out[:, :self.n_base])
+
+        column = lambda name: out[:, self.column_index[name]]
+        for position, formula in self._formulas:
+            out[:, position] = formula(column)
+
+        return out
+
+    def to_manifest(self) -> dict:
+        """
+        Describes the encoder as a JSON-serializable feature manifest: column
+        order and dtypes, category-to-index lookup tables and the engineered
+        feature formulas.
+        """
+        categorical = {}
+        for column, (categories, positions, table) in self._tables.items():
+            categorical[column] = {
+                'categories': list(categories),
+                'columns': [self.feature_columns[p] for p in positions],
+                'table': table[:-1].tolist(),
+            }
+
+        input_dtypes = {name: 'float64' for name in self.numeric_columns}
+        input_dtypes.update({name: 'category' for name in self.categorical_encodings})
+        return {
+            'version': MANIFEST_VERSION,
+            'feature_columns': self.feature_columns,
+            'dtypes': self.feature_dtypes,
+            'matrix_dtype': 'float64',
+            'input_dtypes': input_dtypes,
+            'numeric_columns': self.numeric_columns,
+            'categorical': categorical,
+            'engineered_features': dict(self.engineered_features),
+            'target': {'name': 'Churn', 'encoding': TARGET_ENCODING},
+        }
+
+    def save_manifest(self, path: Path):
+        """
+        Writes the feature manifest as JSON to the given path.
+        """
+        with open(path, 'w') as f:
+            json.dump(self.to_manifest(), f, indent=4)
+
+    @classmethod
+    def from_manifest(cls, manifest: dict) -> 'FeatureEncoder':
+        """
+        Rebuilds an encoder from a feature manifest.
+
+        Raises:
+            ValueError: If the manifest version is not supported.
+        """
+        if manifest.get('version') != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported feature manifest version: {manifest.get('version')}")
+
+        categorical_encodings = {}
+        for column, spec in manifest['categorical'].items():
+            categorical_encodings[column] = {
+                category: {name: value for name, value in zip(spec['columns'], row) if value}
+                for category, row in zip(spec['categories'], spec['table'])
+            }
+
+        return cls(feature_columns=manifest['feature_columns'],
+                   numeric_columns=manifest['numeric_columns'],
+                   categorical_encodings=categorical_encodings,
+                   engineered_features=manifest['engineered_features'],
+                   feature_dtypes=manifest['dtypes'])
+
+    @classmethod
+    def load(cls, path: Path) -> 'FeatureEncoder':
+        """
+        Loads an encoder from a feature manifest JSON file.
+        """
+        with open(path) as f:
+            return cls.from_manifest(json.load(f))
+
+
+def encode_target(values) -> np.ndarray:
+    """
+    Encodes the Churn column ('Yes'/'No') as 1/0.
+    """
+    codes = pd.Categorical(values, categories=list(TARGET_ENCODING)).codes
+    return np.array(list(TARGET_ENCODING.values()) + [0], dtype=np.int64)[codes]
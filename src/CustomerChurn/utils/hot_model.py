@@ -0,0 +1,239 @@
+import os
+import time
+import threading
+import joblib
+import numpy as np
+from pathlib import Path
+from CustomerChurn import logger
+from CustomerChurn.utils.artifact_cache import file_md5
+from CustomerChurn.utils.compiled_model import CompiledModel
+from CustomerChurn.utils.features import FeatureEncoder
+from CustomerChurn.utils.model_registry import ModelRegistry
+
+MODEL_FILE = "model.joblib"
+COMPILED_MODEL_DIR = "model_compiled"
+FEATURE_MANIFEST_FILE = "feature_manifest.json"
+# Written last by ModelTrainer, holding the md5 of model.joblib, once every
+# unversioned model file is in place
+READY_FILE = "READY"
+
+# Version reported for a model served straight from saved_models/
+UNVERSIONED = "unversioned"
+
+
+class ServedModel:
+    def __init__(self, version: str, checksum: str, model_dir: Path, mmap_mode: str, compiled_max_rows: int):
+        """
+        A model version loaded for serving: the estimator, its compiled NumPy
+        bundle and the feature encoder of its manifest.
+
+        Args:
+            version (str): Registry version, or 'unversioned'.
+            checksum (str): Content checksum; keys the prediction cache.
+            model_dir (Path): Directory with model.joblib, feature_manifest.json
+                and optionally model_compiled/.
+            mmap_mode (str): joblib/NumPy memory-map mode for the arrays.
+            compiled_max_rows (int): Batches up to this size use the compiled bundle.
+
+        Raises:
+            ValueError: If the manifest's column order does not match the model.
+        """
+        start = time.perf_counter()
+        self.version = version
+        self.checksum = checksum
+        self.model_dir = Path(model_dir)
+        self.compiled_max_rows = compiled_max_rows
+        self.model = joblib.load(self.model_dir / MODEL_FILE, mmap_mode=mmap_mode)
+        compiled_path = self.model_dir / COMPILED_MODEL_DIR
+        self.compiled_model = CompiledModel.load(compiled_path, mmap_mode=mmap_mode) if compiled_path.is_dir() else None
+        manifest_path = self.model_dir / FEATURE_MANIFEST_FILE
+        self.encoder = FeatureEncoder.load(manifest_path) if manifest_path.exists() else FeatureEncoder()
+
+        if hasattr(self.model, "feature_names_in_") and list(self.model.feature_names_in_) != self.encoder.feature_columns:
+            raise ValueError("Feature manifest column order does not match the trained model.")
+
+        self.load_seconds = time.perf_counter() - start
+        self.warmup_seconds = 0.0
+        self.loaded_at = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+
+    def predict_probability(self, features) -> np.ndarray:
+        """
+        Returns the churn probability for every row of the feature matrix.
+        """
+        if self.compiled_model is not None and len(features) <= self.compiled_max_rows:
+            return self.compiled_model.predict_proba(features)[:, 1]
+        return self.model.predict_proba(features)[:, 1]
+
+    def synthetic_records(self, n_rows: int, seed: int = 0) -> dict:
+        """
+        Random raw customer columns covering every category, for warm-up.
+        """
+        rng = np.random.default_rng(seed)
+        data = {name: rng.uniform(0, 100, n_rows) for name in self.encoder.numeric_columns}
+        for column, mapping in self.encoder.categorical_encodings.items():
+            data[column] = rng.choice(list(mapping), n_rows).tolist()
+        return data
+
+    def warm_up(self, n_rows: int):
+        """
+        Scores synthetic rows through the encoder and both prediction paths,
+        so the first real requests do not pay for page faults on the
+        memory-mapped arrays or lazily initialized model state.
+        """
+        start = time.perf_counter()
+        features = self.encoder.transform(self.synthetic_records(max(n_rows, 1)))
+        for size in {1, min(self.compiled_max_rows, len(features)), len(features)}:
+            self.predict_probability(features[:size])
+        self.warmup_seconds = time.perf_counter() - start
+
+    def describe(self) -> dict:
+        return {
+            "version": self.version,
+            "checksum": self.checksum,
+            "model_dir": str(self.model_dir),
+            "model_class": type(self.model).__name__,
+            "compiled": self.compiled_model is not None,
+            "loaded_at": self.loaded_at,
+            "load_seconds": round(self.load_seconds, 4),
+            "warmup_seconds": round(self.warmup_seconds, 4),
+        }
+
+
+class HotModel:
+    def __init__(self, registry_dir: Path, fallback_dir: Path, poll_interval: float, warmup_rows: int,
+                 mmap_mode: str = "r", compiled_max_rows: int = 16):
+        """
+        Serves the current model of the registry and swaps in new versions
+        without a restart.
+
+        The first model is loaded synchronously. Afterwards `current()` checks
+        the registry's CURRENT file at most every `poll_interval` seconds; when
+        it names another version, that version is verified against its
+        manifest, loaded and warmed up in a background thread while requests
+        keep using the old one, then swapped in with a single reference
+        assignment. Requests take one reference at their start, so each is
+        served entirely by one version. A version that fails to load is
+        logged and skipped, and the old model stays active.
+
+        Without a registry, the model files in `fallback_dir` are served and
+        reloaded when its READY marker changes, which the trainer writes
+        after all the other files, so a reload never sees a partly written
+        set; a model.joblib that does not match the marker is not loaded.
+        Directories without a marker are reloaded when model.joblib changes.
+
+        Args:
+            registry_dir (Path): Root of the model registry.
+            fallback_dir (Path): Directory with the unversioned model files.
+            poll_interval (float): Seconds between checks for a new version.
+            warmup_rows (int): Synthetic rows scored before a swap.
+            mmap_mode (str): Memory-map mode for the model arrays.
+            compiled_max_rows (int): Batches up to this size use the compiled bundle.
+        """
+        self.registry = ModelRegistry(registry_dir)
+        self.fallback_dir = Path(fallback_dir)
+        self.poll_interval = poll_interval
+        self.warmup_rows = warmup_rows
+        self.mmap_mode = mmap_mode
+        self.compiled_max_rows = compiled_max_rows
+        self._lock = threading.Lock()
+        self._loader = None
+        self._loader_pid = None
+        self._checked_at = time.monotonic()
+        self.reloads = 0
+        self.last_error = None
+
+        self._source = self._current_source()
+        try:
+            self.active = self._load(self._source)
+        except (OSError, ValueError) as e:
+            if not isinstance(self._source, str):
+                raise
+            # Keep the app up on the unversioned files if the registry is broken
+            logger.error(f"Failed to load model {self._source}, serving {self.fallback_dir} instead: {e}")
+            self.last_error = f"{self._source}: {e}"
+            self.active = self._load(self._fallback_source())
+
+    def _current_source(self):
+        """
+        Identifies the model to serve: the registry's current version, or the
+        stat of the unversioned model file.
+        """
+        version = self.registry.current_version()
+        if version is not None:
+            return version
+        return self._fallback_source()
+
+    def _fallback_source(self):
+        marker = self.fallback_dir / READY_FILE
+        try:
+            stat = os.stat(marker if marker.exists() else self.fallback_dir / MODEL_FILE)
+            return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            return None
+
+    def _load(self, source) -> ServedModel:
+        if isinstance(source, str):
+            checksum = self.registry.verify(source)["checksum"]
+            served = ServedModel(source, checksum, self.registry.path(source), self.mmap_mode, self.compiled_max_rows)
+        else:
+            checksum = file_md5(self.fallback_dir / MODEL_FILE)
+            marker = self.fallback_dir / READY_FILE
+            if marker.exists() and marker.read_text().strip() != checksum:
+                raise ValueError(f"{self.fallback_dir / MODEL_FILE} does not match its {READY_FILE} marker")
+            served = ServedModel(UNVERSIONED, checksum, self.fallback_dir, self.mmap_mode, self.compiled_max_rows)
+        served.warm_up(self.warmup_rows)
+        logger.info(f"Loaded model {served.version} in {served.load_seconds:.3f}s "
+                    f"(warm-up {served.warmup_seconds:.3f}s)")
+        return served
+
+    def _reload(self, source):
+        try:
+            served = self._load(source)
+            self.active = served
+            self.reloads += 1
+            self.last_error = None
+        except Exception as e:
+            self.last_error = f"{source}: {e}"
+            logger.error(f"Failed to load model {source}, keeping {self.active.version}: {e}")
+
+    def current(self) -> ServedModel:
+        """
+        Returns the active model, starting a background reload first if the
+        registry points at a new version.
+        """
+        now = time.monotonic()
+        if now - self._checked_at >= self.poll_interval:
+            with self._lock:
+                if now - self._checked_at >= self.poll_interval:
+                    self._checked_at = now
+                    self._check()
+        return self.active
+
+    def _check(self):
+        # A loader thread started before a fork does not exist in the child
+        loading = self._loader is not None and self._loader_pid == os.getpid() and self._loader.is_alive()
+        if loading:
+            return
+        source = self._current_source()
+        if source is None or source == self._source:
+            return
+        self._source = source
+        self._loader = threading.Thread(target=self._reload, args=(source,), name="model-reload", daemon=True)
+        self._loader_pid = os.getpid()
+        self._loader.start()
+
+    def status(self) -> dict:
+        """
+        Returns the active model's details, the reload count and the last
+        load error.
+        """
+        loading = self._loader is not None and self._loader_pid == os.getpid() and self._loader.is_alive()
+        return {
+            **self.active.describe(),
+            "registry": str(self.registry.root_dir),
+            "registry_versions": self.registry.versions(),
+            "reloads": self.reloads,
+            "loading": loading,
+            "last_error": self.last_error,
+            "pid": os.getpid(),
+        }
@@ -0,0 +1,145 @@
+import numpy as np
+
+
+def score_curve(actual, scores) -> dict:
+    """
+    Sorts the scores once and returns the cumulative true and false positive
+    counts at every distinct score, from the highest down. Every metric,
+    curve and threshold sweep below is read off these counts without
+    sorting or scanning the rows again.
+
+    Args:
+        actual (array-like): True 0/1 labels.
+        scores (array-like): Positive-class scores, higher meaning more likely.
+
+    Returns:
+        dict: `thresholds` (distinct scores, descending), `tps` and `fps`
+        (rows at or above each threshold that are positive / negative), and
+        the `positives` and `negatives` totals.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    order = np.argsort(scores, kind="stable")[::-1]
+    sorted_scores = scores[order]
+    sorted_actual = np.asarray(actual)[order].astype(bool)
+
+    # Last row of every run of equal scores
+    last = np.r_[np.flatnonzero(np.diff(sorted_scores)), len(scores) - 1] if len(scores) else np.array([], int)
+    tps = np.cumsum(sorted_actual, dtype=np.int64)[last]
+    fps = last + 1 - tps
+    return {
+        "thresholds": sorted_scores[last],
+        "tps": tps,
+        "fps": fps,
+        "positives": int(tps[-1]) if len(tps) else 0,
+        "negatives": int(fps[-1]) if len(fps) else 0,
+    }
+
+
+def counts_above(curve: dict, thresholds) -> tuple:
+    """
+    Returns the true and false positives when rows scoring at or above
+    each threshold are predicted positive, the convention of
+    `best_f1_threshold` and of the served models (`probability >= threshold`).
+    """
+    # Distinct scores >= threshold, counted on the descending score order
+    k = np.searchsorted(-curve["thresholds"], -np.asarray(thresholds, dtype=np.float64), side="right")
+    tp = np.where(k > 0, curve["tps"][np.maximum(k - 1, 0)], 0)
+    fp = np.where(k > 0, curve["fps"][np.maximum(k - 1, 0)], 0)
+    return tp, fp
+
+
+def _ratio(numerator, denominator):
+    numerator, denominator = np.asarray(numerator, dtype=np.float64), np.asarray(denominator, dtype=np.float64)
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+
+def threshold_metrics(curve: dict, thresholds) -> dict:
+    """
+    Computes the confusion counts, accuracy, precision, recall and F1 at each
+    threshold (predicting positive at or above it), vectorized over thresholds.
+
+    Returns:
+        dict: Metric name -> array with one value per threshold.
+    """
+    tp, fp = counts_above(curve, thresholds)
+    positives, negatives = curve["positives"], curve["negatives"]
+    fn, tn = positives - tp, negatives - fp
+    return {
+        "threshold": np.asarray(thresholds, dtype=np.float64),
+        "tp": tp, "fp": fp, "fn": fn, "tn": tn,
+        "accuracy": _ratio(tp + tn, positives + negatives),
+        "precision": _ratio(tp, tp + fp),
+        "recall": _ratio(tp, positives),
+        "f1": _ratio(2 * tp, 2 * tp + fp + fn),
+    }
+
+
+def roc_pr_curves(curve: dict) -> dict:
+    """
+    Returns the ROC and precision-recall curves with their areas. ROC AUC
+    uses the trapezoidal rule and PR AUC is the average precision, matching
+    scikit-learn's roc_auc_score and average_precision_score.
+    """
+    tps, fps = curve["tps"], curve["fps"]
+    fpr = np.r_[0.0, _ratio(fps, curve["negatives"])]
+    tpr = np.r_[0.0, _ratio(tps, curve["positives"])]
+    precision = _ratio(tps, tps + fps)
+    recall = _ratio(tps, curve["positives"])
+    return {
+        "fpr": fpr,
+        "tpr": tpr,
+        # Trapezoidal area written out; np.trapezoid needs NumPy 2 and np.trapz is gone there
+        "roc_auc": (float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+                    if curve["positives"] and curve["negatives"] else float("nan")),
+        "precision": precision,
+        "recall": recall,
+        "pr_auc": float(np.sum(np.diff(np.r_[0.0, recall]) * precision)),
+    }
+
+
+def best_f1_threshold(curve: dict) -> dict:
+    """
+    Returns the score threshold that maximises F1, predicting positive at or
+    above it, and the F1 reached.
+    """
+    f1 = _ratio(2 * curve["tps"], curve["tps"] + curve["fps"] + curve["positives"])
+    best = int(np.argmax(f1))
+    return {"threshold": float(curve["thresholds"][best]), "f1": float(f1[best])}
+
+
+def calibration(actual, scores, n_bins: int = 10) -> dict:
+    """
+    Bins the scores into `n_bins` equal-width bins over [0, 1] and compares
+    the mean predicted probability with the observed positive rate of each
+    bin.
+
+    Returns:
+        dict: Per-bin `count`, `mean_predicted` and `fraction_positive`, the
+        expected calibration error (`ece`) and the Brier score.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    actual = np.asarray(actual, dtype=np.float64)
+    bins = np.clip((scores * n_bins).astype(np.int64), 0, n_bins - 1)
+    count = np.bincount(bins, minlength=n_bins)
+    mean_predicted = _ratio(np.bincount(bins, weights=scores, minlength=n_bins), count)
+    fraction_positive = _ratio(np.bincount(bins, weights=actual, minlength=n_bins), count)
+    n = max(len(scores), 1)
+    return {
+        "count": count,
+        "mean_predicted": mean_predicted,
+        "fraction_positive": fraction_positive,
+        "ece": float(np.sum(count / n * np.abs(fraction_positive - mean_predicted))),
+        "brier_score": float(np.mean((scores - actual) ** 2)) if len(scores) else float("nan"),
+    }
+
+
+def downsample(max_points: int, *arrays) -> list:
+    """
+    Keeps at most `max_points` evenly spaced points (always including both
+    ends) of curves sharing one length, for reports and plots.
+    """
+    length = len(arrays[0])
+    if length <= max_points:
+        return [np.asarray(array) for array in arrays]
+    index = np.unique(np.linspace(0, length - 1, max_points).round().astype(np.int64))
+    return [np.asarray(array)[index] for array in arrays]
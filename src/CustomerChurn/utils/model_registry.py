@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+from pathlib import Path
+from CustomerChurn import logger
+from CustomerChurn.utils.artifact_cache import file_md5
+
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+VERSION_PREFIX = "v"
+
+
+class ModelRegistry:
+    def __init__(self, root_dir: Path, keep_versions: int = 5):
+        """
+        Local registry of model versions.
+
+        Every published model is an immutable directory `v0001`, `v0002`, ...
+        holding the model files and a `manifest.json` with the md5 of each file
+        and a checksum over all of them. The `CURRENT` file names the version
+        the web app serves. Versions are assembled in a temporary directory and
+        renamed into place, and `CURRENT` is replaced with a rename, so readers
+        never see a partially written version.
+
+        Args:
+            root_dir (Path): Directory holding the versions.
+            keep_versions (int): Published versions kept; older ones are
+                deleted, except the current one.
+        """
+        self.root_dir = Path(root_dir)
+        self.keep_versions = keep_versions
+
+    def versions(self) -> list:
+        """
+        Returns the published versions, oldest first.
+        """
+        if not self.root_dir.is_dir():
+            return []
+        return sorted(p.name for p in self.root_dir.iterdir()
+                      if p.is_dir() and p.name.startswith(VERSION_PREFIX) and (p / MANIFEST_FILE).exists())
+
+    def path(self, version: str) -> Path:
+        return self.root_dir / version
+
+    def current_version(self) -> str:
+        """
+        Returns the version named by `CURRENT`, or None for an empty registry.
+        """
+        try:
+            return (self.root_dir / CURRENT_FILE).read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def manifest(self, version: str) -> dict:
+        with open(self.path(version) / MANIFEST_FILE) as f:
+            return json.load(f)
+
+    @staticmethod
+    def _files(version_dir: Path) -> dict:
+        files = {}
+        for path in sorted(version_dir.rglob("*")):
+            if path.is_file() and path.name != MANIFEST_FILE:
+                files[path.relative_to(version_dir).as_posix()] = file_md5(path)
+        return files
+
+    @staticmethod
+    def _checksum(files: dict) -> str:
+        digest = hashlib.md5()
+        for name, md5 in sorted(files.items()):
+            digest.update(f"{name}:{md5}\n".encode())
+        return digest.hexdigest()
+
+    def verify(self, version: str) -> dict:
+        """
+        Recomputes the checksums of a version's files.
+
+        Returns:
+            dict: The version's manifest.
+
+        Raises:
+            ValueError: If a file is missing, extra or modified.
+        """
+        manifest = self.manifest(version)
+        files = self._files(self.path(version))
+        if files != manifest["files"] or self._checksum(files) != manifest["checksum"]:
+            changed = sorted(set(files.items()) ^ set(manifest["files"].items()))
+            raise ValueError(f"Model version {version} does not match its manifest: {changed}")
+        return manifest
+
+    def find(self, sources: dict) -> str:
+        """
+        Returns the newest version holding exactly the given model files, or
+        None if none does.
+
+        Args:
+            sources (dict): Name inside the version -> file or directory, as
+                passed to `publish`.
+        """
+        files = {}
+        for name, source in sources.items():
+            if os.path.isdir(source):
+                files.update({f"{name}/{relative}": md5 for relative, md5 in self._files(Path(source)).items()})
+            else:
+                files[name] = file_md5(source)
+        checksum = self._checksum(files)
+        for version in reversed(self.versions()):
+            if self.manifest(version)["checksum"] == checksum:
+                return version
+        return None
+
+    def publish(self, sources: dict, metadata: dict = None, activate: bool = True) -> str:
+        """
+        Copies model files into a new version and, by default, makes it the
+        current one.
+
+        Args:
+            sources (dict): Name inside the version -> file or directory to copy.
+            metadata (dict, optional): Extra manifest fields, e.g. the model
+                class and its parameters.
+            activate (bool): Whether to point `CURRENT` at the new version.
+
+        Returns:
+            str: The new version.
+        """
+        os.makedirs(self.root_dir, exist_ok=True)
+        versions = self.versions()
+        number = int(versions[-1][len(VERSION_PREFIX):]) + 1 if versions else 1
+        version = f"{VERSION_PREFIX}{number:04d}"
+
+        staging = self.root_dir / f".{version}.tmp"
+        if staging.exists():
+            shutil.rmtree(staging)
+        os.makedirs(staging)
+        for name, source in sources.items():
+            if os.path.isdir(source):
+                shutil.copytree(source, staging / name)
+            else:
+                shutil.copyfile(source, staging / name)
+
+        files = self._files(staging)
+        manifest = {
+            "version": version,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "checksum": self._checksum(files),
+            "files": files,
+            **(metadata or {}),
+        }
+        with open(staging / MANIFEST_FILE, "w") as f:
+            json.dump(manifest, f, indent=4)
+        os.rename(staging, self.path(version))
+        logger.info(f"Published model version {version} (checksum {manifest['checksum']})")
+
+        if activate:
+            self.activate(version)
+        self.prune()
+        return version
+
+    def activate(self, version: str):
+        """
+        Points `CURRENT` at a published version; also used to roll back.
+
+        Raises:
+            ValueError: If the version does not exist.
+        """
+        if version not in self.versions():
+            raise ValueError(f"Unknown model version: {version}")
+        tmp_path = self.root_dir / f".{CURRENT_FILE}.tmp"
+        tmp_path.write_text(version + "\n")
+        os.replace(tmp_path, self.root_dir / CURRENT_FILE)
+        logger.info(f"Model version {version} activated")
+
+    def prune(self):
+        """
+        Deletes the oldest versions beyond `keep_versions`, never the current one.
+        """
+        current = self.current_version()
+        stale = [v for v in self.versions()[:-self.keep_versions] if v != current] if self.keep_versions > 0 else []
+        for version in stale:
+            shutil.rmtree(self.path(version), ignore_errors=True)
+            logger.info(f"Deleted old model version {version}")
@@ -0,0 +1,155 @@
+import os
+import json
+from datetime import datetime
+from pathlib import Path
+import pandas as pd
+from CustomerChurn import logger
+from CustomerChurn.utils.common import artifact_path, read_table, write_table
+from CustomerChurn.utils.artifact_cache import file_md5
+
+# Store manifest recording every partition, its row count and its source
+MANIFEST_FILE = "_manifest.json"
+
+
+def delta_date(path: Path, date_format: str) -> str:
+    """
+    Returns the partition date of a daily delta file named after its day
+    (e.g. 2024-05-01.csv), normalised to YYYY-MM-DD, or None if the file
+    name is not a date.
+    """
+    try:
+        return datetime.strptime(Path(path).stem, date_format).strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def list_deltas(delta_dir: Path, date_format: str) -> dict:
+    """
+    Returns the daily delta CSV files of a directory keyed by partition date.
+    """
+    deltas = {}
+    for path in sorted(Path(delta_dir).glob("*.csv")):
+        date = delta_date(path, date_format)
+        if date is None:
+            logger.warning(f"Skipping {path}: file name does not match the date format {date_format}")
+            continue
+        deltas[date] = path
+    return deltas
+
+
+def load_manifest(store_dir: Path) -> dict:
+    path = Path(store_dir) / MANIFEST_FILE
+    if not path.exists():
+        return {"partitions": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(store_dir: Path, manifest: dict):
+    # Write then rename, so readers never see a half-written manifest
+    path = Path(store_dir) / MANIFEST_FILE
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def delta_sources(deltas: dict, store_dir: Path) -> dict:
+    """
+    Identifies every delta file by md5, size and modification time.
+
+    Files whose size and modification time match the source recorded for
+    their partition in the store reuse its md5, so the history is not reread
+    on every run.
+
+    Args:
+        deltas (dict): Partition date -> delta file, from `list_deltas`.
+        store_dir (Path): Store whose manifest records the known sources.
+
+    Returns:
+        dict: Partition date -> {"md5", "size", "mtime_ns"}.
+    """
+    stored = load_manifest(store_dir)["partitions"]
+    sources = {}
+    for date, path in deltas.items():
+        stat = os.stat(path)
+        known = stored.get(date, {}).get("source", {})
+        if known.get("size") == stat.st_size and known.get("mtime_ns") == stat.st_mtime_ns:
+            md5 = known["md5"]
+        else:
+            md5 = file_md5(path)
+        sources[date] = {"md5": md5, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    return sources
+
+
+def pending_partitions(sources: dict, store_dir: Path) -> list:
+    """
+    Returns the dates whose source is not in the store yet, or has changed
+    since it was stored (a re-delivered delta).
+
+    Args:
+        sources (dict): Partition date -> source of the partition, from
+            `delta_sources`. Stores derived from another store carry the
+            delta source along, so they are compared on the same md5.
+        store_dir (Path): The partitioned store.
+    """
+    stored = load_manifest(store_dir)["partitions"]
+    return sorted(date for date, source in sources.items()
+                  if date not in stored or stored[date]["source"]["md5"] != source["md5"])
+
+
+def write_partition(data: pd.DataFrame, store_dir: Path, date: str, source: dict,
+                    artifact_format: str, dtype: dict = None):
+    """
+    Writes one date partition (`date=YYYY-MM-DD/part.<format>`) of a store
+    and records it and its source in the store manifest, replacing an
+    earlier version.
+    """
+    path = artifact_path(Path(store_dir) / f"date={date}" / "part.csv", artifact_format)
+    os.makedirs(path.parent, exist_ok=True)
+    write_table(data, path, dtype=dtype)
+
+    manifest = load_manifest(store_dir)
+    manifest["partitions"][date] = {
+        "file": path.relative_to(store_dir).as_posix(),
+        "rows": len(data),
+        "md5": file_md5(path),
+        "source": source,
+    }
+    save_manifest(store_dir, manifest)
+
+
+def read_partitioned(store_dir: Path, key: str, columns: list = None, dtype: dict = None,
+                     dates: list = None) -> pd.DataFrame:
+    """
+    Reads a partitioned store, keeping only the latest row of every key.
+
+    Partitions are read in date order, so a customer present in several
+    daily deltas keeps the values of the most recent one.
+
+    Args:
+        store_dir (Path): The partitioned store.
+        key (str): Deduplication column, e.g. customerID.
+        columns (list, optional): Only read these columns; `key` is always read.
+        dtype (dict, optional): Column -> dtype schema to enforce.
+        dates (list, optional): Only read these partitions, without deduplicating
+            against the others.
+
+    Returns:
+        pd.DataFrame: The deduplicated rows, with a fresh index.
+    """
+    partitions = load_manifest(store_dir)["partitions"]
+    read_columns = None if columns is None else [key] + [col for col in columns if col != key]
+    frames = [read_table(Path(store_dir) / partitions[date]["file"], columns=read_columns, dtype=dtype)
+              for date in sorted(dates if dates is not None else partitions)]
+    if not frames:
+        return pd.DataFrame(columns=read_columns)
+
+    data = pd.concat(frames, ignore_index=True)
+    if dtype:
+        # Categoricals with different categories per partition concat to object
+        data = data.astype({col: typ for col, typ in dtype.items() if col in data.columns})
+    rows = len(data)
+    data = data.drop_duplicates(subset=[key], keep="last", ignore_index=True)
+    logger.info(f"Read {len(frames)} partitions from {store_dir}: {len(data)} rows "
+                f"({rows - len(data)} superseded duplicates dropped)")
+    return data
@@ -0,0 +1,70 @@
+import multiprocessing
+import numpy as np
+
+
+def render_evaluation_plots(report: dict, paths: dict):
+    """
+    Renders the evaluation plots from precomputed (downsampled) curves with
+    the non-interactive Agg backend.
+
+    Args:
+        report (dict): `confusion_matrix`, `roc`, `pr` and `calibration`
+            entries of the evaluation curves report.
+        paths (dict): Plot name ('confusion_matrix', 'roc_curve', 'pr_curve',
+            'calibration_curve') -> output PNG path.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from sklearn.metrics import ConfusionMatrixDisplay
+
+    ConfusionMatrixDisplay(confusion_matrix=np.array(report["confusion_matrix"])).plot(cmap=plt.cm.Blues)
+    plt.title("Confusion Matrix")
+    plt.savefig(paths["confusion_matrix"])
+    plt.close()
+
+    roc = report["roc"]
+    plt.figure()
+    plt.plot(roc["fpr"], roc["tpr"], label=f"AUC = {roc['auc']:.3f}")
+    plt.plot([0, 1], [0, 1], linestyle="--", color="grey")
+    plt.xlabel("False Positive Rate")
+    plt.ylabel("True Positive Rate")
+    plt.legend(loc="lower right")
+    plt.title("ROC Curve")
+    plt.savefig(paths["roc_curve"])
+    plt.close()
+
+    pr = report["pr"]
+    plt.figure()
+    plt.step(pr["recall"], pr["precision"], where="post", label=f"AP = {pr['auc']:.3f}")
+    plt.xlabel("Recall")
+    plt.ylabel("Precision")
+    plt.legend(loc="lower left")
+    plt.title("Precision-Recall Curve")
+    plt.savefig(paths["pr_curve"])
+    plt.close()
+
+    calibration = report["calibration"]
+    filled = np.array(calibration["count"]) > 0
+    plt.figure()
+    plt.plot([0, 1], [0, 1], linestyle="--", color="grey")
+    plt.plot(np.array(calibration["mean_predicted"])[filled],
+             np.array(calibration["fraction_positive"])[filled], marker="o")
+    plt.xlabel("Mean predicted probability")
+    plt.ylabel("Fraction of positives")
+    plt.title(f"Calibration (ECE = {calibration['ece']:.3f})")
+    plt.savefig(paths["calibration_curve"])
+    plt.close()
+
+
+def start_plot_process(report: dict, paths: dict) -> multiprocessing.Process:
+    """
+    Renders the evaluation plots in a separate process, so the caller keeps
+    working while matplotlib draws. The process is spawned rather than
+    forked, since forking a process with running BLAS or OpenMP threads can
+    deadlock the child. Join it before using the files.
+    """
+    process = multiprocessing.get_context("spawn").Process(
+        target=render_evaluation_plots, args=(report, paths), name="evaluation-plots")
+    process.start()
+    return process
@@ -0,0 +1,205 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from CustomerChurn import logger
+
+# Shared-tier writes between two deletions of expired rows
+PRUNE_EVERY = 1000
+
+
+class PredictionCache:
+    def __init__(self, max_entries: int, ttl_seconds: float, shared_path=None):
+        """
+        Cache of churn probabilities keyed by the encoded feature vector and
+        the version of the model that produced them.
+
+        Keys are the blake2b digest of the model checksum and the canonical
+        bytes of the feature row (float64, -0.0 folded into 0.0), so a key
+        never matches a prediction of another model. Entries live in an
+        in-process LRU of `max_entries` rows and expire after `ttl_seconds`.
+        With `shared_path`, a SQLite file (put it on /dev/shm for a
+        memory-backed store) is a second tier shared by every gunicorn worker
+        on the host.
+
+        When a lookup comes with a new model checksum, both tiers drop the
+        entries of the old one.
+
+        Args:
+            max_entries (int): Capacity of the in-process tier.
+            ttl_seconds (float): Lifetime of an entry.
+            shared_path (Path, optional): SQLite file of the shared tier.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.shared_path = shared_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        self._connection_pid = None
+        self._writes = 0
+        self.model_version = None
+        self._retired = set()
+        self.counters = {"hits": 0, "shared_hits": 0, "misses": 0, "expired": 0, "evictions": 0,
+                         "invalidations": 0}
+
+    def _observe(self, version: str):
+        """
+        Drops the entries of the previous model the first time a new model
+        version is seen. Requests still finishing on the old model after a
+        swap neither flip the version back nor clear the cache again.
+        """
+        if version == self.model_version or version in self._retired:
+            return
+        with self._lock:
+            if self.model_version is not None:
+                self._retired.add(self.model_version)
+                self._entries.clear()
+                self.counters["invalidations"] += 1
+                logger.info(f"Model changed ({self.model_version} -> {version}), prediction cache cleared")
+            self.model_version = version
+        if self.shared_path:
+            try:
+                self._shared().execute("DELETE FROM predictions WHERE version != ?", (version,))
+            except sqlite3.Error as e:
+                logger.warning(f"Shared prediction cache unavailable: {e}")
+
+    def _shared(self) -> sqlite3.Connection:
+        # Connections are not shared across fork, so each worker opens its own
+        if self._connection is None or self._connection_pid != os.getpid():
+            connection = sqlite3.connect(self.shared_path, timeout=1.0, isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute("CREATE TABLE IF NOT EXISTS predictions "
+                               "(key BLOB PRIMARY KEY, version TEXT, probability REAL, expires REAL)")
+            self._connection, self._connection_pid = connection, os.getpid()
+        return self._connection
+
+    @staticmethod
+    def keys(features: np.ndarray, model_version: str) -> list:
+        """
+        Returns the cache key of every row of an encoded feature matrix.
+        """
+        rows = np.ascontiguousarray(np.asarray(features, dtype=np.float64) + 0.0)
+        prefix = model_version.encode()
+        return [hashlib.blake2b(prefix + row.tobytes(), digest_size=16).digest() for row in rows]
+
+    def _get_local(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        probability, expires = entry
+        if expires < now:
+            del self._entries[key]
+            self.counters["expired"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return probability
+
+    def _put_local(self, key, probability, expires):
+        self._entries[key] = (probability, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def get_or_compute(self, features: np.ndarray, compute, model_version: str) -> np.ndarray:
+        """
+        Returns the probability of every row, scoring only the rows found in
+        neither tier with one call of `compute` and caching them.
+
+        Args:
+            features (np.ndarray): Encoded feature matrix.
+            compute (callable): Feature matrix -> probabilities.
+            model_version (str): Checksum of the model behind `compute`.
+
+        Returns:
+            np.ndarray: Probability of every row.
+        """
+        self._observe(model_version)
+        keys = self.keys(features, model_version)
+        now = time.time()
+        probabilities = np.empty(len(keys), dtype=np.float64)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                probability = self._get_local(key, now)
+                if probability is None:
+                    missing.append(i)
+                else:
+                    probabilities[i] = probability
+            self.counters["hits"] += len(keys) - len(missing)
+
+        if missing and self.shared_path:
+            missing = self._read_shared(keys, missing, probabilities, now)
+
+        if missing:
+            with self._lock:
+                self.counters["misses"] += len(missing)
+            computed = np.asarray(compute(np.asarray(features)[missing]), dtype=np.float64)
+            probabilities[missing] = computed
+            expires = now + self.ttl
+            with self._lock:
+                for i, probability in zip(missing, computed):
+                    self._put_local(keys[i], float(probability), expires)
+            if self.shared_path:
+                self._write_shared([(keys[i], model_version, float(p), expires)
+                                    for i, p in zip(missing, computed)], now)
+        return probabilities
+
+    def _read_shared(self, keys, missing, probabilities, now) -> list:
+        try:
+            wanted = [keys[i] for i in missing]
+            placeholders = ",".join("?" * len(wanted))
+            rows = self._shared().execute(
+                f"SELECT key, probability FROM predictions WHERE key IN ({placeholders}) AND expires >= ?",
+                (*wanted, now)).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Shared prediction cache unavailable: {e}")
+            return missing
+
+        found = dict(rows)
+        still_missing = []
+        with self._lock:
+            for i in missing:
+                probability = found.get(keys[i])
+                if probability is None:
+                    still_missing.append(i)
+                else:
+                    probabilities[i] = probability
+                    self._put_local(keys[i], probability, now + self.ttl)
+            self.counters["shared_hits"] += len(missing) - len(still_missing)
+        return still_missing
+
+    def _write_shared(self, rows, now):
+        try:
+            connection = self._shared()
+            connection.executemany("INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)", rows)
+            self._writes += len(rows)
+            if self._writes >= PRUNE_EVERY:
+                self._writes = 0
+                connection.execute("DELETE FROM predictions WHERE expires < ?", (now,))
+        except sqlite3.Error as e:
+            logger.warning(f"Shared prediction cache unavailable: {e}")
+
+    def stats(self) -> dict:
+        """
+        Returns the hit, miss, expiry, eviction and invalidation counters of
+        this process, its hit rate, size and the current model version.
+        """
+        with self._lock:
+            counters = dict(self.counters)
+            size = len(self._entries)
+        lookups = counters["hits"] + counters["shared_hits"] + counters["misses"]
+        return {
+            **counters,
+            "hit_rate": (counters["hits"] + counters["shared_hits"]) / lookups if lookups else 0.0,
+            "size": size,
+            "max_entries": self.max_entries,
+            "model_version": self.model_version,
+            "pid": os.getpid(),
+        }
@@ -0,0 +1,61 @@
+import os
+import math
+from pathlib import Path
+from CustomerChurn import logger
+
+# cgroup v2 exposes the CPU quota in one file, v1 in two
+CGROUP_V2_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+CGROUP_V1_QUOTA = Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+CGROUP_V1_PERIOD = Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+
+
+def cgroup_cpu_limit() -> float:
+    """
+    Returns the CPU quota of the current cgroup in cores (e.g. 2.5), or None
+    when the container is not CPU-limited.
+    """
+    try:
+        if CGROUP_V2_CPU_MAX.exists():
+            quota, period = CGROUP_V2_CPU_MAX.read_text().split()[:2]
+            if quota == "max":
+                return None
+            return int(quota) / int(period)
+        if CGROUP_V1_QUOTA.exists() and CGROUP_V1_PERIOD.exists():
+            quota = int(CGROUP_V1_QUOTA.read_text())
+            if quota <= 0:
+                return None
+            return quota / int(CGROUP_V1_PERIOD.read_text())
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read the cgroup CPU quota: {e}")
+    return None
+
+
+def available_cpus() -> int:
+    """
+    Returns the number of cores this process may actually use: the CPUs in
+    its affinity mask, capped by the cgroup CPU quota rounded up. A container
+    limited to 4 CPUs on a 32-core node gets 4, not 32.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    limit = cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, max(1, math.ceil(limit)))
+    return cpus
+
+
+def resolve_n_jobs(n_jobs: int) -> int:
+    """
+    Maps an n_jobs setting to a worker count: None, 0 and -1 mean every
+    available core, other negative values count back from it as in joblib
+    (-2 is all but one), and positive values are capped at the available
+    cores.
+    """
+    cpus = available_cpus()
+    if not n_jobs or n_jobs == -1:
+        return cpus
+    if n_jobs < 0:
+        return max(1, cpus + 1 + n_jobs)
+    return min(n_jobs, cpus)
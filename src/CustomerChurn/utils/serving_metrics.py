@@ -0,0 +1,153 @@
+import os
+import time
+from contextlib import contextmanager
+from CustomerChurn import logger
+
+# Set (before prometheus_client is imported) by gunicorn.conf.py, so every
+# worker writes its samples to files that /metrics aggregates
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# Seconds; fine-grained below 10 ms, where single-record phases fall
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Records per scored request or micro-batch, up to app.MAX_BATCH_SIZE
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536, 100000)
+
+
+class ServingMetrics:
+    def __init__(self, enabled: bool = True, namespace: str = "churn"):
+        """
+        Prometheus metrics of the scoring apps:
+
+        - `<ns>_http_requests_total` and `<ns>_http_request_duration_seconds`
+          per endpoint, method and status code,
+        - `<ns>_request_errors_total` per endpoint and exception type,
+          including errors the HTML form reports with a 200 page,
+        - `<ns>_phase_duration_seconds` per endpoint, phase (parse,
+          preprocess, predict, predict_proba, render, ...) and model version,
+        - `<ns>_batch_size` records per scoring call, per endpoint,
+        - `<ns>_model_info`, the number of live workers serving each version.
+
+        Under gunicorn, PROMETHEUS_MULTIPROC_DIR makes prometheus_client keep
+        every sample in a memory-mapped file per worker, which `render` sums
+        over all workers, so a scrape sees the whole server whichever worker
+        answers it. Recording a sample is a lock and a write to that mapping,
+        a few microseconds. Without prometheus_client installed, or with
+        `enabled` False, every method does nothing.
+
+        Args:
+            enabled (bool): Record metrics.
+            namespace (str): Prefix of the metric names.
+        """
+        self.enabled = enabled
+        self._model_version = None
+        # Labelled children by (metric, labels); prometheus_client's own
+        # lookup validates and locks on every call
+        self._children = {}
+        if not enabled:
+            return
+        try:
+            import prometheus_client
+        except ImportError:
+            logger.warning("prometheus_client is not installed; serving metrics are disabled")
+            self.enabled = False
+            return
+
+        self.multiprocess = MULTIPROC_DIR_ENV in os.environ
+        self.registry = prometheus_client.CollectorRegistry()
+        metric_options = {"namespace": namespace, "registry": self.registry}
+        self.requests = prometheus_client.Counter(
+            "http_requests", "HTTP requests served.", ["endpoint", "method", "status"], **metric_options)
+        self.request_seconds = prometheus_client.Histogram(
+            "http_request_duration_seconds", "Time to serve an HTTP request.", ["endpoint", "method"],
+            buckets=LATENCY_BUCKETS, **metric_options)
+        self.errors = prometheus_client.Counter(
+            "request_errors", "Requests that failed, by exception type.", ["endpoint", "error"], **metric_options)
+        self.phase_seconds = prometheus_client.Histogram(
+            "phase_duration_seconds", "Time spent in each phase of a request.",
+            ["endpoint", "phase", "model_version"], buckets=LATENCY_BUCKETS, **metric_options)
+        self.batch_size = prometheus_client.Histogram(
+            "batch_size", "Records scored per prediction call.", ["endpoint"],
+            buckets=BATCH_SIZE_BUCKETS, **metric_options)
+        self.model_info = prometheus_client.Gauge(
+            "model_info", "Workers serving each model version.", ["model_version"],
+            multiprocess_mode="livesum", **metric_options)
+
+    def _child(self, metric, *labels):
+        child = self._children.get((metric, labels))
+        if child is None:
+            child = self._children[(metric, labels)] = metric.labels(*labels)
+        return child
+
+    def observe_request(self, endpoint: str, method: str, status: int, seconds: float):
+        if self.enabled:
+            self._child(self.requests, endpoint, method, str(status)).inc()
+            self._child(self.request_seconds, endpoint, method).observe(seconds)
+
+    def observe_error(self, endpoint: str, error: Exception):
+        if self.enabled:
+            self._child(self.errors, endpoint, type(error).__name__).inc()
+
+    def observe_batch(self, endpoint: str, size: int):
+        if self.enabled:
+            self._child(self.batch_size, endpoint).observe(size)
+
+    def observe_phase(self, endpoint: str, phase: str, model_version: str, seconds: float):
+        if self.enabled:
+            self._child(self.phase_seconds, endpoint, phase, model_version).observe(seconds)
+
+    @contextmanager
+    def phase(self, endpoint: str, phase: str, model_version: str = ""):
+        """
+        Times the enclosed block as one phase of a request.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_phase(endpoint, phase, model_version, time.perf_counter() - start)
+
+    def timed(self, func, endpoint: str, phase: str, model_version: str = ""):
+        """
+        Wraps a function so that every call is timed as a phase.
+        """
+        if not self.enabled:
+            return func
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.observe_phase(endpoint, phase, model_version, time.perf_counter() - start)
+
+        return wrapper
+
+    def observe_model(self, version: str):
+        """
+        Records the model version this worker serves; called per request, so
+        it is only written when the version changes (or on the first request
+        of a forked worker, leaving the preloading master out of the count).
+        """
+        if not self.enabled or version == self._model_version:
+            return
+        if self._model_version is not None:
+            self.model_info.labels(self._model_version).set(0)
+        self.model_info.labels(version).set(1)
+        self._model_version = version
+
+    def render(self) -> tuple:
+        """
+        Returns the metrics in the Prometheus text format and its content
+        type, summed over all live and dead workers in multiprocess mode.
+        """
+        from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest
+
+        if not self.multiprocess:
+            return generate_latest(self.registry), CONTENT_TYPE_LATEST
+
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,250 @@
+import numpy as np
+import pandas as pd
+
+PROFILE_VERSION = 1
+
+# Numeric columns with at most this many distinct values are sampled as
+# discrete values (e.g. SeniorCitizen) instead of from quantile bins
+MAX_DISCRETE_VALUES = 32
+
+# Upper bound assumed for numeric columns whose schema gives no `max`, when
+# no data is available to fit
+DEFAULT_NUMERIC_SPAN = 100
+
+
+def _is_numeric(dtype: str) -> bool:
+    return dtype not in ("category", "object", "string")
+
+
+def _decimals(values: np.ndarray) -> int:
+    """
+    Returns the fewest decimals (up to 4) that represent all values, so
+    generated amounts look like the fitted ones (e.g. 2 for charges).
+    """
+    for decimals in range(5):
+        if np.allclose(values, np.round(values, decimals), rtol=0, atol=1e-6 * 10 ** -decimals):
+            return decimals
+    return None
+
+
+def _mutual_information(x: np.ndarray, y: np.ndarray, kx: int, ky: int) -> float:
+    joint = np.bincount(x * ky + y, minlength=kx * ky).reshape(kx, ky) / len(x)
+    px, py = joint.sum(axis=1, keepdims=True), joint.sum(axis=0, keepdims=True)
+    nonzero = joint > 0
+    return float(np.sum(joint[nonzero] * np.log(joint[nonzero] / (px @ py)[nonzero])))
+
+
+def fit_profile(data: pd.DataFrame, columns: dict, constraints: dict, target: str = None,
+                numeric_bins: int = 20, smoothing: float = 0.0) -> dict:
+    """
+    Fits the distribution profile synthetic data is sampled from.
+
+    Every schema column is discretized into states: categories, the distinct
+    values of low-cardinality numeric columns, or quantile bins of the other
+    numeric columns, plus a missing state for columns with missing values.
+    Identifier columns (text columns with unique values) are generated, not
+    fitted. The joint distribution is approximated by a Chow-Liu tree: each
+    column is conditioned on the one column it shares the most mutual
+    information with, rooted at the target, which keeps the strongest
+    dependencies (e.g. InternetService -> OnlineSecurity, tenure ->
+    TotalCharges, Contract -> Churn) while staying cheap to sample.
+
+    Args:
+        data (pd.DataFrame): Ingested rows to fit.
+        columns (dict): schema.yaml COLUMNS, column -> dtype.
+        constraints (dict): schema.yaml CONSTRAINTS.
+        target (str, optional): Column the tree is rooted at.
+        numeric_bins (int): Quantile bins per continuous column.
+        smoothing (float): Pseudo-count added to every conditional state.
+
+    Returns:
+        dict: JSON-serializable profile.
+    """
+    specs, codes = {}, {}
+    for name, dtype in columns.items():
+        values = data[name]
+        missing = values.isna().to_numpy()
+        spec = {"dtype": dtype, "nullable": bool(missing.any())}
+
+        if not _is_numeric(dtype):
+            allowed = (constraints.get(name) or {}).get("categories")
+            if allowed is None and values.nunique() > 0.9 * len(values):
+                specs[name] = {"kind": "id", "dtype": dtype}
+                continue
+            categories = [str(c) for c in (allowed or sorted(values.dropna().astype(str).unique()))]
+            spec.update(kind="categorical", categories=categories)
+            state = pd.Categorical(values.astype(str), categories=categories).codes.astype(np.int64)
+            n_states = len(categories)
+        else:
+            numbers = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+            missing = np.isnan(numbers)
+            spec["nullable"] = bool(missing.any())
+            present = numbers[~missing]
+            distinct = np.unique(present)
+            spec["decimals"] = _decimals(present)
+            if len(distinct) <= MAX_DISCRETE_VALUES:
+                spec.update(kind="discrete", values=distinct.tolist())
+                state = np.searchsorted(distinct, np.nan_to_num(numbers))
+                n_states = len(distinct)
+            else:
+                edges = np.unique(np.quantile(present, np.linspace(0, 1, numeric_bins + 1)))
+                spec.update(kind="binned", edges=edges.tolist())
+                state = np.clip(np.searchsorted(edges, np.nan_to_num(numbers), side="right") - 1, 0, len(edges) - 2)
+                n_states = len(edges) - 1
+
+        if spec["nullable"]:
+            state = np.where(missing, n_states, state)
+            n_states += 1
+        spec["n_states"] = n_states
+        specs[name] = spec
+        codes[name] = state
+
+    # Chow-Liu tree: maximum spanning tree of pairwise mutual information
+    fitted = list(codes)
+    root = target if target in codes else fitted[0]
+    order, parents = [root], {root: None}
+    best = {name: (-1.0, None) for name in fitted if name != root}
+    while best:
+        for name in best:
+            mi = _mutual_information(codes[order[-1]], codes[name],
+                                     specs[order[-1]]["n_states"], specs[name]["n_states"])
+            if mi > best[name][0]:
+                best[name] = (mi, order[-1])
+        child = max(best, key=lambda name: best[name][0])
+        parents[child] = best.pop(child)[1]
+        order.append(child)
+
+    probabilities = {}
+    for name in order:
+        n_states = specs[name]["n_states"]
+        marginal = np.bincount(codes[name], minlength=n_states).astype(np.float64) + smoothing
+        marginal /= marginal.sum()
+        parent = parents[name]
+        if parent is None:
+            probabilities[name] = marginal.tolist()
+            continue
+        table = np.zeros((specs[parent]["n_states"], n_states))
+        np.add.at(table, (codes[parent], codes[name]), 1)
+        table += smoothing
+        totals = table.sum(axis=1, keepdims=True)
+        # Parent states never observed fall back to the marginal
+        table = np.where(totals > 0, table / np.where(totals > 0, totals, 1), marginal)
+        probabilities[name] = table.tolist()
+
+    return {
+        "version": PROFILE_VERSION,
+        "fitted_rows": len(data),
+        "columns": specs,
+        "order": order,
+        "parents": parents,
+        "probabilities": probabilities,
+    }
+
+
+def schema_profile(columns: dict, constraints: dict) -> dict:
+    """
+    Profile of independent, uniformly distributed columns built from the
+    schema alone, used when there is no ingested data to fit.
+    """
+    specs, probabilities = {}, {}
+    for name, dtype in columns.items():
+        rules = constraints.get(name) or {}
+        if not _is_numeric(dtype):
+            if "categories" not in rules:
+                specs[name] = {"kind": "id", "dtype": dtype}
+                continue
+            spec = {"kind": "categorical", "categories": [str(c) for c in rules["categories"]]}
+            n_states = len(spec["categories"])
+        else:
+            low = float(rules.get("min", 0))
+            high = float(rules.get("max", low + DEFAULT_NUMERIC_SPAN))
+            is_integer = np.issubdtype(np.dtype(dtype), np.integer)
+            if is_integer and high - low < MAX_DISCRETE_VALUES:
+                spec = {"kind": "discrete", "values": np.arange(low, high + 1).tolist()}
+                n_states = len(spec["values"])
+            else:
+                spec = {"kind": "binned", "edges": [low, high]}
+                n_states = 1
+            spec["decimals"] = 0 if is_integer else 2
+        spec.update(dtype=dtype, nullable=False, n_states=n_states)
+        specs[name] = spec
+        probabilities[name] = (np.ones(n_states) / n_states).tolist()
+
+    order = [name for name in columns if specs[name]["kind"] != "id"]
+    return {
+        "version": PROFILE_VERSION,
+        "fitted_rows": 0,
+        "columns": specs,
+        "order": order,
+        "parents": {name: None for name in order},
+        "probabilities": probabilities,
+    }
+
+
+def _sample_states(probabilities: np.ndarray, rng: np.random.Generator, parent_states: np.ndarray = None,
+                   n_rows: int = None) -> np.ndarray:
+    """
+    Draws one state per row from a distribution, or from the row of a
+    conditional table selected by each row's parent state.
+    """
+    cdf = np.cumsum(probabilities, axis=-1)
+    cdf[..., -1] = 1.0
+    if parent_states is None:
+        return np.searchsorted(cdf, rng.random(n_rows), side="right").clip(max=len(cdf) - 1)
+    states = np.empty(len(parent_states), dtype=np.int64)
+    for parent_state in np.unique(parent_states):
+        rows = np.flatnonzero(parent_states == parent_state)
+        states[rows] = np.searchsorted(cdf[parent_state], rng.random(len(rows)), side="right")
+    return states.clip(max=cdf.shape[-1] - 1)
+
+
+def sample_table(profile: dict, n_rows: int, rng: np.random.Generator, first_row: int = 0) -> pd.DataFrame:
+    """
+    Samples `n_rows` synthetic rows from a profile, in schema column order
+    and dtypes; missing values are NaN.
+
+    Args:
+        profile (dict): Profile from `fit_profile` or `schema_profile`.
+        n_rows (int): Rows to sample.
+        rng (np.random.Generator): Random generator; equal seeds give equal rows.
+        first_row (int): Global index of the first row, used for identifiers.
+
+    Returns:
+        pd.DataFrame: The sampled rows.
+    """
+    specs = profile["columns"]
+    states = {}
+    for name in profile["order"]:
+        table = np.asarray(profile["probabilities"][name])
+        parent = profile["parents"][name]
+        states[name] = (_sample_states(table, rng, n_rows=n_rows) if parent is None
+                        else _sample_states(table, rng, parent_states=states[parent]))
+
+    data = {}
+    for name, spec in specs.items():
+        if spec["kind"] == "id":
+            data[name] = pd.Series(np.arange(first_row, first_row + n_rows)).map("SYN{:010d}".format)
+            continue
+
+        state = states[name]
+        missing = state == spec["n_states"] - 1 if spec["nullable"] else None
+        if spec["kind"] == "categorical":
+            codes = np.where(missing, -1, state) if missing is not None else state
+            data[name] = pd.Categorical.from_codes(codes, categories=spec["categories"])
+            continue
+
+        if spec["kind"] == "discrete":
+            values = np.asarray(spec["values"], dtype=np.float64)[np.minimum(state, len(spec["values"]) - 1)]
+        else:
+            edges = np.asarray(spec["edges"], dtype=np.float64)
+            bins = np.minimum(state, len(edges) - 2)
+            values = rng.uniform(edges[bins], edges[bins + 1])
+            if spec.get("decimals") is not None:
+                values = np.round(values, spec["decimals"])
+        if missing is not None:
+            values = np.where(missing, np.nan, values)
+            data[name] = values.astype(np.float32 if spec["dtype"].startswith("float") else np.float64)
+        else:
+            data[name] = values.astype(spec["dtype"])
+
+    return pd.DataFrame(data)
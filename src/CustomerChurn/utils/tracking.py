@@ -0,0 +1,136 @@
+import queue
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from CustomerChurn import logger
+from CustomerChurn.entity.config_entity import TrackingConfig
+
+TRACKING_BACKENDS = ["none", "local", "remote"]
+
+# Marks the end of the queued calls
+_STOP = object()
+
+
+class Tracker:
+    def __init__(self, config: TrackingConfig):
+        """
+        Experiment tracker that hands every MLflow call to a background
+        thread, so training never waits on tracker I/O.
+
+        The backend is chosen by `tracking.backend` in config.yaml:
+        'none' logs nothing and never imports mlflow, 'local' writes to an
+        MLflow file store under `local_dir`, and 'remote' logs to DagsHub
+        (`dagshub.init`) or to `tracking_uri` when one is set. mlflow and
+        dagshub are only imported, and the remote only contacted, by the
+        background thread, once something is logged. A backend that fails to
+        set up disables tracking for the run instead of failing the stage.
+
+        Args:
+            config (TrackingConfig): Configuration object containing the
+            backend, its location and autolog settings.
+
+        Raises:
+            ValueError: If the backend is not supported.
+        """
+        if config.backend not in TRACKING_BACKENDS:
+            raise ValueError(f"Invalid tracking backend: {config.backend}. Choose one of {TRACKING_BACKENDS}.")
+        self.config = config
+        self.enabled = config.backend != "none"
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._ready = False
+
+        if self.enabled and config.autolog:
+            # Autolog patches the estimators' fit methods, so it must be set
+            # up before training and logs synchronously from the fitting thread
+            self._setup()
+            import mlflow.sklearn
+            mlflow.sklearn.autolog()
+
+    def _setup(self):
+        if self._ready:
+            return
+        import mlflow
+        if self.config.backend == "local":
+            mlflow.set_tracking_uri(Path(self.config.local_dir).resolve().as_uri())
+        elif self.config.tracking_uri:
+            mlflow.set_tracking_uri(self.config.tracking_uri)
+        else:
+            import dagshub
+            dagshub.init(repo_owner=self.config.repo_owner, repo_name=self.config.repo_name,
+                         mlflow=True, dvc=True)
+        if self.config.experiment_name:
+            mlflow.set_experiment(self.config.experiment_name)
+        self._ready = True
+
+    def _worker(self):
+        try:
+            self._setup()
+            import mlflow
+        except Exception as e:
+            logger.warning(f"Tracking disabled, {self.config.backend} backend could not be set up: {e}")
+            mlflow = None
+
+        while True:
+            call = self._queue.get()
+            try:
+                if call is _STOP:
+                    return
+                if mlflow is not None:
+                    name, args, kwargs = call
+                    getattr(mlflow, name)(*args, **kwargs)
+            except Exception as e:
+                logger.warning(f"Tracking call {call[0]} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _submit(self, name: str, *args, **kwargs):
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="tracker", daemon=True)
+                self._thread.start()
+        self._queue.put((name, args, kwargs))
+
+    @contextmanager
+    def start_run(self, run_name: str = None):
+        """
+        Opens a tracking run around the calls made inside the block. The run
+        is started and ended by the background thread, in queue order.
+        """
+        self._submit("start_run", run_name=run_name)
+        try:
+            yield self
+        finally:
+            self._submit("end_run")
+
+    def log_param(self, key: str, value):
+        self._submit("log_param", key, value)
+
+    def log_params(self, params: dict):
+        self._submit("log_params", dict(params))
+
+    def log_metric(self, key: str, value: float):
+        self._submit("log_metric", key, value)
+
+    def log_metrics(self, metrics: dict):
+        self._submit("log_metrics", dict(metrics))
+
+    def log_artifact(self, path):
+        self._submit("log_artifact", str(path))
+
+    def close(self):
+        """
+        Waits up to `flush_timeout` seconds for the queued calls to reach the
+        tracker, then stops the background thread.
+        """
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(self.config.flush_timeout)
+        if self._thread.is_alive():
+            logger.warning(f"Tracker did not flush within {self.config.flush_timeout}s, "
+                           f"{self._queue.qsize()} calls dropped")
+        self._thread = None